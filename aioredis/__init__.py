@@ -1,10 +1,18 @@
-from .connection import RedisConnection, create_connection
+from .connection import (
+    RedisConnection,
+    RedisProtocolConnection,
+    create_connection,
+    )
 from .commands import (
     Redis, create_redis,
     create_redis_pool,
     GeoPoint, GeoMember,
+    Param,
     )
 from .pool import ConnectionsPool, create_pool
+from .metrics import PoolMetrics
+from .sharded import ShardedPool, create_sharded_pool
+from .replicated import ReplicatedPool, create_replicated_pool
 from .pubsub import Channel
 from .sentinel import RedisSentinel, create_sentinel
 from .cluster import create_cluster, create_pool_cluster
@@ -20,6 +28,7 @@ from .errors import (
     ReplyError,
     MaxClientsError,
     AuthError,
+    NoScriptError,
     ChannelClosedError,
     WatchVariableError,
     PoolClosedError,
@@ -40,12 +49,19 @@ __all__ = [
     'create_sentinel',
     'create_cluster',
     'create_pool_cluster',
+    'create_sharded_pool',
+    'create_replicated_pool',
     # Classes
     'RedisConnection',
+    'RedisProtocolConnection',
     'ConnectionsPool',
+    'PoolMetrics',
+    'ShardedPool',
+    'ReplicatedPool',
     'Redis',
     'GeoPoint',
     'GeoMember',
+    'Param',
     'Channel',
     'RedisSentinel',
     # Errors
@@ -53,6 +69,7 @@ __all__ = [
     'ReplyError',
     'MaxClientsError',
     'AuthError',
+    'NoScriptError',
     'ProtocolError',
     'PipelineError',
     'MultiExecError',
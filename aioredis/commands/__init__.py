@@ -8,9 +8,17 @@ from .hash import HashCommandsMixin
 from .hyperloglog import HyperLogLogCommandsMixin
 from .set import SetCommandsMixin
 from .sorted_set import SortedSetCommandsMixin
-from .transaction import TransactionsCommandsMixin, Pipeline, MultiExec
+from .transaction import (
+    TransactionsCommandsMixin,
+    Pipeline,
+    MultiExec,
+    WindowedPipeline,
+    PipelineTemplate,
+    Param,
+    )
+from .loader import BatchLoader
 from .list import ListCommandsMixin
-from .scripting import ScriptingCommandsMixin
+from .scripting import ScriptingCommandsMixin, Script
 from .server import ServerCommandsMixin
 from .pubsub import PubSubCommandsMixin
 from .cluster import ClusterCommandsMixin
@@ -22,6 +30,11 @@ __all__ = [
     'Redis',
     'Pipeline',
     'MultiExec',
+    'WindowedPipeline',
+    'PipelineTemplate',
+    'Param',
+    'Script',
+    'BatchLoader',
     'GeoPoint',
     'GeoMember',
 ]
@@ -74,6 +87,21 @@ class Redis(GenericCommandsMixin, StringCommandsMixin,
         """
         return self._pool_or_conn
 
+    @property
+    def bulk(self):
+        """Redis client sending commands through bulk lane of the pool.
+
+        Commands, pipelines, scans and bulk loads of returned client are
+        written to connections of pool's ``bulk_pool`` (see ``bulk_maxsize``
+        argument of :func:`~aioredis.create_pool`), so they never delay
+        commands of this client; same client is returned if pool has
+        no bulk lane.
+        """
+        pool = getattr(self._pool_or_conn, 'bulk_pool', None)
+        if pool is None:
+            return self
+        return self.__class__(pool)
+
     @property
     def address(self):
         """Redis connection address (if applicable)."""
@@ -117,6 +145,22 @@ class Redis(GenericCommandsMixin, StringCommandsMixin,
         # TODO: warn when using pool
         return self.execute('QUIT')
 
+    def bulk_load(self, source, **kwargs):
+        """Load bulk of commands (like ``redis-cli --pipe``).
+
+        This method wraps call to
+        :meth:`aioredis.RedisConnection.bulk_load()`
+        """
+        return self._pool_or_conn.bulk_load(source, **kwargs)
+
+    def batch_loader(self, *, delay=0, max_batch=1000):
+        """Returns :class:`BatchLoader` coalescing concurrent GET, HGET
+        and SISMEMBER calls into batches (MGET, HMGET, pipeline).
+        """
+        return BatchLoader(self._pool_or_conn, delay=delay,
+                           max_batch=max_batch,
+                           loop=self._pool_or_conn._loop)
+
     def select(self, db):
         """Change the selected database for the current connection.
 
@@ -162,7 +206,8 @@ class ContextRedis(Redis):
 async def create_redis(address, *, db=None, password=None, ssl=None,
                        encoding=None, commands_factory=Redis,
                        parser=None, timeout=None,
-                       connection_cls=None, loop=None):
+                       connection_cls=None, write_buffer_limits=None,
+                       command_timeout=None, name=None, loop=None):
     """Creates high-level Redis interface.
 
     This function is a coroutine.
@@ -174,6 +219,9 @@ async def create_redis(address, *, db=None, password=None, ssl=None,
                                    parser=parser,
                                    timeout=timeout,
                                    connection_cls=connection_cls,
+                                   write_buffer_limits=write_buffer_limits,
+                                   command_timeout=command_timeout,
+                                   name=name,
                                    loop=loop)
     return commands_factory(conn)
 
@@ -182,7 +230,14 @@ async def create_redis_pool(address, *, db=None, password=None, ssl=None,
                             encoding=None, commands_factory=Redis,
                             minsize=1, maxsize=10, parser=None,
                             timeout=None, pool_cls=None,
-                            connection_cls=None, loop=None):
+                            connection_cls=None, write_buffer_limits=None,
+                            command_timeout=None, name=None,
+                            create_connection_parallelism=5,
+                            max_idle_time=None, max_lifetime=None,
+                            multiplex=False, blocking_maxsize=None,
+                            metrics=None, multi_db=False,
+                            single_flight=None, bulk_maxsize=None,
+                            loop=None):
     """Creates high-level Redis interface.
 
     This function is a coroutine.
@@ -197,5 +252,18 @@ async def create_redis_pool(address, *, db=None, password=None, ssl=None,
                              create_connection_timeout=timeout,
                              pool_cls=pool_cls,
                              connection_cls=connection_cls,
+                             write_buffer_limits=write_buffer_limits,
+                             command_timeout=command_timeout,
+                             name=name,
+                             create_connection_parallelism=(
+                                 create_connection_parallelism),
+                             max_idle_time=max_idle_time,
+                             max_lifetime=max_lifetime,
+                             multiplex=multiplex,
+                             blocking_maxsize=blocking_maxsize,
+                             metrics=metrics,
+                             multi_db=multi_db,
+                             single_flight=single_flight,
+                             bulk_maxsize=bulk_maxsize,
                              loop=loop)
     return commands_factory(pool)
@@ -0,0 +1,143 @@
+import asyncio
+import functools
+
+from ..util import _NOTSET, _converters, _set_result, _set_exception
+
+
+class BatchLoader:
+    """Coalesces concurrent GET, HGET and SISMEMBER calls into batches.
+
+    Usage:
+
+    >>> loader = redis.batch_loader()
+    >>> async def resolve(user_id):
+    ...     return await loader.get('user:{}'.format(user_id))
+    >>> await asyncio.gather(*[resolve(i) for i in range(100)])
+
+    Calls made within one loop iteration (or within ``delay`` seconds
+    after the first one) are sent at once: GET calls as single MGET
+    (per encoding), HGET calls as single HMGET per hash key and SISMEMBER
+    calls as pipelined commands. Identical keys (fields, members) are
+    requested once and reply is set to future of every caller;
+    arguments are compared encoded, so ``1`` and ``1.0`` are different
+    keys while ``1`` and ``b'1'`` are the same.
+    Batch is sent right away when it reaches ``max_batch`` calls.
+
+    Note that MGET replies nil for key holding non-string value
+    (where GET replies with WRONGTYPE error).
+    """
+
+    def __init__(self, pool_or_connection, *, delay=0, max_batch=1000,
+                 loop=None):
+        assert delay >= 0, ("delay must be >= 0", delay)
+        assert max_batch > 0, ("max_batch must be > 0", max_batch)
+        if loop is None:
+            loop = asyncio.get_event_loop()
+        self._pool_or_conn = pool_or_connection
+        self._delay = delay
+        self._max_batch = max_batch
+        self._loop = loop
+        self._gets = {}     # encoding -> {key: [futures]}
+        self._hgets = {}    # (key, encoding) -> {field: [futures]}
+        self._members = {}  # (key, member) -> [futures]
+        self._pending = 0
+        self._handle = None
+
+    @property
+    def pending(self):
+        """Number of calls waiting to be sent."""
+        return self._pending
+
+    def get(self, key, *, encoding=_NOTSET):
+        """Get the value of a key (batched into MGET)."""
+        return self._add(self._gets.setdefault(encoding, {}), _encode(key))
+
+    def hget(self, key, field, *, encoding=_NOTSET):
+        """Get the value of a hash field (batched into HMGET)."""
+        group = self._hgets.setdefault((_encode(key), encoding), {})
+        return self._add(group, _encode(field))
+
+    def sismember(self, key, member):
+        """Determine if a given value is a member of a set."""
+        return self._add(self._members, (_encode(key), _encode(member)))
+
+    def flush(self):
+        """Send pending calls right away."""
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        gets, self._gets = self._gets, {}
+        hgets, self._hgets = self._hgets, {}
+        members, self._members = self._members, {}
+        self._pending = 0
+        for encoding, keys in gets.items():
+            keys = list(keys.items())
+            self._send(_fan_out_many, keys,
+                       b'MGET', *(key for key, _ in keys), encoding=encoding)
+        for (key, encoding), fields in hgets.items():
+            fields = list(fields.items())
+            self._send(_fan_out_many, fields,
+                       b'HMGET', key, *(field for field, _ in fields),
+                       encoding=encoding)
+        for (key, member), waiters in members.items():
+            self._send(_fan_out, waiters, b'SISMEMBER', key, member)
+
+    def _add(self, group, item):
+        fut = self._loop.create_future()
+        waiters = group.get(item)
+        if waiters is None:
+            group[item] = [fut]
+        else:
+            waiters.append(fut)
+        self._pending += 1
+        if self._pending >= self._max_batch:
+            self.flush()
+        elif self._handle is None:
+            if self._delay:
+                self._handle = self._loop.call_later(self._delay, self.flush)
+            else:
+                self._handle = self._loop.call_soon(self.flush)
+        return fut
+
+    def _send(self, fan_out, waiters, command, *args, **kwargs):
+        try:
+            fut = self._pool_or_conn.execute(command, *args, **kwargs)
+            if not asyncio.isfuture(fut):
+                fut = asyncio.ensure_future(fut, loop=self._loop)
+        except Exception as exc:
+            fut = self._loop.create_future()
+            fut.set_exception(exc)
+        fut.add_done_callback(functools.partial(fan_out, waiters))
+
+
+def _encode(arg):
+    # error is raised to caller instead of failing whole batch;
+    # calls are grouped by encoded arguments, so 1, 1.0 and True
+    # (equal in Python) are not mixed up
+    try:
+        return bytes(_converters[type(arg)](arg))
+    except KeyError:
+        raise TypeError("Argument {!r} expected to be of bytearray, bytes,"
+                        " float, int, or str type".format(arg)) from None
+
+
+def _fan_out(waiters, fut):
+    if fut.cancelled():
+        for waiter in waiters:
+            waiter.cancel()
+    elif fut.exception() is not None:
+        for waiter in waiters:
+            _set_exception(waiter, fut.exception())
+    else:
+        for waiter in waiters:
+            _set_result(waiter, fut.result())
+
+
+def _fan_out_many(items, fut):
+    if fut.cancelled() or fut.exception() is not None:
+        for _, waiters in items:
+            _fan_out(waiters, fut)
+        return
+    for (_, waiters), value in zip(items, fut.result()):
+        for waiter in waiters:
+            _set_result(waiter, value)
@@ -1,4 +1,10 @@
-from aioredis.util import wait_ok
+import asyncio
+import functools
+import hashlib
+
+from aioredis.errors import NoScriptError
+from aioredis.util import wait_ok, _chain_result, _set_exception
+from .transaction import Pipeline
 
 
 class ScriptingCommandsMixin:
@@ -32,3 +38,74 @@ class ScriptingCommandsMixin:
     def script_load(self, script):
         """Load the specified Lua script into the script cache."""
         return self.execute(b"SCRIPT",  b"LOAD", script)
+
+    def register_script(self, script):
+        """Return :class:`Script` executing Lua script by its SHA1 digest.
+
+        Usage:
+
+        >>> incr = redis.register_script(
+        ...     "return redis.call('INCRBY', KEYS[1], ARGV[1])")
+        >>> await incr(keys=['foo'], args=[2])
+        2
+        >>> pipe = redis.pipeline()
+        >>> fut = incr(keys=['foo'], args=[1], client=pipe)
+        >>> await pipe.execute()
+        [3]
+        """
+        return Script(self, script)
+
+
+class Script:
+    """Lua script called with EVALSHA.
+
+    SHA1 digest is computed locally; if server replies NOSCRIPT
+    (script cache was flushed, server restarted or failed over)
+    script is executed with EVAL which loads it into cache again.
+
+    When called with :class:`~aioredis.commands.Pipeline`
+    (or MultiExec) as client, scripts missing in server cache
+    are loaded before pipeline commands are sent.
+    """
+
+    def __init__(self, redis, script):
+        self._redis = redis
+        self._loop = redis._pool_or_conn._loop
+        self.script = script
+        if isinstance(script, str):
+            script = script.encode('utf-8')
+        self.sha = hashlib.sha1(script).hexdigest()
+
+    def __repr__(self):
+        return '<Script {}>'.format(self.sha)
+
+    def __call__(self, keys=[], args=[], client=None):
+        """Execute script with keys and args.
+
+        Returns future of EVALSHA (or fallback EVAL) result.
+        """
+        if client is None:
+            client = self._redis
+        if isinstance(client, Pipeline):
+            client._scripts[self.sha] = self
+            return client.evalsha(self.sha, keys, args)
+        fut = client.evalsha(self.sha, keys, args)
+        if not asyncio.isfuture(fut):
+            fut = asyncio.ensure_future(fut, loop=self._loop)
+        waiter = self._loop.create_future()
+        fut.add_done_callback(functools.partial(
+            self._evalsha_done, client, keys, args, waiter))
+        return waiter
+
+    def _evalsha_done(self, client, keys, args, waiter, fut):
+        if fut.cancelled() or not isinstance(fut.exception(), NoScriptError):
+            _chain_result(waiter, fut)
+            return
+        try:
+            fut = client.eval(self.script, keys, args)
+        except Exception as exc:
+            _set_exception(waiter, exc)
+            return
+        if not asyncio.isfuture(fut):
+            fut = asyncio.ensure_future(fut, loop=self._loop)
+        fut.add_done_callback(functools.partial(_chain_result, waiter))
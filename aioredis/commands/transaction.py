@@ -1,16 +1,26 @@
 import asyncio
+import collections
 import functools
+import random
 
 from ..abc import AbcPool
 from ..errors import (
     RedisError,
     PipelineError,
     MultiExecError,
+    WatchVariableError,
     ConnectionClosedError,
     )
+from ..connection import _NOREPLY_FORBIDDEN
 from ..util import (
     wait_ok,
+    _converters,
+    encode_command,
+    _set_result,
     _set_exception,
+    _chain_result,
+    _ConvertibleFuture,
+    _NOTSET,
     )
 
 
@@ -61,6 +71,92 @@ class TransactionsCommandsMixin:
         return MultiExec(self._pool_or_conn, self.__class__,
                          loop=self._pool_or_conn._loop)
 
+    async def transaction(self, func, *watch_keys, max_retries=10,
+                          backoff=.01, max_backoff=1.):
+        """Executes optimistic transaction retrying it on WATCH conflict.
+
+        Connection is acquired (pool) for the whole call; on every attempt
+        ``watch_keys`` are watched and ``func(redis, tr)`` coroutine
+        is called with Redis instance bound to this connection (to read
+        watched values) and new MULTI/EXEC pipeline to queue commands in.
+        Pipeline is then executed and its result returned.
+
+        If watched key was changed transaction is retried up to
+        ``max_retries`` times after random delay up to
+        ``backoff * 2 ** (retry - 1)`` seconds (but not more than
+        ``max_backoff``); then WatchVariableError is raised.
+        Retries are counted in pool metrics (if enabled).
+
+        Example:
+
+        >>> async def incr(redis, tr):
+        ...     val = int(await redis.get('foo') or 0)
+        ...     tr.set('foo', val + 1)
+        >>> await redis.transaction(incr, 'foo')
+        [True]
+        """
+        assert max_retries >= 0, ("max_retries must be >= 0", max_retries)
+        assert backoff >= 0, ("backoff must be >= 0", backoff)
+        pool_or_conn = self._pool_or_conn
+        if isinstance(pool_or_conn, AbcPool):
+            conn = await pool_or_conn.acquire()
+        else:
+            conn = pool_or_conn
+        metrics = getattr(pool_or_conn, 'metrics', None)
+        redis = self.__class__(conn)
+        retries = 0
+        try:
+            while True:
+                if watch_keys:
+                    await redis.watch(*watch_keys)
+                tr = MultiExec(conn, self.__class__, loop=conn._loop)
+                try:
+                    await func(redis, tr)
+                except BaseException:
+                    if watch_keys and not conn.closed:
+                        await redis.unwatch()
+                    raise
+                if not tr._pipeline:
+                    # nothing to execute
+                    if watch_keys:
+                        await redis.unwatch()
+                    return []
+                try:
+                    res = await tr.execute()
+                except MultiExecError as exc:
+                    errors = exc.args[1]
+                    if not errors or not all(
+                            isinstance(err, WatchVariableError)
+                            for err in errors):
+                        raise
+                else:
+                    if metrics is not None:
+                        metrics.transactions += 1
+                        metrics.transaction_retries.observe(retries)
+                    return res
+                await _wait_all(tr._results, conn._loop)
+                for fut in tr._results:
+                    if not fut.cancelled():
+                        fut.exception()     # mark as retrieved
+                if metrics is not None:
+                    metrics.watch_conflict(watch_keys)
+                if retries >= max_retries:
+                    if metrics is not None:
+                        metrics.transactions += 1
+                        metrics.transaction_aborts += 1
+                        metrics.transaction_retries.observe(retries)
+                    raise WatchVariableError(
+                        "WATCH variable has changed,"
+                        " gave up after {} retries".format(retries))
+                retries += 1
+                delay = min(max_backoff, backoff * 2 ** (retries - 1))
+                if delay:
+                    await asyncio.sleep(random.uniform(0, delay),
+                                        loop=conn._loop)
+        finally:
+            if conn is not pool_or_conn:
+                pool_or_conn.release(conn)
+
     def pipeline(self):
         """Returns :class:`Pipeline` object to execute bulk of commands.
 
@@ -88,6 +184,40 @@ class TransactionsCommandsMixin:
         return Pipeline(self._pool_or_conn, self.__class__,
                         loop=self._pool_or_conn._loop)
 
+    def pipeline_template(self, build):
+        """Compiles pipeline template once to execute it many times.
+
+        ``build(pipe)`` is called once to record commands; arguments
+        which change between executions are marked with :class:`Param`:
+
+        >>> tpl = redis.pipeline_template(lambda pipe: (
+        ...     pipe.get(Param('user')),
+        ...     pipe.hgetall(Param('profile'), encoding='utf-8')))
+        >>> await tpl.execute(user='user:1', profile='profile:1')
+        [b'...', {...}]
+        """
+        return PipelineTemplate(self._pool_or_conn, build, self.__class__,
+                                loop=self._pool_or_conn._loop)
+
+    def windowed_pipeline(self, commands, *, window=10000, min_window=100,
+                          max_bytes=16 * 1024 * 1024, adaptive=True,
+                          encoding=_NOTSET, return_exceptions=False):
+        """Returns :class:`WindowedPipeline` streaming large bulk
+        of commands with bounded number of them in flight.
+
+        Example:
+
+        >>> cmds = (('SET', 'key:{}'.format(i), i) for i in range(10**7))
+        >>> async for res in redis.windowed_pipeline(cmds, window=10000):
+        ...     assert res == b'OK'
+        """
+        return WindowedPipeline(self._pool_or_conn, commands,
+                                window=window, min_window=min_window,
+                                max_bytes=max_bytes, adaptive=adaptive,
+                                encoding=encoding,
+                                return_exceptions=return_exceptions,
+                                loop=self._pool_or_conn._loop)
+
 
 class _RedisBuffer:
 
@@ -98,13 +228,31 @@ class _RedisBuffer:
         self._loop = loop
 
     def execute(self, cmd, *args, **kw):
-        fut = self._loop.create_future()
+        fut = _BufferedReply(loop=self._loop)
         self._pipeline.append((fut, cmd, args, kw))
         return fut
 
     # TODO: add here or remove in connection methods like `select`, `auth` etc
 
 
+class _BufferedReply(_ConvertibleFuture):
+    """Reply future of command buffered in pipeline;
+    converted result is chained to it by done callback.
+    """
+
+    __slots__ = ('_buffer_loop',)
+
+    def __init__(self, *, loop):
+        super().__init__(loop=loop)
+        self._buffer_loop = loop
+
+    def add_converter(self, converter):
+        waiter = self._buffer_loop.create_future()
+        self.add_done_callback(
+            functools.partial(_chain_converted, waiter, converter))
+        return waiter
+
+
 class Pipeline:
     """Commands pipeline.
 
@@ -119,6 +267,11 @@ class Pipeline:
     1
     >>> await fut2
     1
+
+    Commands are written to connection at once and their replies
+    are set right to the futures returned by buffered calls;
+    result conversions of command methods are chained to these
+    futures by callbacks, no Task is created per command.
     """
     error_class = PipelineError
 
@@ -132,6 +285,7 @@ class Pipeline:
         self._results = []
         self._buffer = _RedisBuffer(self._pipeline, loop=loop)
         self._redis = commands_factory(self._buffer)
+        self._scripts = {}
         self._done = False
 
     def __getattr__(self, name):
@@ -142,13 +296,14 @@ class Pipeline:
             @functools.wraps(attr)
             def wrapper(*args, **kw):
                 try:
-                    task = asyncio.ensure_future(attr(*args, **kw),
-                                                 loop=self._loop)
+                    res = attr(*args, **kw)
+                    if not asyncio.isfuture(res):
+                        res = asyncio.ensure_future(res, loop=self._loop)
                 except Exception as exc:
-                    task = self._loop.create_future()
-                    task.set_exception(exc)
-                self._results.append(task)
-                return task
+                    res = self._loop.create_future()
+                    res.set_exception(exc)
+                self._results.append(res)
+                return res
             return wrapper
         return attr
 
@@ -176,22 +331,51 @@ class Pipeline:
         else:
             return await self._gather_result(return_exceptions)
 
+    async def _load_scripts(self, conn):
+        """Load scripts called in pipeline missing in server cache.
+
+        Returns False (and sets error to every command) if loading failed.
+        """
+        scripts = list(self._scripts.values())
+        try:
+            exists = await conn.execute(
+                b'SCRIPT', b'EXISTS', *(script.sha for script in scripts))
+            missing = [conn.execute(b'SCRIPT', b'LOAD', script.script)
+                       for script, ok in zip(scripts, exists) if not ok]
+            if missing:
+                await asyncio.gather(*missing, loop=self._loop)
+        except Exception as exc:
+            for fut, *_ in self._pipeline:
+                _set_exception(fut, exc)
+            return False
+        return True
+
     async def _do_execute(self, conn, *, return_exceptions=False):
-        await asyncio.gather(*self._send_pipeline(conn),
-                             loop=self._loop,
-                             return_exceptions=True)
+        if self._scripts and not (await self._load_scripts(conn)):
+            return (await self._gather_result(return_exceptions))
+        execute_pipeline = getattr(conn, 'execute_pipeline', None)
+        if execute_pipeline is not None:
+            execute_pipeline(self._pipeline)
+        else:
+            await asyncio.gather(*self._send_pipeline(conn),
+                                 loop=self._loop,
+                                 return_exceptions=True)
         return await self._gather_result(return_exceptions)
 
     async def _gather_result(self, return_exceptions):
+        await _wait_all(self._results, self._loop)
         errors = []
         results = []
         for fut in self._results:
-            try:
-                res = await fut
-                results.append(res)
-            except Exception as exc:
+            if fut.cancelled():
+                exc = asyncio.CancelledError()
+            else:
+                exc = fut.exception()
+            if exc is not None:
                 errors.append(exc)
                 results.append(exc)
+            else:
+                results.append(fut.result())
         if errors and not return_exceptions:
             raise self.error_class(errors)
         return results
@@ -216,6 +400,442 @@ class Pipeline:
             waiter.set_result(fut.result())
 
 
+class Param:
+    """Pipeline template parameter placeholder."""
+
+    __slots__ = ('name',)
+
+    def __init__(self, name):
+        self.name = name
+
+    def __repr__(self):
+        return 'Param({!r})'.format(self.name)
+
+
+class _TemplateRecorder:
+
+    def __init__(self, loop):
+        self._loop = loop
+        self.commands = []
+        self.replies = []
+
+    def execute(self, cmd, *args, **kw):
+        fut = _RecordedReply(loop=self._loop)
+        self.commands.append((cmd, args, kw))
+        self.replies.append(fut)
+        return fut
+
+
+class _RecordedReply(_ConvertibleFuture):
+    """Reply future of command recorded in template;
+    keeps result conversion to be applied to replies.
+    """
+
+    __slots__ = ('converter',)
+
+    def __init__(self, *, loop):
+        super().__init__(loop=loop)
+        self.converter = None
+
+    def add_converter(self, converter):
+        if self.converter is not None:
+            converter = _compose(self.converter, converter)
+        self.converter = converter
+        return self
+
+
+class PipelineTemplate:
+    """Pre-compiled pipeline.
+
+    Commands recorded by ``build(pipe)`` are encoded once into
+    skeleton (constant parts of commands) and parameter slots;
+    result conversions registered by command methods (see ``wait_ok``,
+    ``wait_convert`` and ``wait_make_dict``) are applied right
+    in connection reader.
+    Executing template only encodes parameters values, writes all
+    commands at once and waits for replies:
+
+    >>> tpl = redis.pipeline_template(lambda pipe: (
+    ...     pipe.incr(Param('counter')),
+    ...     pipe.set(Param('key'), Param('value'))))
+    >>> await tpl.execute(counter='hits', key='foo', value='bar')
+    [1, True]
+
+    Parameters can be used only as arguments passed to command as is
+    (not for arguments command method checks or converts).
+    Commands changing connection state (``SELECT``, ``MULTI``,
+    Pub/Sub, etc) are not allowed.
+    """
+
+    def __init__(self, pool_or_connection, build,
+                 commands_factory=lambda conn: conn, *, loop=None):
+        if loop is None:
+            loop = asyncio.get_event_loop()
+        self._pool_or_conn = pool_or_connection
+        self._loop = loop
+        recorder = _TemplateRecorder(loop)
+        redis = commands_factory(recorder)
+        converters = []
+
+        def record(name):
+            method = getattr(redis, name)
+
+            def wrapper(*args, **kw):
+                count = len(recorder.commands)
+                res = method(*args, **kw)
+                if len(recorder.commands) != count + 1:
+                    _close(res)
+                    raise TypeError("Method {!r} can not be used in template"
+                                    .format(name))
+                if res is not recorder.replies[-1]:
+                    _close(res)
+                    raise TypeError("Method {!r} result conversion can not"
+                                    " be used in template".format(name))
+                converters.append(res.converter)
+                return res
+            return wrapper
+        build(_TemplateBuilder(record))
+
+        self._commands = []
+        self._waiters = []
+        self._params = set()
+        segments = []
+        for (cmd, args, kw), cb in zip(recorder.commands, converters):
+            if cmd.upper().strip() in _NOREPLY_FORBIDDEN:
+                raise ValueError("Command {!r} can not be used in template"
+                                 .format(cmd))
+            if set(kw) - {'encoding'}:
+                raise TypeError("Unsupported command options {!r}"
+                                .format(kw))
+            encoding = kw.get('encoding', _NOTSET)
+            self._commands.append((cmd, args, encoding))
+            self._waiters.append((encoding, cb))
+            segments.append(b'*%d\r\n' % (len(args) + 1))
+            segments.append(bytes(encode_command(cmd)[4:]))
+            for arg in args:
+                if isinstance(arg, Param):
+                    self._params.add(arg.name)
+                    segments.append(arg)
+                else:
+                    segments.append(bytes(encode_command(arg)[4:]))
+        # merge constant segments (joined at once, bytes += is quadratic)
+        self._segments = []
+        consts = []
+        for seg in segments:
+            if isinstance(seg, bytes):
+                consts.append(seg)
+                continue
+            if consts:
+                self._segments.append(b''.join(consts))
+                consts = []
+            self._segments.append(seg)
+        if consts:
+            self._segments.append(b''.join(consts))
+
+    @property
+    def params(self):
+        """Set of template parameters names."""
+        return frozenset(self._params)
+
+    def __len__(self):
+        return len(self._commands)
+
+    def encode(self, params):
+        """Encode commands with parameters values."""
+        buf = bytearray()
+        for seg in self._segments:
+            if seg.__class__ is bytes:
+                buf += seg
+                continue
+            try:
+                val = params[seg.name]
+            except KeyError:
+                raise TypeError("Missing template parameter {!r}"
+                                .format(seg.name)) from None
+            try:
+                val = _converters[type(val)](val)
+            except KeyError:
+                raise TypeError("Parameter {!r} expected to be of bytearray,"
+                                " bytes, float, int, or str type"
+                                .format(seg.name)) from None
+            buf += b'$%d\r\n%s\r\n' % (len(val), val)
+        return buf
+
+    async def execute(self, *, return_exceptions=False, **params):
+        """Execute template commands with parameters values.
+
+        Errors are collected and raised as PipelineError
+        or returned in result if ``return_exceptions`` is set.
+        """
+        if isinstance(self._pool_or_conn, AbcPool):
+            async with self._pool_or_conn.get() as conn:
+                return await self._execute(conn, params, return_exceptions)
+        return await self._execute(self._pool_or_conn, params,
+                                   return_exceptions)
+
+    async def _execute(self, conn, params, return_exceptions):
+        if conn.in_transaction:
+            raise RedisError("Connection in MULTI/EXEC block")
+        create_future = self._loop.create_future
+        futures = []
+        execute_encoded = getattr(conn, 'execute_encoded', None)
+        if execute_encoded is not None:
+            data = self.encode(params)
+            waiters = []
+            for encoding, cb in self._waiters:
+                fut = create_future()
+                futures.append(fut)
+                waiters.append((fut, encoding, cb))
+            execute_encoded(data, waiters)
+        else:
+            self.encode(params)     # check parameters
+            for (cmd, args, encoding), (_, cb) in zip(
+                    self._commands, self._waiters):
+                args = [params[arg.name] if isinstance(arg, Param) else arg
+                        for arg in args]
+                fut = create_future()
+                futures.append(fut)
+                try:
+                    res = conn.execute(cmd, *args, encoding=encoding)
+                except Exception as exc:
+                    fut.set_exception(exc)
+                else:
+                    res.add_done_callback(functools.partial(
+                        _chain_converted, fut, cb))
+        await _wait_all(futures, self._loop)
+        results = []
+        errors = []
+        for fut in futures:
+            exc = fut.exception()
+            if exc is not None:
+                errors.append(exc)
+                results.append(exc)
+            else:
+                results.append(fut.result())
+        if errors and not return_exceptions:
+            raise PipelineError(errors)
+        return results
+
+
+class _TemplateBuilder:
+
+    def __init__(self, record):
+        self._record = record
+
+    def __getattr__(self, name):
+        return self._record(name)
+
+
+class WindowedPipeline:
+    """Pipeline with bounded number of commands in flight.
+
+    Commands (``(command, *args)`` tuples) are taken from iterable
+    or async iterable, written to connection in batches and their
+    replies are returned in order as async iterator:
+
+    >>> cmds = (('SET', 'key:{}'.format(i), i) for i in range(10**7))
+    >>> async with redis.windowed_pipeline(cmds) as pipe:
+    ...     async for res in pipe:
+    ...         assert res == b'OK'
+
+    No more than ``window`` commands are in flight; new batch is sent
+    when half of the window is consumed.
+    With ``adaptive`` window it starts from ``min_window`` and on every
+    batch is set to twice the bandwidth-delay product (replies
+    consumption rate times lowest observed round-trip time), limited
+    by ``window`` and by ``max_bytes`` of replies in flight
+    (estimated from average reply size).
+
+    Command error is raised from iteration (and pipeline is closed)
+    unless ``return_exceptions`` is set, then it is returned in place
+    of reply.
+    Connection is acquired from pool on first iteration and released
+    when iteration ends or pipeline is closed.
+    """
+
+    def __init__(self, pool_or_connection, commands, *, window=10000,
+                 min_window=100, max_bytes=16 * 1024 * 1024,
+                 adaptive=True, encoding=_NOTSET, return_exceptions=False,
+                 loop=None):
+        assert window > 0, ("window must be > 0", window)
+        assert min_window > 0, ("min_window must be > 0", min_window)
+        assert max_bytes > 0, ("max_bytes must be > 0", max_bytes)
+        if loop is None:
+            loop = asyncio.get_event_loop()
+        self._pool_or_conn = pool_or_connection
+        self._loop = loop
+        if hasattr(commands, '__aiter__'):
+            self._commands = commands.__aiter__()
+            self._is_async = True
+        else:
+            self._commands = iter(commands)
+            self._is_async = False
+        self._max_window = window
+        self._min_window = min_window = min(min_window, window)
+        self._window = min_window if adaptive else window
+        self._max_bytes = max_bytes
+        self._adaptive = adaptive
+        self._kw = {} if encoding is _NOTSET else {'encoding': encoding}
+        self._return_exceptions = return_exceptions
+        self._conn = None
+        self._inflight = collections.deque()
+        self._exhausted = False
+        self._closed = False
+        self._rtt = None
+        self._reply_size = None
+        self._consumed = 0
+        self._reply_bytes = 0
+        self._refilled_at = None
+
+    @property
+    def window(self):
+        """Current window size."""
+        return self._window
+
+    @property
+    def rtt(self):
+        """Lowest observed round-trip time (seconds) or None."""
+        return self._rtt
+
+    @property
+    def in_flight(self):
+        """Number of commands sent and not consumed yet."""
+        return len(self._inflight)
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def close(self):
+        """Stop iteration and release connection.
+
+        Replies of commands still in flight are discarded.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        while self._inflight:
+            fut = self._inflight.popleft()
+            if not fut.done():
+                fut.cancel()
+            elif not fut.cancelled():
+                fut.exception()     # mark as retrieved
+        if self._conn is not None and isinstance(self._pool_or_conn, AbcPool):
+            self._pool_or_conn.release(self._conn)
+        self._conn = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self._closed:
+            raise StopAsyncIteration    # noqa
+        try:
+            if self._conn is None:
+                await self._acquire()
+            if (not self._exhausted and
+                    len(self._inflight) <= self._window // 2):
+                await self._fill()
+        except BaseException:
+            self.close()
+            raise
+        if not self._inflight:
+            self.close()
+            raise StopAsyncIteration    # noqa
+        fut = self._inflight[0]
+        try:
+            res = await fut
+        except asyncio.CancelledError:
+            self.close()
+            raise
+        except Exception as exc:
+            if not self._return_exceptions:
+                self.close()
+                raise
+            res = exc
+        self._inflight.popleft()
+        self._consumed += 1
+        if self._adaptive:
+            self._reply_bytes += _reply_size(res)
+        return res
+
+    async def _acquire(self):
+        if isinstance(self._pool_or_conn, AbcPool):
+            self._conn = await self._pool_or_conn.acquire()
+        else:
+            self._conn = self._pool_or_conn
+
+    async def _fill(self):
+        if self._adaptive:
+            self._adapt()
+        batch = []
+        free = self._window - len(self._inflight)
+        kw = self._kw
+        create_future = self._loop.create_future
+        while free > 0:
+            try:
+                if self._is_async:
+                    cmd = await self._commands.__anext__()
+                else:
+                    cmd = next(self._commands)
+            except (StopIteration, StopAsyncIteration):
+                self._exhausted = True
+                break
+            batch.append((create_future(), cmd[0], cmd[1:], kw))
+            free -= 1
+        if batch:
+            self._send(batch)
+
+    def _send(self, batch):
+        conn = self._conn
+        execute_pipeline = getattr(conn, 'execute_pipeline', None)
+        if execute_pipeline is not None:
+            execute_pipeline(batch)
+        else:
+            for fut, cmd, args, kw in batch:
+                try:
+                    res = conn.execute(cmd, *args, **kw)
+                except Exception as exc:
+                    fut.set_exception(exc)
+                else:
+                    res.add_done_callback(functools.partial(
+                        _chain_result, fut))
+        if self._adaptive:
+            batch[0][0].add_done_callback(functools.partial(
+                self._head_done, self._loop.time()))
+        self._inflight.extend(item[0] for item in batch)
+
+    def _head_done(self, sent_at, fut):
+        rtt = self._loop.time() - sent_at
+        if self._rtt is None or rtt < self._rtt:
+            self._rtt = rtt
+
+    def _adapt(self):
+        now = self._loop.time()
+        if self._refilled_at is not None and self._consumed:
+            elapsed = now - self._refilled_at
+            window = self._window
+            if self._rtt is not None and elapsed > 0:
+                rate = self._consumed / elapsed
+                window = int(2 * rate * self._rtt)
+            size = self._reply_bytes / self._consumed
+            if self._reply_size is not None:
+                size = .75 * self._reply_size + .25 * size
+            self._reply_size = size
+            window = min(window, int(self._max_bytes / max(size, 1)))
+            self._window = max(self._min_window,
+                               min(self._max_window, window))
+        self._refilled_at = now
+        self._consumed = 0
+        self._reply_bytes = 0
+
+
 class MultiExec(Pipeline):
     """Multi/Exec pipeline wrapper.
 
@@ -250,10 +870,42 @@ class MultiExec(Pipeline):
     ...     pass # handle it
     >>> ok2 = await wait_ok_coro
     >>> # for this to work `wait_ok_coro` must be wrapped in Future
+
+    MULTI, buffered commands and EXEC are written to connection at once;
+    ``QUEUED`` replies are only counted and items of EXEC reply are set
+    right to the futures returned by buffered calls.
     """
     error_class = MultiExecError
 
     async def _do_execute(self, conn, *, return_exceptions=False):
+        if self._scripts and not (await self._load_scripts(conn)):
+            return (await self._gather_result(return_exceptions))
+        execute_multi = getattr(conn, 'execute_multi', None)
+        if execute_multi is None:
+            return (await self._do_execute_queued(
+                conn, return_exceptions=return_exceptions))
+        futures = [fut for fut, *_ in self._pipeline]
+        try:
+            execute_multi(self._pipeline)
+        except Exception as exc:
+            for fut in futures:
+                _set_exception(fut, exc)
+        await _wait_all(futures, self._loop)
+        results = await self._gather_result(return_exceptions=True)
+        if return_exceptions:
+            return results
+        errors = [res for res in results if isinstance(res, Exception)]
+        # commands buffered right on connection are not in results
+        for fut in futures:
+            if not fut.cancelled():
+                exc = fut.exception()
+                if exc is not None and exc not in errors:
+                    errors.append(exc)
+        if errors:
+            raise self.error_class(errors)
+        return results
+
+    async def _do_execute_queued(self, conn, *, return_exceptions=False):
         self._waiters = waiters = []
         multi = conn.execute('MULTI')
         coros = list(self._send_pipeline(conn))
@@ -312,3 +964,53 @@ class MultiExec(Pipeline):
         elif fut.result() in {b'QUEUED', 'QUEUED'}:
             # got result, it should be QUEUED
             self._waiters.append(waiter)
+
+
+async def _wait_all(futures, loop):
+    """Wait until all futures are done."""
+    pending = [fut for fut in futures if not fut.done()]
+    if not pending:
+        return
+    done = loop.create_future()
+    count = len(pending)
+
+    def callback(fut):
+        nonlocal count
+        count -= 1
+        if not count and not done.done():
+            done.set_result(None)
+    for fut in pending:
+        fut.add_done_callback(callback)
+    await done
+
+
+def _reply_size(obj):
+    """Rough size of reply in bytes."""
+    if isinstance(obj, (bytes, str)):
+        return len(obj)
+    if isinstance(obj, list):
+        return sum(map(_reply_size, obj)) + 8
+    return 8
+
+
+def _compose(first, second):
+    return lambda res: second(first(res))
+
+
+def _close(res):
+    if asyncio.iscoroutine(res):
+        res.close()
+
+
+def _chain_converted(waiter, cb, fut):
+    if fut.cancelled():
+        waiter.cancel()
+    elif fut.exception() is not None:
+        _set_exception(waiter, fut.exception())
+    elif cb is not None and fut.result() not in (b'QUEUED', 'QUEUED'):
+        try:
+            _set_result(waiter, cb(fut.result()))
+        except Exception as exc:
+            _set_exception(waiter, exc)
+    else:
+        _set_result(waiter, fut.result())
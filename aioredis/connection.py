@@ -1,8 +1,12 @@
+import os
+import io
+import mmap
 import types
 import asyncio
+import binascii
 import socket
 from functools import partial
-from collections import deque
+from collections import deque, namedtuple
 
 from .util import (
     encode_command,
@@ -10,12 +14,18 @@ from .util import (
     _NOTSET,
     _set_result,
     _set_exception,
+    _chain_result,
     coerced_keys_dict,
     decode,
     parse_url,
     )
 from .parser import Reader
-from .stream import open_connection, open_unix_connection
+from .stream import (
+    open_connection,
+    open_unix_connection,
+    open_protocol_connection,
+    open_protocol_unix_connection,
+    )
 from .errors import (
     ConnectionClosedError,
     ConnectionForcedCloseError,
@@ -32,10 +42,16 @@ from .abc import AbcConnection
 from .log import logger
 
 
-__all__ = ['create_connection', 'RedisConnection']
+__all__ = ['create_connection', 'RedisConnection', 'RedisProtocolConnection']
 
 MAX_CHUNK_SIZE = 65536
 
+# bulk load writes size
+BULK_CHUNK_SIZE = 1024 * 1024
+
+BulkLoadResult = namedtuple('BulkLoadResult',
+                            'replies errors last_error elapsed rate')
+
 _PUBSUB_COMMANDS = (
     'SUBSCRIBE', b'SUBSCRIBE',
     'PSUBSCRIBE', b'PSUBSCRIBE',
@@ -43,10 +59,35 @@ _PUBSUB_COMMANDS = (
     'PUNSUBSCRIBE', b'PUNSUBSCRIBE',
     )
 
+# Commands that change connection state and therefore must have
+# their replies processed.
+_NOREPLY_FORBIDDEN = _PUBSUB_COMMANDS + (
+    'SELECT', b'SELECT',
+    'MULTI', b'MULTI',
+    'EXEC', b'EXEC',
+    'DISCARD', b'DISCARD',
+    'CLIENT', b'CLIENT',
+    )
+
+_CLIENT_REPLY_SKIP = bytes(encode_command(b'CLIENT', b'REPLY', b'SKIP'))
+
+# Commands that change connection state (or end transaction) and
+# therefore can not be executed in MULTI/EXEC block by `execute_multi`.
+_MULTI_FORBIDDEN = _PUBSUB_COMMANDS + (
+    'SELECT', b'SELECT',
+    'EXEC', b'EXEC',
+    'DISCARD', b'DISCARD',
+    )
+
+_MULTI = bytes(encode_command(b'MULTI'))
+_EXEC = bytes(encode_command(b'EXEC'))
+
 
 async def create_connection(address, *, db=None, password=None, ssl=None,
                             encoding=None, parser=None, loop=None,
-                            timeout=None, connection_cls=None):
+                            timeout=None, connection_cls=None,
+                            write_buffer_limits=None, command_timeout=None,
+                            name=None, ping=False):
     """Creates redis connection.
 
     Opens connection to Redis server specified by address argument.
@@ -68,6 +109,20 @@ async def create_connection(address, *, db=None, password=None, ssl=None,
     By default hiredis.Reader is used (unless it is missing or platform
     is not CPython).
 
+    Write_buffer_limits argument can be used to set transport's
+    high- and low-water marks as ``(high, low)`` tuple;
+    see :meth:`RedisConnection.drain`.
+
+    Command_timeout argument sets default timeout for every command
+    executed on connection (see :meth:`RedisConnection.execute`).
+
+    Name argument sets connection name with CLIENT SETNAME.
+
+    Ping argument adds health-check PING to the handshake.
+
+    AUTH, SELECT, CLIENT SETNAME and PING handshake commands are pipelined
+    so connection setup takes a single round-trip.
+
     Return value is RedisConnection instance or a connection_cls if it is
     given.
 
@@ -88,6 +143,9 @@ async def create_connection(address, *, db=None, password=None, ssl=None,
 
     if timeout is not None and timeout <= 0:
         raise ValueError("Timeout has to be None or a number greater than 0")
+    if command_timeout is not None and command_timeout <= 0:
+        raise ValueError(
+            "Command timeout has to be None or a number greater than 0")
 
     if connection_cls:
         assert issubclass(connection_cls, AbcConnection),\
@@ -99,11 +157,20 @@ async def create_connection(address, *, db=None, password=None, ssl=None,
     if loop is None:
         loop = asyncio.get_event_loop()
 
+    if issubclass(cls, RedisProtocolConnection):
+        open_tcp = open_protocol_connection
+        open_unix = open_protocol_unix_connection
+        open_kw = {}
+    else:
+        open_tcp = open_connection
+        open_unix = open_unix_connection
+        open_kw = {'limit': MAX_CHUNK_SIZE}
+
     if isinstance(address, (list, tuple)):
         host, port = address
         logger.debug("Creating tcp connection to %r", address)
-        reader, writer = await asyncio.wait_for(open_connection(
-            host, port, limit=MAX_CHUNK_SIZE, ssl=ssl, loop=loop),
+        reader, writer = await asyncio.wait_for(open_tcp(
+            host, port, ssl=ssl, loop=loop, **open_kw),
             timeout, loop=loop)
         sock = writer.transport.get_extra_info('socket')
         if sock is not None:
@@ -112,22 +179,37 @@ async def create_connection(address, *, db=None, password=None, ssl=None,
         address = tuple(address[:2])
     else:
         logger.debug("Creating unix connection to %r", address)
-        reader, writer = await asyncio.wait_for(open_unix_connection(
-            address, ssl=ssl, limit=MAX_CHUNK_SIZE, loop=loop),
+        reader, writer = await asyncio.wait_for(open_unix(
+            address, ssl=ssl, loop=loop, **open_kw),
             timeout, loop=loop)
         sock = writer.transport.get_extra_info('socket')
         if sock is not None:
             address = sock.getpeername()
+    if write_buffer_limits is not None:
+        writer.transport.set_write_buffer_limits(*write_buffer_limits)
 
     conn = cls(reader, writer, encoding=encoding,
                address=address, parser=parser,
+               command_timeout=command_timeout,
                loop=loop)
 
     try:
+        handshake = []
         if password is not None:
-            await conn.auth(password)
+            handshake.append(conn.auth(password))
         if db is not None:
-            await conn.select(db)
+            handshake.append(conn.select(db))
+        if name is not None:
+            fut = conn.execute(b'CLIENT', b'SETNAME', name)
+            handshake.append(wait_ok(fut))
+        if ping:
+            handshake.append(conn.execute(b'PING'))
+        if handshake:
+            results = await asyncio.gather(*handshake, loop=loop,
+                                           return_exceptions=True)
+            for res in results:
+                if isinstance(res, Exception):
+                    raise res
     except Exception:
         conn.close()
         await conn.wait_closed()
@@ -139,7 +221,7 @@ class RedisConnection(AbcConnection):
     """Redis connection."""
 
     def __init__(self, reader, writer, *, address, encoding=None,
-                 parser=None, loop=None):
+                 parser=None, command_timeout=None, loop=None):
         if loop is None:
             loop = asyncio.get_event_loop()
         if parser is None:
@@ -154,24 +236,35 @@ class RedisConnection(AbcConnection):
         self._reader.set_parser(
             parser(protocolError=ProtocolError, replyError=ReplyError)
         )
-        self._reader_task = asyncio.ensure_future(self._read_data(),
-                                                  loop=self._loop)
+        self._reader_task = None
         self._close_msg = None
         self._db = 0
         self._closing = False
         self._closed = False
         self._close_waiter = loop.create_future()
-        self._reader_task.add_done_callback(self._close_waiter.set_result)
         self._in_transaction = None
         self._transaction_error = None  # XXX: never used?
         self._in_pubsub = 0
         self._pubsub_channels = coerced_keys_dict()
         self._pubsub_patterns = coerced_keys_dict()
         self._encoding = encoding
+        self._command_timeout = command_timeout
+        self._deadlines = deque()
+        self._batch = None
+        self._bulk = None
+        self._timeout_handle = None
+        self._timeout_at = None
+        self._progress_at = loop.time()
+        self._start_reading()
 
     def __repr__(self):
         return '<RedisConnection [db:{}]>'.format(self._db)
 
+    def _start_reading(self):
+        self._reader_task = asyncio.ensure_future(self._read_data(),
+                                                  loop=self._loop)
+        self._reader_task.add_done_callback(self._close_waiter.set_result)
+
     async def _read_data(self):
         """Response reader task."""
         last_error = ConnectionClosedError(
@@ -216,6 +309,11 @@ class RedisConnection(AbcConnection):
         """Processes command results."""
         assert len(self._waiters) > 0, (type(obj), obj)
         waiter, encoding, cb = self._waiters.popleft()
+        self._progress_at = self._loop.time()
+        if self._deadlines and self._deadlines[0][1] is waiter:
+            self._deadlines.popleft()
+            if not self._deadlines:
+                self._clear_deadlines()
         if isinstance(obj, RedisError):
             if isinstance(obj, ReplyError):
                 if obj.args[0].startswith('READONLY'):
@@ -273,18 +371,153 @@ class RedisConnection(AbcConnection):
         else:
             logger.warning("Unknown pubsub message received %r", obj)
 
-    def execute(self, command, *args, encoding=_NOTSET):
+    def execute(self, command, *args, encoding=_NOTSET, timeout=_NOTSET):
         """Executes redis command and returns Future waiting for the answer.
 
+        Timeout argument overrides connection-wide command timeout;
+        when reply is not received in time the Future gets
+        asyncio.TimeoutError and connection is closed as replies
+        order can not be trusted anymore.
+
         Raises:
         * TypeError if any of args can not be encoded as bytes.
         * ReplyError on redis '-ERR' resonses.
         * ProtocolError when response can not be decoded meaning connection
           is broken.
         """
+        return self._execute(None, command, args, encoding, timeout)
+
+    def execute_pipeline(self, commands):
+        """Executes commands writing them to transport at once.
+
+        Commands is an iterable of ``(fut, command, args, kwargs)``
+        tuples; reply of every command is set to its ``fut``
+        (no other future is created), kwargs are the same as for
+        :meth:`execute`. Errors raised for a command (eg TypeError
+        for bad argument) are set to its ``fut`` as well.
+        """
+        self._batch = batch = bytearray()
+        try:
+            for fut, command, args, kw in commands:
+                try:
+                    self._execute(fut, command, args, **kw)
+                except Exception as exc:
+                    _set_exception(fut, exc)
+        finally:
+            self._batch = None
+            if batch:
+                self._writer.write(batch)
+
+    def execute_encoded(self, data, waiters):
+        """Writes pre-encoded commands to transport at once.
+
+        ``data`` must contain exactly one RESP encoded command for every
+        ``(fut, encoding, callback)`` item of ``waiters``; reply of
+        command is decoded with encoding (``_NOTSET`` for connection
+        encoding), passed to callback (if not None) and set to its ``fut``.
+        Commands changing connection state (``SELECT``, ``MULTI``,
+        Pub/Sub commands, etc) must not be executed this way.
+        """
         if self._reader is None or self._reader.at_eof():
             msg = self._close_msg or "Connection closed or corrupted"
             raise ConnectionClosedError(msg)
+        if self._in_pubsub:
+            raise RedisError("Connection in SUBSCRIBE mode")
+        if self._bulk is not None:
+            raise RedisError("Connection is busy with bulk load")
+        if not self._waiters:
+            self._progress_at = self._loop.time()
+        timeout = self._command_timeout
+        for fut, encoding, cb in waiters:
+            if encoding is _NOTSET:
+                encoding = self._encoding
+            self._waiters.append((fut, encoding, cb))
+            if timeout is not None:
+                self._add_deadline(fut, timeout)
+        self._writer.write(data)
+
+    def execute_multi(self, commands):
+        """Executes commands in MULTI/EXEC block writing it to transport
+        at once.
+
+        Commands is a list of ``(fut, command, args, kwargs)`` tuples
+        (same as for :meth:`execute_pipeline`). ``MULTI`` and ``QUEUED``
+        replies are only counted (no future is created for them),
+        items of ``EXEC`` reply are set right to commands futures.
+        Error replied to command instead of ``QUEUED`` is set to its
+        future, ``EXEC`` error (eg ``EXECABORT``) is set to the other
+        futures; if transaction was aborted by ``WATCH`` futures get
+        WatchVariableError.
+
+        Returns future done when ``EXEC`` reply is received.
+
+        Raises:
+        * RedisError if connection is in SUBSCRIBE mode, MULTI/EXEC block
+          or bulk load.
+        """
+        if self._reader is None or self._reader.at_eof():
+            msg = self._close_msg or "Connection closed or corrupted"
+            raise ConnectionClosedError(msg)
+        if self._in_pubsub:
+            raise RedisError("Connection in SUBSCRIBE mode")
+        if self._in_transaction is not None:
+            raise RedisError("Connection in MULTI/EXEC block")
+        if self._bulk is not None:
+            raise RedisError("Connection is busy with bulk load")
+        data = bytearray(_MULTI)
+        queued = []
+        timeouts = set()
+        for fut, command, args, kw in commands:
+            try:
+                encoding, timeout = self._check_queued(command, args, **kw)
+                data += encode_command(command, *args)
+            except Exception as exc:
+                _set_exception(fut, exc)
+            else:
+                queued.append((fut, encoding))
+                timeouts.add(timeout)
+        exec_fut = self._loop.create_future()
+        if not queued:
+            exec_fut.set_result([])
+            return exec_fut
+        data += _EXEC
+        replies = _QueuedReplies(self, queued)
+        exec_fut.add_done_callback(replies.resolve)
+        if not self._waiters:
+            self._progress_at = self._loop.time()
+        self._waiters.append(replies.entry)
+        self._waiters.append((exec_fut, None, None))
+        # EXEC reply waits for the slowest command
+        if None not in timeouts:
+            self._add_deadline(exec_fut, max(timeouts))
+        self._writer.write(data)
+        return exec_fut
+
+    def _check_queued(self, command, args,
+                      encoding=_NOTSET, timeout=_NOTSET):
+        if command is None:
+            raise TypeError("command must not be None")
+        if None in args:
+            raise TypeError("args must not contain None")
+        if command.upper().strip() in _MULTI_FORBIDDEN:
+            raise ValueError("Command {!r} can not be executed in MULTI/EXEC"
+                             " block".format(command))
+        if encoding is _NOTSET:
+            encoding = self._encoding
+        if timeout is _NOTSET:
+            timeout = self._command_timeout
+        elif timeout is not None and timeout <= 0:
+            raise ValueError(
+                "Timeout has to be None or a number greater than 0")
+        return encoding, timeout
+
+    def _execute(self, fut, command, args,
+                 encoding=_NOTSET, timeout=_NOTSET):
+        if self._reader is None or self._reader.at_eof():
+            msg = self._close_msg or "Connection closed or corrupted"
+            raise ConnectionClosedError(msg)
+        if self._bulk is not None:
+            raise RedisError("Connection is busy with bulk load")
         if command is None:
             raise TypeError("command must not be None")
         if None in args:
@@ -296,7 +529,10 @@ class RedisConnection(AbcConnection):
             raise RedisError("Connection in SUBSCRIBE mode")
         elif is_pubsub:
             logger.warning("Deprecated. Use `execute_pubsub` method directly")
-            return self.execute_pubsub(command, *args)
+            res = self.execute_pubsub(command, *args)
+            if fut is not None:
+                res.add_done_callback(partial(_chain_result, fut))
+            return res
 
         if command in ('SELECT', b'SELECT'):
             cb = partial(self._set_db, args=args)
@@ -310,11 +546,209 @@ class RedisConnection(AbcConnection):
             cb = None
         if encoding is _NOTSET:
             encoding = self._encoding
-        fut = self._loop.create_future()
-        self._writer.write(encode_command(command, *args))
+        if timeout is _NOTSET:
+            timeout = self._command_timeout
+        elif timeout is not None and timeout <= 0:
+            raise ValueError(
+                "Timeout has to be None or a number greater than 0")
+        if fut is None:
+            fut = self._loop.create_future()
+        if self._batch is None:
+            self._writer.write(encode_command(command, *args))
+        else:
+            self._batch += encode_command(command, *args)
+        if not self._waiters:
+            self._progress_at = self._loop.time()
         self._waiters.append((fut, encoding, cb))
+        if timeout is not None:
+            self._add_deadline(fut, timeout)
         return fut
 
+    def _add_deadline(self, fut, timeout):
+        # Deadlines are kept in commands order (as replies are),
+        # so entry is dropped as soon as its reply is processed;
+        # all pending commands share single timer.
+        deadline = self._loop.time() + timeout
+        self._deadlines.append((deadline, fut))
+        if self._timeout_at is None or deadline < self._timeout_at:
+            self._schedule_deadline(deadline)
+
+    def _schedule_deadline(self, deadline):
+        if self._timeout_handle is not None:
+            self._timeout_handle.cancel()
+        self._timeout_at = deadline
+        self._timeout_handle = self._loop.call_at(
+            deadline, self._check_deadlines)
+
+    def _check_deadlines(self):
+        self._timeout_handle = self._timeout_at = None
+        deadlines = self._deadlines
+        while deadlines and deadlines[0][1].done():
+            deadlines.popleft()
+        if not deadlines:
+            return
+        deadline, fut = min(deadlines, key=lambda item: item[0])
+        if deadline > self._loop.time():
+            self._schedule_deadline(deadline)
+        else:
+            self._command_timed_out(fut)
+
+    def _command_timed_out(self, fut):
+        logger.debug("Command timed out, closing connection %r", self)
+        self._waiters = deque(w for w in self._waiters if w[0] is not fut)
+        _set_exception(fut, asyncio.TimeoutError())
+        self._do_close(ConnectionClosedError(
+            "Connection closed after command timeout"))
+
+    def _clear_deadlines(self):
+        self._deadlines.clear()
+        if self._timeout_handle is not None:
+            self._timeout_handle.cancel()
+        self._timeout_handle = self._timeout_at = None
+
+    def execute_noreply(self, command, *args):
+        """Executes redis command without waiting for the answer.
+
+        Command is prefixed with ``CLIENT REPLY SKIP`` so server never
+        sends its reply (including error replies); no Future is created.
+        Requires Redis 3.2 or later.
+
+        Raises:
+        * TypeError if any of args can not be encoded as bytes.
+        * ValueError for commands changing connection state.
+        * RedisError if connection is in SUBSCRIBE mode or MULTI/EXEC block.
+        """
+        if self._reader is None or self._reader.at_eof():
+            msg = self._close_msg or "Connection closed or corrupted"
+            raise ConnectionClosedError(msg)
+        if command is None:
+            raise TypeError("command must not be None")
+        if None in args:
+            raise TypeError("args must not contain None")
+        command = command.upper().strip()
+        if command in _NOREPLY_FORBIDDEN:
+            raise ValueError("Command {!r} can not be executed without reply"
+                             .format(command))
+        if self._in_pubsub:
+            raise RedisError("Connection in SUBSCRIBE mode")
+        if self._in_transaction is not None:
+            raise RedisError("Connection in MULTI/EXEC block")
+        if self._bulk is not None:
+            raise RedisError("Connection is busy with bulk load")
+        self._writer.write(_CLIENT_REPLY_SKIP + encode_command(command, *args))
+
+    async def bulk_load(self, source, *, chunk_size=BULK_CHUNK_SIZE):
+        """Loads bulk of commands (like ``redis-cli --pipe``).
+
+        Source is an iterable or async iterable of ``(command, *args)``
+        tuples, path to file with raw RESP commands or binary file object
+        with such content; regular files are written to socket right
+        from memory map, without re-encoding.
+
+        Data is written in chunks of ``chunk_size`` bytes waiting for
+        transport write buffer to drain in between, so memory use stays
+        bounded. Replies are only counted (no future is created per
+        command) until reply to ``ECHO`` marker written after the last
+        command is received.
+
+        Returns BulkLoadResult namedtuple with number of replies,
+        number of error replies, last error, elapsed time (seconds)
+        and rate (replies per second).
+
+        Connection can not execute other commands until load is finished.
+
+        Raises:
+        * TypeError if any command can not be encoded (commands written
+          before are still loaded).
+        * RedisError if connection is in SUBSCRIBE mode, MULTI/EXEC block
+          or another bulk load.
+        * ConnectionClosedError if connection is lost during load.
+        """
+        if self._reader is None or self._reader.at_eof():
+            msg = self._close_msg or "Connection closed or corrupted"
+            raise ConnectionClosedError(msg)
+        if self._in_pubsub:
+            raise RedisError("Connection in SUBSCRIBE mode")
+        if self._in_transaction is not None:
+            raise RedisError("Connection in MULTI/EXEC block")
+        if self._bulk is not None:
+            raise RedisError("Connection is busy with bulk load")
+        assert chunk_size > 0, ("chunk_size must be > 0", chunk_size)
+        marker = b'aioredis:bulk:' + binascii.hexlify(os.urandom(10))
+        started_at = self._loop.time()
+        self._bulk = bulk = _BulkReplies(self, marker)
+        self._waiters.append(bulk.entry)
+        error = None
+        try:
+            if isinstance(source, str) or hasattr(source, '__fspath__'):
+                with open(source, 'rb') as f:
+                    await self._bulk_write_file(f, chunk_size)
+            elif hasattr(source, 'read'):
+                await self._bulk_write_file(source, chunk_size)
+            else:
+                await self._bulk_write_commands(source, chunk_size)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            # wait for replies of commands written so far
+            error = exc
+        finally:
+            if self._writer is not None:
+                self._writer.write(encode_command(b'ECHO', marker))
+        await asyncio.shield(bulk.waiter, loop=self._loop)
+        if error is not None:
+            raise error
+        if bulk.error is not None:
+            raise bulk.error
+        elapsed = self._loop.time() - started_at
+        return BulkLoadResult(bulk.replies, bulk.errors, bulk.last_error,
+                              elapsed,
+                              bulk.replies / elapsed if elapsed else 0.)
+
+    async def _bulk_write(self, data):
+        if self._writer is None:
+            msg = self._close_msg or "Connection closed or corrupted"
+            raise ConnectionClosedError(msg)
+        self._writer.write(data)
+        await self.drain()
+
+    async def _bulk_write_commands(self, commands, chunk_size):
+        buf = bytearray()
+        try:
+            if hasattr(commands, '__aiter__'):
+                async for cmd in commands:
+                    buf += encode_command(*cmd)
+                    if len(buf) >= chunk_size:
+                        await self._bulk_write(buf)
+                        buf = bytearray()
+            else:
+                for cmd in commands:
+                    buf += encode_command(*cmd)
+                    if len(buf) >= chunk_size:
+                        await self._bulk_write(buf)
+                        buf = bytearray()
+        finally:
+            if buf and self._writer is not None:
+                self._writer.write(buf)
+
+    async def _bulk_write_file(self, f, chunk_size):
+        try:
+            fileno = f.fileno()
+            size = os.fstat(fileno).st_size
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            size = 0
+        if size and f.seekable():
+            # mmap is not closed explicitly: transport may still hold
+            # views of it, it is released with the last one.
+            data = memoryview(mmap.mmap(fileno, 0, access=mmap.ACCESS_READ))
+            for pos in range(f.tell(), size, chunk_size):
+                await self._bulk_write(data[pos:pos + chunk_size])
+        else:
+            chunk = f.read(chunk_size)
+            while chunk:
+                await self._bulk_write(chunk)
+                chunk = f.read(chunk_size)
+
     def execute_pubsub(self, command, *channels):
         """Executes redis (p)subscribe/(p)unsubscribe commands.
 
@@ -337,6 +771,8 @@ class RedisConnection(AbcConnection):
         if not all(ch.is_pattern == is_pattern for ch in channels):
             raise ValueError("Not all channels {} match command {}"
                              .format(channels, command))
+        if self._bulk is not None:
+            raise RedisError("Connection is busy with bulk load")
         cmd = encode_command(command, *(ch.name for ch in channels))
         res = []
         for ch in channels:
@@ -357,10 +793,12 @@ class RedisConnection(AbcConnection):
         self._closed = True
         self._closing = False
         self._writer.transport.close()
-        self._reader_task.cancel()
-        self._reader_task = None
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+            self._reader_task = None
         self._writer = None
         self._reader = None
+        self._clear_deadlines()
 
         if exc is not None:
             self._close_msg = str(exc)
@@ -381,6 +819,30 @@ class RedisConnection(AbcConnection):
             logger.debug("Closing pubsub pattern %r", ch)
             ch.close(exc)
 
+    @property
+    def writing_paused(self):
+        """True if transport's write buffer is above its high-water mark."""
+        if self._writer is None:
+            return False
+        protocol = self._writer.transport.get_protocol()
+        return getattr(protocol, 'paused', False)
+
+    async def drain(self):
+        """Wait until transport's write buffer is flushed below
+        its low-water mark.
+
+        Commands are never blocked by :meth:`execute`, so producers
+        writing faster than socket drains should await this coroutine
+        to keep write buffer bounded.
+        """
+        if self._writer is None:
+            msg = self._close_msg or "Connection closed or corrupted"
+            raise ConnectionClosedError(msg)
+        try:
+            await self._writer.drain()
+        except ConnectionError as exc:
+            raise ConnectionClosedError(str(exc)) from exc
+
     @property
     def closed(self):
         """True if connection is closed."""
@@ -441,7 +903,7 @@ class RedisConnection(AbcConnection):
             return obj
         assert isinstance(obj, list) or (obj is None and not discard), (
             "Unexpected MULTI/EXEC result", obj, recall)
-        # TODO: need to be able to re-try transaction
+        # EXEC aborted by WATCH; see `transaction()` command for retries
         if obj is None:
             err = WatchVariableError("WATCH variable has changed")
             obj = [err] * len(recall)
@@ -504,3 +966,163 @@ class RedisConnection(AbcConnection):
         """Authenticate to server."""
         fut = self.execute('AUTH', password)
         return wait_ok(fut)
+
+
+class _BulkReplies:
+    """Counts replies of bulk loaded commands.
+
+    Acts as waiter future staying at the head of connection waiters
+    (it is put back after every reply) until marker reply is received.
+    """
+
+    __slots__ = ('_conn', '_marker', 'entry', 'waiter',
+                 'replies', 'errors', 'last_error', 'error')
+
+    def __init__(self, conn, marker):
+        self._conn = conn
+        self._marker = marker
+        self.entry = (self, None, None)
+        self.waiter = conn._loop.create_future()
+        self.replies = 0
+        self.errors = 0
+        self.last_error = None
+        self.error = None
+
+    def done(self):
+        return self.waiter.done()
+
+    def cancelled(self):
+        return False
+
+    def set_result(self, obj):
+        if obj == self._marker:
+            self._finish()
+        else:
+            self.replies += 1
+            self._conn._waiters.appendleft(self.entry)
+
+    def set_exception(self, exc):
+        if self._conn._closed:
+            self._finish(exc)
+        else:
+            self.replies += 1
+            self.errors += 1
+            self.last_error = exc
+            self._conn._waiters.appendleft(self.entry)
+
+    def _finish(self, exc=None):
+        self._conn._bulk = None
+        self.error = exc
+        self.waiter.set_result(None)
+
+
+class _QueuedReplies:
+    """Counts replies to MULTI and queued commands and sets items
+    of EXEC reply to commands futures.
+
+    Acts as waiter future staying at the head of connection waiters
+    (it is put back after every reply) until reply to the last queued
+    command is received; EXEC reply is set to separate future
+    which resolves commands futures from its done callback.
+    """
+
+    __slots__ = ('_conn', '_queued', '_index', 'entry')
+
+    def __init__(self, conn, queued):
+        self._conn = conn
+        self._queued = queued
+        self._index = -1    # MULTI reply
+        self.entry = (self, None, None)
+
+    def done(self):
+        return self._index >= len(self._queued)
+
+    def cancelled(self):
+        return False
+
+    def set_result(self, obj):
+        self._next()
+
+    def set_exception(self, exc):
+        if self._conn._closed:
+            # EXEC future gets error as well
+            self._index = len(self._queued)
+            return
+        if self._index >= 0:
+            fut, _ = self._queued[self._index]
+            self._queued[self._index] = None
+            _set_exception(fut, exc)
+        self._next()
+
+    def _next(self):
+        self._index += 1
+        if self._index < len(self._queued):
+            self._conn._waiters.appendleft(self.entry)
+
+    def resolve(self, exec_fut):
+        waiters = [w for w in self._queued if w is not None]
+        if exec_fut.cancelled():
+            for fut, _ in waiters:
+                fut.cancel()
+            return
+        exc = exec_fut.exception()
+        if exc is None:
+            results = exec_fut.result()
+            if results is None:
+                exc = WatchVariableError("WATCH variable has changed")
+            elif len(results) != len(waiters):
+                exc = ProtocolError("Wrong number of result items in"
+                                    " multi-exec: {!r}".format(results))
+        if exc is not None:
+            for fut, _ in waiters:
+                _set_exception(fut, exc)
+            return
+        for (fut, encoding), obj in zip(waiters, results):
+            if not isinstance(obj, RedisError) and encoding:
+                try:
+                    obj = decode(obj, encoding)
+                except Exception as err:
+                    obj = err
+            if isinstance(obj, Exception):
+                _set_exception(fut, obj)
+            else:
+                _set_result(fut, obj)
+
+
+class RedisProtocolConnection(RedisConnection):
+    """Redis connection built directly on top of asyncio.Protocol.
+
+    Replies are parsed and dispatched to waiters right from
+    protocol's ``data_received`` callback; there is no reader task
+    and no StreamReader/StreamWriter in between.
+    """
+
+    def __repr__(self):
+        return '<RedisProtocolConnection [db:{}]>'.format(self._db)
+
+    def _start_reading(self):
+        self._reader.lost.add_done_callback(self._close_waiter.set_result)
+        self._reader.set_callbacks(self._reply_received,
+                                   self._connection_error)
+
+    def _reply_received(self, obj):
+        if isinstance(obj, MaxClientsError):
+            self._do_close(obj)
+        elif self._in_pubsub:
+            self._process_pubsub(obj)
+        else:
+            self._process_data(obj)
+
+    def _connection_error(self, exc):
+        if exc is None:
+            exc = ConnectionClosedError("Connection has been closed by server")
+        elif isinstance(exc, ProtocolError):
+            if self._in_transaction is not None:
+                self._transaction_error = exc
+        self._do_close(exc)
+
+    def _do_close(self, exc):
+        if self._closed:
+            return
+        self._reader.unset_callbacks()
+        super()._do_close(exc)
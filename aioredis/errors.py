@@ -4,6 +4,7 @@ __all__ = [
     'ReplyError',
     'MaxClientsError',
     'AuthError',
+    'NoScriptError',
     'PipelineError',
     'MultiExecError',
     'WatchVariableError',
@@ -50,6 +51,12 @@ class AuthError(ReplyError):
     MATCH_REPLY = ("NOAUTH ", "ERR invalid password")
 
 
+class NoScriptError(ReplyError):
+    """Raised for EVALSHA of script missing in server scripts cache."""
+
+    MATCH_REPLY = "NOSCRIPT "
+
+
 class PipelineError(RedisError):
     """Raised if command within pipeline raised error."""
 
@@ -0,0 +1,170 @@
+from bisect import bisect_left
+from collections import Counter
+
+__all__ = ['Histogram', 'PoolMetrics']
+
+
+# upper bounds of latency buckets (in seconds)
+LATENCY_BUCKETS = (
+    .0001, .00025, .0005, .001, .0025, .005, .01, .025, .05,
+    .1, .25, .5, 1, 2.5, 5, 10,
+    )
+
+# upper bounds of in-flight commands buckets
+IN_FLIGHT_BUCKETS = (0, 1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+
+# upper bounds of transaction retries buckets
+RETRIES_BUCKETS = (0, 1, 2, 4, 8, 16, 32)
+
+# max number of distinct keys tracked in conflict_keys
+MAX_CONFLICT_KEYS = 1000
+
+
+class Histogram:
+    """Fixed buckets histogram.
+
+    Values above the last bound are counted in overflow bucket.
+    Observing value costs single bisect over bounds.
+    """
+
+    __slots__ = ('bounds', 'counts', 'count', 'sum', 'max')
+
+    def __init__(self, bounds):
+        self.bounds = tuple(bounds)
+        self.reset()
+
+    def reset(self):
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0
+        self.max = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q):
+        """Upper bound of bucket containing q-quantile
+        (max observed value for overflow bucket).
+        """
+        assert 0 <= q <= 1, q
+        if not self.count:
+            return 0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank and seen:
+                return min(bound, self.max)
+        return self.max
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'max': self.max,
+            'mean': self.sum / self.count if self.count else 0,
+            'p50': self.quantile(.5),
+            'p90': self.quantile(.9),
+            'p99': self.quantile(.99),
+            'buckets': list(zip(self.bounds + (float('inf'),), self.counts)),
+            }
+
+
+class PoolMetrics:
+    """Connections pool metrics.
+
+    Histograms:
+
+    * ``acquire_wait`` -- time spent in ``acquire()`` (seconds);
+    * ``create_latency`` -- time to open new connection (seconds);
+    * ``in_flight`` -- pending commands on connection command
+      is sent through (sampled on every pool ``execute()``);
+    * ``transaction_retries`` -- WATCH conflicts retries per
+      ``transaction()`` call.
+
+    Counters:
+
+    * ``created`` / ``create_errors`` -- connections opened / failed to open;
+    * ``closed`` -- connections closed or dropped by pool;
+    * ``acquired`` / ``waits`` -- acquired connections / acquires
+      which had to wait for released connection;
+    * ``shared`` -- commands not sent as they shared reply of identical
+      command in flight (single-flight mode);
+    * ``transactions`` / ``transaction_conflicts`` /
+      ``transaction_aborts`` -- ``transaction()`` calls / WATCH
+      conflicts / transactions given up after max retries;
+    * ``conflict_keys`` -- WATCH conflicts per watched key
+      (first 1000 distinct keys are tracked), snapshot includes
+      10 most common.
+
+    If callback is set pool calls it with ``snapshot()`` every interval
+    seconds.
+    """
+
+    def __init__(self, *, callback=None, interval=10.0):
+        assert interval > 0, ("interval must be > 0", interval)
+        self.callback = callback
+        self.interval = interval
+        self.acquire_wait = Histogram(LATENCY_BUCKETS)
+        self.create_latency = Histogram(LATENCY_BUCKETS)
+        self.in_flight = Histogram(IN_FLIGHT_BUCKETS)
+        self.transaction_retries = Histogram(RETRIES_BUCKETS)
+        self.conflict_keys = Counter()
+        self._gauges = None
+        self.reset()
+
+    def reset(self):
+        """Reset all counters and histograms."""
+        self.created = 0
+        self.create_errors = 0
+        self.closed = 0
+        self.acquired = 0
+        self.waits = 0
+        self.shared = 0
+        self.transactions = 0
+        self.transaction_conflicts = 0
+        self.transaction_aborts = 0
+        self.acquire_wait.reset()
+        self.create_latency.reset()
+        self.in_flight.reset()
+        self.transaction_retries.reset()
+        self.conflict_keys.clear()
+
+    def watch_conflict(self, keys):
+        """Count WATCH conflict of transaction watching keys."""
+        self.transaction_conflicts += 1
+        counter = self.conflict_keys
+        for key in keys:
+            if key in counter or len(counter) < MAX_CONFLICT_KEYS:
+                counter[key] += 1
+
+    def bind(self, gauges):
+        """Set callable returning dict of current pool gauges
+        (size, freesize, etc) to include in snapshot.
+        """
+        self._gauges = gauges
+
+    def snapshot(self):
+        """Return dict with current gauges, counters and histograms."""
+        res = self._gauges() if self._gauges is not None else {}
+        res.update({
+            'created': self.created,
+            'create_errors': self.create_errors,
+            'closed': self.closed,
+            'acquired': self.acquired,
+            'waits': self.waits,
+            'shared': self.shared,
+            'transactions': self.transactions,
+            'transaction_conflicts': self.transaction_conflicts,
+            'transaction_aborts': self.transaction_aborts,
+            'conflict_keys': self.conflict_keys.most_common(10),
+            'acquire_wait': self.acquire_wait.snapshot(),
+            'create_latency': self.create_latency.snapshot(),
+            'in_flight': self.in_flight.snapshot(),
+            'transaction_retries': self.transaction_retries.snapshot(),
+            })
+        return res
@@ -1,19 +1,87 @@
 import asyncio
 import collections
+import functools
 import types
 
-from .connection import create_connection, _PUBSUB_COMMANDS
+from .connection import (
+    create_connection,
+    _PUBSUB_COMMANDS,
+    _NOREPLY_FORBIDDEN,
+    )
 from .log import logger
-from .util import parse_url
-from .errors import PoolClosedError
+from .util import parse_url, encode_command, _chain_result, _NOTSET
+from .errors import PoolClosedError, RedisError
 from .abc import AbcPool
 from .locks import Lock
 
 
+# busy connection which got no reply for that long is considered stalled
+_STALL_TIME = 0.01
+
+# Commands which block connection until some event happens.
+_BLOCKING_COMMANDS = (
+    'BLPOP', b'BLPOP',
+    'BRPOP', b'BRPOP',
+    'BRPOPLPUSH', b'BRPOPLPUSH',
+    'BZPOPMIN', b'BZPOPMIN',
+    'BZPOPMAX', b'BZPOPMAX',
+    'WAIT', b'WAIT',
+    )
+
+# Commands which must be executed on exclusively acquired connection.
+_TRANSACTION_COMMANDS = (
+    'WATCH', b'WATCH',
+    'UNWATCH', b'UNWATCH',
+    'MULTI', b'MULTI',
+    'EXEC', b'EXEC',
+    'DISCARD', b'DISCARD',
+    )
+
+
+# read-only commands (executed on replicas by ReplicatedPool)
+READONLY_COMMANDS = frozenset([
+    # generic
+    'EXISTS', 'TYPE', 'TTL', 'PTTL', 'KEYS', 'SCAN', 'RANDOMKEY',
+    'DBSIZE', 'DUMP', 'OBJECT', 'TOUCH',
+    # strings
+    'GET', 'MGET', 'STRLEN', 'GETRANGE', 'SUBSTR', 'GETBIT',
+    'BITCOUNT', 'BITPOS',
+    # hashes
+    'HGET', 'HMGET', 'HGETALL', 'HKEYS', 'HVALS', 'HLEN', 'HEXISTS',
+    'HSTRLEN', 'HSCAN',
+    # lists
+    'LRANGE', 'LLEN', 'LINDEX', 'LPOS',
+    # sets
+    'SMEMBERS', 'SISMEMBER', 'SMISMEMBER', 'SCARD', 'SRANDMEMBER',
+    'SINTER', 'SUNION', 'SDIFF', 'SSCAN',
+    # sorted sets
+    'ZRANGE', 'ZREVRANGE', 'ZRANGEBYSCORE', 'ZREVRANGEBYSCORE',
+    'ZRANGEBYLEX', 'ZREVRANGEBYLEX', 'ZSCORE', 'ZMSCORE', 'ZRANK',
+    'ZREVRANK', 'ZCARD', 'ZCOUNT', 'ZLEXCOUNT', 'ZSCAN',
+    # geo
+    'GEOPOS', 'GEODIST', 'GEOHASH', 'GEORADIUS_RO',
+    'GEORADIUSBYMEMBER_RO',
+    # streams
+    'XRANGE', 'XREVRANGE', 'XLEN',
+    ])
+
+# Commands identical calls of which share reply in single-flight mode
+# (random replies are not shared).
+_SINGLE_FLIGHT_COMMANDS = READONLY_COMMANDS - {'RANDOMKEY', 'SRANDMEMBER'}
+_SINGLE_FLIGHT_COMMANDS |= {
+    cmd.encode('ascii') for cmd in _SINGLE_FLIGHT_COMMANDS}
+
+
 async def create_pool(address, *, db=None, password=None, ssl=None,
                       encoding=None, minsize=1, maxsize=10,
                       parser=None, loop=None, create_connection_timeout=None,
-                      pool_cls=None, connection_cls=None):
+                      pool_cls=None, connection_cls=None,
+                      write_buffer_limits=None, command_timeout=None,
+                      name=None, create_connection_parallelism=5,
+                      max_idle_time=None, max_lifetime=None,
+                      multiplex=False, blocking_maxsize=None,
+                      metrics=None, multi_db=False, single_flight=None,
+                      bulk_maxsize=None):
     # FIXME: rewrite docstring
     """Creates Redis Pool.
 
@@ -51,6 +119,18 @@ async def create_pool(address, *, db=None, password=None, ssl=None,
                ssl=ssl, parser=parser,
                create_connection_timeout=create_connection_timeout,
                connection_cls=connection_cls,
+               write_buffer_limits=write_buffer_limits,
+               command_timeout=command_timeout,
+               name=name,
+               create_connection_parallelism=create_connection_parallelism,
+               max_idle_time=max_idle_time,
+               max_lifetime=max_lifetime,
+               multiplex=multiplex,
+               blocking_maxsize=blocking_maxsize,
+               metrics=metrics,
+               multi_db=multi_db,
+               single_flight=single_flight,
+               bulk_maxsize=bulk_maxsize,
                loop=loop)
     try:
         await pool._fill_free(override_min=False)
@@ -68,9 +148,31 @@ class ConnectionsPool(AbcPool):
                  *, minsize, maxsize, ssl=None, parser=None,
                  create_connection_timeout=None,
                  connection_cls=None,
+                 write_buffer_limits=None,
+                 command_timeout=None,
+                 name=None,
+                 create_connection_parallelism=5,
+                 max_idle_time=None,
+                 max_lifetime=None,
+                 multiplex=False,
+                 blocking_maxsize=None,
+                 metrics=None,
+                 multi_db=False,
+                 single_flight=None,
+                 bulk_maxsize=None,
                  loop=None):
         assert isinstance(minsize, int) and minsize >= 0, (
             "minsize must be int >= 0", minsize, type(minsize))
+        assert (isinstance(create_connection_parallelism, int) and
+                create_connection_parallelism > 0), (
+            "create_connection_parallelism must be int > 0",
+            create_connection_parallelism)
+        assert max_idle_time is None or max_idle_time > 0, (
+            "max_idle_time must be None or > 0", max_idle_time)
+        assert max_lifetime is None or max_lifetime > 0, (
+            "max_lifetime must be None or > 0", max_lifetime)
+        assert single_flight is None or single_flight > 0, (
+            "single_flight must be None or > 0", single_flight)
         assert maxsize is not None, "Arbitrary pool size is disallowed."
         assert isinstance(maxsize, int) and maxsize > 0, (
             "maxsize must be int > 0", maxsize, type(maxsize))
@@ -90,11 +192,67 @@ class ConnectionsPool(AbcPool):
         self._pool = collections.deque(maxlen=maxsize)
         self._used = set()
         self._acquiring = 0
+        self._acquire_waiters = collections.deque()
         self._cond = asyncio.Condition(lock=Lock(loop=loop), loop=loop)
         self._close_state = asyncio.Event(loop=loop)
         self._close_waiter = None
         self._pubsub_conn = None
         self._connection_cls = connection_cls
+        self._write_buffer_limits = write_buffer_limits
+        self._command_timeout = command_timeout
+        self._name = name
+        self._create_connection_parallelism = create_connection_parallelism
+        self._max_idle_time = max_idle_time
+        self._max_lifetime = max_lifetime
+        self._created_at = {}
+        self._maintenance_task = None
+        self._multiplex = multiplex
+        self._multi_db = multi_db
+        self._single_flight = single_flight
+        self._flights = {}
+        self._blocking_pool = None
+        if blocking_maxsize is not None:
+            # blocking commands are executed on separate connections,
+            # so they never delay other commands; no command timeout
+            # is applied as blocking commands have their own one.
+            self._blocking_pool = ConnectionsPool(
+                address, db, password, encoding,
+                minsize=0, maxsize=blocking_maxsize,
+                ssl=ssl, parser=parser,
+                create_connection_timeout=create_connection_timeout,
+                connection_cls=connection_cls,
+                write_buffer_limits=write_buffer_limits,
+                name=name,
+                create_connection_parallelism=create_connection_parallelism,
+                multi_db=multi_db,
+                loop=loop)
+        self._bulk_pool = None
+        if bulk_maxsize is not None:
+            # bulk traffic (big pipelines, scans, bulk loads) is written
+            # to separate connections, so interactive commands are never
+            # queued behind it; no command timeout is applied either.
+            self._bulk_pool = ConnectionsPool(
+                address, db, password, encoding,
+                minsize=0, maxsize=bulk_maxsize,
+                ssl=ssl, parser=parser,
+                create_connection_timeout=create_connection_timeout,
+                connection_cls=connection_cls,
+                write_buffer_limits=write_buffer_limits,
+                name=name,
+                create_connection_parallelism=create_connection_parallelism,
+                multi_db=multi_db,
+                loop=loop)
+        if max_idle_time or max_lifetime:
+            interval = min(t for t in (max_idle_time, max_lifetime) if t) / 2
+            self._maintenance_task = asyncio.ensure_future(
+                self._maintenance(interval), loop=loop)
+        self._metrics = metrics
+        self._metrics_task = None
+        if metrics is not None:
+            metrics.bind(self._metrics_gauges)
+            if metrics.callback is not None:
+                self._metrics_task = asyncio.ensure_future(
+                    self._export_metrics(metrics), loop=loop)
 
     def __repr__(self):
         return '<{} [db:{}, size:[{}:{}], free:{}]>'.format(
@@ -125,6 +283,57 @@ class ConnectionsPool(AbcPool):
     def address(self):
         return self._address
 
+    @property
+    def multiplex(self):
+        """True if pool is in multiplex mode."""
+        return self._multiplex
+
+    @property
+    def multi_db(self):
+        """True if pool keeps connections to different db indexes."""
+        return self._multi_db
+
+    @property
+    def single_flight(self):
+        """Max age (in seconds) of in-flight read-only command identical
+        commands share reply of, or None if single-flight is disabled.
+        """
+        return self._single_flight
+
+    @property
+    def blocking_pool(self):
+        """Pool of connections for blocking commands or None."""
+        return self._blocking_pool
+
+    @property
+    def bulk_pool(self):
+        """Pool of connections for bulk traffic or None."""
+        return self._bulk_pool
+
+    @property
+    def metrics(self):
+        """Pool metrics (PoolMetrics instance) or None."""
+        return self._metrics
+
+    def _metrics_gauges(self):
+        return {
+            'size': self.size,
+            'freesize': self.freesize,
+            'used': len(self._used),
+            'acquiring': self._acquiring,
+            'acquire_waiters': len(self._acquire_waiters),
+            'maxsize': self.maxsize,
+            }
+
+    async def _export_metrics(self, metrics):
+        """Periodically pass metrics snapshot to metrics callback."""
+        while True:
+            await asyncio.sleep(metrics.interval, loop=self._loop)
+            try:
+                metrics.callback(metrics.snapshot())
+            except Exception as exc:
+                logger.warning("Pool metrics callback failed: %r", exc)
+
     async def clear(self):
         """Clear pool connections.
 
@@ -139,6 +348,8 @@ class ConnectionsPool(AbcPool):
             conn = self._pool.popleft()
             conn.close()
             waiters.append(conn.wait_closed())
+        if self._metrics is not None:
+            self._metrics.closed += len(waiters)
         await asyncio.gather(*waiters, loop=self._loop)
 
     async def _do_close(self):
@@ -150,6 +361,9 @@ class ConnectionsPool(AbcPool):
                 conn = self._pool.popleft()
                 conn.close()
                 waiters.append(conn.wait_closed())
+            if self._metrics is not None:
+                # used connections are counted when released
+                self._metrics.closed += len(waiters)
             for conn in self._used:
                 conn.close()
                 waiters.append(conn.wait_closed())
@@ -164,6 +378,20 @@ class ConnectionsPool(AbcPool):
             self._close_waiter = asyncio.ensure_future(self._do_close(),
                                                        loop=self._loop)
             self._close_state.set()
+            if self._blocking_pool is not None:
+                self._blocking_pool.close()
+            if self._bulk_pool is not None:
+                self._bulk_pool.close()
+            if self._maintenance_task is not None:
+                self._maintenance_task.cancel()
+                self._maintenance_task = None
+            if self._metrics_task is not None:
+                self._metrics_task.cancel()
+                self._metrics_task = None
+            while self._acquire_waiters:
+                fut = self._acquire_waiters.popleft()
+                if not fut.done():
+                    fut.set_exception(PoolClosedError("Pool is closed"))
 
     @property
     def closed(self):
@@ -175,6 +403,10 @@ class ConnectionsPool(AbcPool):
         await self._close_state.wait()
         assert self._close_waiter is not None
         await asyncio.shield(self._close_waiter, loop=self._loop)
+        if self._blocking_pool is not None:
+            await self._blocking_pool.wait_closed()
+        if self._bulk_pool is not None:
+            await self._bulk_pool.wait_closed()
 
     @property
     def db(self):
@@ -194,15 +426,132 @@ class ConnectionsPool(AbcPool):
         that connection.
         If no connection is found, returns coroutine waiting for
         free connection to execute command.
+
+        Blocking commands are executed on connections from separate
+        pool if blocking_maxsize is set.
+        In multiplex mode blocking commands are executed on exclusively
+        acquired connection; transaction commands are not allowed.
+
+        In multi_db mode command is executed on connection
+        with db index passed in ``db`` keyword argument (pool db
+        by default).
+
+        In single-flight mode read-only command identical to one
+        sent no more than ``single_flight`` seconds ago and still
+        waiting for reply is not sent, its caller gets the same reply.
         """
-        conn, address = self.get_connection(command, args)
+        db = kw.pop('db', None) if self._multi_db else None
+        if self._single_flight is not None and command is not None:
+            cmd = command.upper().strip()
+            if cmd in _SINGLE_FLIGHT_COMMANDS:
+                # encoded command is compared (1, 1.0 and True are equal
+                # in Python); bad arguments error is raised by _execute
+                try:
+                    data = bytes(encode_command(cmd, *args))
+                except TypeError:
+                    pass
+                else:
+                    key = (data, kw.get('encoding', _NOTSET), db)
+                    return self._execute_shared(key, command, args, kw, db)
+        return self._execute(command, args, kw, db)
+
+    def _execute_shared(self, key, command, args, kw, db):
+        now = self._loop.time()
+        flight = self._flights.get(key)
+        if flight is None or now - flight[1] > self._single_flight:
+            res = self._execute(command, args, kw, db)
+            if not asyncio.isfuture(res):
+                res = asyncio.ensure_future(res, loop=self._loop)
+            flight = (res, now)
+            self._flights[key] = flight
+            res.add_done_callback(
+                functools.partial(self._flight_done, key, flight))
+        elif self._metrics is not None:
+            self._metrics.shared += 1
+        # caller cancelling its future does not affect the others
+        waiter = self._loop.create_future()
+        flight[0].add_done_callback(functools.partial(_chain_result, waiter))
+        return waiter
+
+    def _flight_done(self, key, flight, fut):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def _execute(self, command, args, kw, db):
+        if self._multiplex or self._blocking_pool is not None:
+            cmd = command.upper().strip()
+            if cmd in _BLOCKING_COMMANDS:
+                pool = self._blocking_pool or self
+                if self._multi_db:
+                    coro = pool._wait_execute_db(
+                        self.db if db is None else db, command, args, kw)
+                else:
+                    coro = pool._wait_execute(pool.address, command, args, kw)
+                return self._check_result(coro, command, args, kw)
+            if self._multiplex and cmd in _TRANSACTION_COMMANDS:
+                raise RedisError(
+                    "{!r} can not be executed on shared connection;"
+                    " acquire connection first".format(command))
+        if self._multi_db:
+            conn, address = self.get_connection(command, args, db=db)
+        else:
+            conn, address = self.get_connection(command, args)
         if conn is not None:
+            if self._metrics is not None:
+                self._metrics.in_flight.observe(len(conn._waiters))
             fut = conn.execute(command, *args, **kw)
             return self._check_result(fut, command, args, kw)
+        elif self._multi_db:
+            coro = self._wait_execute_db(db, command, args, kw)
+            return self._check_result(coro, command, args, kw)
+        elif self._multiplex:
+            coro = self._wait_execute_shared(address, command, args, kw)
+            return self._check_result(coro, command, args, kw)
         else:
             coro = self._wait_execute(address, command, args, kw)
             return self._check_result(coro, command, args, kw)
 
+    async def execute_noreply(self, command, *args):
+        """Executes redis command in a free connection without
+        waiting for the answer.
+
+        Coroutine returns None once command is written; it waits
+        for a free connection only if there is none at the moment.
+
+        Raises:
+        * TypeError if command is None or any of args can not be encoded.
+        * ValueError for commands changing connection state
+          (checked before any connection is taken from the pool).
+        * PoolClosedError if pool is closed.
+        * Connection errors if connection can not be created or is closed.
+        """
+        if command is None:
+            raise TypeError("command must not be None")
+        if command.upper().strip() in _NOREPLY_FORBIDDEN:
+            raise ValueError("Command {!r} can not be executed without reply"
+                             .format(command))
+        conn, address = self.get_connection(command, args)
+        if conn is not None:
+            conn.execute_noreply(command, *args)
+            return
+        conn = await self.acquire(command, args)
+        try:
+            conn.execute_noreply(command, *args)
+        finally:
+            self.release(conn)
+
+    async def bulk_load(self, source, **kwargs):
+        """Loads bulk of commands through exclusively acquired connection.
+
+        See :meth:`RedisConnection.bulk_load` for arguments
+        and result description.
+        """
+        conn = await self.acquire()
+        try:
+            return await conn.bulk_load(source, **kwargs)
+        finally:
+            self.release(conn)
+
     def execute_pubsub(self, command, *channels):
         """Executes Redis (p)subscribe/(p)unsubscribe commands.
 
@@ -222,33 +571,58 @@ class ConnectionsPool(AbcPool):
         else:
             return self._wait_execute_pubsub(address, command, channels, {})
 
-    def get_connection(self, command, args=()):
+    def get_connection(self, command, args=(), db=None):
         """Get free connection from pool.
 
+        Idle connection (with no pending commands) is returned at once;
+        otherwise the least loaded one is picked, preferring connections
+        which write buffer is below the high-water mark, then ones
+        that are not stalled by slow command, then ones with fewest
+        pending commands.
+        In multi_db mode only connections with requested db index
+        (pool db by default) are considered.
+
         Returns connection.
         """
-        # TODO: find a better way to determine if connection is free
-        #       and not havily used.
         command = command.upper().strip()
         is_pubsub = command in _PUBSUB_COMMANDS
         if is_pubsub and self._pubsub_conn:
             if not self._pubsub_conn.closed:
                 return self._pubsub_conn, self._pubsub_conn.address
             self._pubsub_conn = None
+        best = best_load = None
+        now = self._loop.time()
+        if self._multi_db:
+            want = self.db if db is None else db
         for i in range(self.freesize):
             conn = self._pool[0]
             self._pool.rotate(1)
-            if conn.closed:  # or conn._waiters: (eg: busy connection)
+            if conn.closed:
                 continue
             if conn.in_pubsub:
                 continue
-            if is_pubsub:
-                self._pubsub_conn = conn
-                self._pool.remove(conn)
-                self._used.add(conn)
-            return conn, conn.address
+            if self._multi_db and conn.db != want:
+                continue
+            paused = getattr(conn, 'writing_paused', False)
+            pending = len(conn._waiters)
+            if not pending and not paused:
+                return self._take_connection(conn, is_pubsub)
+            stalled = bool(pending) and (
+                now - getattr(conn, '_progress_at', now) > _STALL_TIME)
+            load = (paused, stalled, pending)
+            if best is None or load < best_load:
+                best, best_load = conn, load
+        if best is not None:
+            return self._take_connection(best, is_pubsub)
         return None, self._address  # figure out
 
+    def _take_connection(self, conn, is_pubsub):
+        if is_pubsub:
+            self._pubsub_conn = conn
+            self._pool.remove(conn)
+            self._used.add(conn)
+        return conn, conn.address
+
     def _check_result(self, fut, *data):
         """Hook to check result or catch exception (like MovedError).
 
@@ -264,6 +638,35 @@ class ConnectionsPool(AbcPool):
         finally:
             self.release(conn)
 
+    async def _wait_execute_db(self, db, command, args, kw):
+        """Acquire connection with db index and execute command;
+        in multiplex mode connection is released without waiting
+        for reply.
+        """
+        conn = await self.acquire(command, args, db=db)
+        if self._metrics is not None:
+            self._metrics.in_flight.observe(len(conn._waiters))
+        try:
+            fut = conn.execute(command, *args, **kw)
+            if not self._multiplex:
+                return (await fut)
+        finally:
+            self.release(conn)
+        return (await fut)
+
+    async def _wait_execute_shared(self, address, command, args, kw):
+        """Acquire connection, send command and release connection
+        without waiting for reply.
+        """
+        conn = await self.acquire(command, args)
+        if self._metrics is not None:
+            self._metrics.in_flight.observe(len(conn._waiters))
+        try:
+            fut = conn.execute(command, *args, **kw)
+        finally:
+            self.release(conn)
+        return (await fut)
+
     async def _wait_execute_pubsub(self, address, command, args, kw):
         if self.closed:
             raise PoolClosedError("Pool is closed")
@@ -282,13 +685,26 @@ class ConnectionsPool(AbcPool):
         """Changes db index for all free connections.
 
         All previously acquired connections will be closed when released.
+        In multi_db mode only default db index is changed.
         """
+        if self._multi_db:
+            conn = await self.acquire()
+            try:
+                await conn.select(db)
+            finally:
+                self.release(conn)
+            self._db = db
+            return True
         res = True
         with (await self._cond):
             for i in range(self.freesize):
                 res = res and (await self._pool[i].select(db))
             else:
                 self._db = db
+        if self._blocking_pool is not None:
+            res = (await self._blocking_pool.select(db)) and res
+        if self._bulk_pool is not None:
+            res = (await self._bulk_pool.select(db)) and res
         return res
 
     async def auth(self, password):
@@ -296,6 +712,10 @@ class ConnectionsPool(AbcPool):
         with (await self._cond):
             for i in range(self.freesize):
                 await self._pool[i].auth(password)
+        if self._blocking_pool is not None:
+            await self._blocking_pool.auth(password)
+        if self._bulk_pool is not None:
+            await self._bulk_pool.auth(password)
 
     @property
     def in_pubsub(self):
@@ -315,26 +735,130 @@ class ConnectionsPool(AbcPool):
             return self._pubsub_conn.pubsub_patterns
         return types.MappingProxyType({})
 
-    async def acquire(self, command=None, args=()):
+    async def acquire(self, command=None, args=(), *, db=None):
         """Acquires a connection from free pool.
 
-        Creates new connection if needed.
+        Creates new connection if needed; if pool is full waits
+        for a connection to be released, waiters are served in FIFO order.
+
+        In multi_db mode connection with db index (pool db by default)
+        is preferred; new connection is created if pool is not full,
+        otherwise free (or released) connection is switched to the db.
         """
         if self.closed:
             raise PoolClosedError("Pool is closed")
-        with await self._cond:
-            if self.closed:
-                raise PoolClosedError("Pool is closed")
-            while True:
-                await self._fill_free(override_min=True)
-                if self.freesize:
-                    conn = self._pool.popleft()
-                    assert not conn.closed, conn
+        metrics = self._metrics
+        started_at = self._loop.time() if metrics is not None else None
+        if self._multi_db:
+            want = self.db if db is None else db
+        else:
+            want = None
+        served = waited = False
+        while True:
+            if served or not self._acquire_waiters:
+                conn = self._take_free(want)
+                if conn is not None:
+                    break
+                if self.size < self.maxsize:
+                    conn = await self._acquire_new(want)
+                    if conn is not None:
+                        break
+                if want is not None:
+                    # switch any free connection to requested db
+                    conn = self._take_free()
+                    if conn is not None:
+                        break
+            fut = self._loop.create_future()
+            self._acquire_waiters.append(fut)
+            if metrics is not None and not waited:
+                metrics.waits += 1
+                waited = True
+            try:
+                conn = await fut
+            except asyncio.CancelledError:
+                if not fut.cancelled():
+                    # connection was handed over right before cancellation
+                    if fut.result() is not None:
+                        self.release(fut.result())
+                    else:
+                        self._serve_waiters()
+                elif fut in self._acquire_waiters:
+                    self._acquire_waiters.remove(fut)
+                raise
+            if conn is not None:
+                break
+            # woken up to create new connection
+            served = True
+        if want is not None and conn.db != want:
+            try:
+                await conn.select(want)
+            except BaseException:
+                self.release(conn)
+                raise
+        return self._acquired(conn, started_at)
+
+    def _acquired(self, conn, started_at):
+        if started_at is not None:
+            self._metrics.acquired += 1
+            self._metrics.acquire_wait.observe(self._loop.time() - started_at)
+        return conn
+
+    async def _acquire_new(self, db=None):
+        try:
+            with (await self._cond):
+                if self.closed:
+                    raise PoolClosedError("Pool is closed")
+                if db is None:
+                    await self._fill_free(override_min=True)
+                    return self._take_free()
+                conn = self._take_free(db)
+                if conn is None and self.size < self.maxsize:
+                    await self._create_connections(1, db=db)
+                    conn = self._take_free(db)
+                return conn
+        finally:
+            self._serve_waiters()
+
+    def _take_free(self, db=None):
+        """Take free connection (with db index if db is not None)."""
+        if db is not None:
+            for conn in self._pool:
+                if conn.db == db and not conn.closed:
+                    self._pool.remove(conn)
                     assert conn not in self._used, (conn, self._used)
                     self._used.add(conn)
                     return conn
-                else:
-                    await self._cond.wait()
+            return None
+        while self._pool:
+            conn = self._pool[0]
+            if conn.closed:
+                self._drop_closed()
+                continue
+            self._pool.popleft()
+            assert conn not in self._used, (conn, self._used)
+            self._used.add(conn)
+            return conn
+        return None
+
+    def _serve_waiters(self):
+        """Hand free connections over to acquire() waiters.
+
+        If there is no free connection but pool is not full the first
+        waiter is woken up (with None) to create new connection.
+        """
+        waiters = self._acquire_waiters
+        while waiters:
+            if waiters[0].done():
+                waiters.popleft()
+                continue
+            conn = self._take_free()
+            if conn is not None:
+                waiters.popleft().set_result(conn)
+            elif self.size < self.maxsize and not self.closed:
+                waiters.popleft().set_result(None)
+                return
+            else:
+                return
 
     def release(self, conn):
         """Returns used connection back into pool.
@@ -342,6 +866,8 @@ class ConnectionsPool(AbcPool):
         When returned connection has db index that differs from one in pool
         the connection will be closed and dropped.
         When queue of free connections is full the connection will be dropped.
+        The connection (or freed slot) is handed over to the first
+        acquire() waiter right away.
         """
         assert conn in self._used, (
             "Invalid connection, maybe from other pool", conn)
@@ -355,11 +881,11 @@ class ConnectionsPool(AbcPool):
                 logger.warning(
                     "Connection %r is in subscribe mode, closing it.", conn)
                 conn.close()
-            elif conn._waiters:
+            elif conn._waiters and not self._multiplex:
                 logger.warning(
                     "Connection %r has pending commands, closing it.", conn)
                 conn.close()
-            elif conn.db == self.db:
+            elif conn.db == self.db or self._multi_db:
                 if self.maxsize and self.freesize < self.maxsize:
                     self._pool.append(conn)
                 else:
@@ -367,14 +893,17 @@ class ConnectionsPool(AbcPool):
                     conn.close()
             else:
                 conn.close()
-        # FIXME: check event loop is not closed
-        asyncio.ensure_future(self._wakeup(), loop=self._loop)
+        if conn.closed and self._metrics is not None:
+            self._metrics.closed += 1
+        self._serve_waiters()
 
     def _drop_closed(self):
         for i in range(self.freesize):
             conn = self._pool[0]
             if conn.closed:
                 self._pool.popleft()
+                if self._metrics is not None:
+                    self._metrics.closed += 1
             else:
                 self._pool.rotate(1)
 
@@ -383,47 +912,159 @@ class ConnectionsPool(AbcPool):
         self._drop_closed()
         # address = self._address
         while self.size < self.minsize:
-            self._acquiring += 1
-            try:
-                conn = await self._create_new_connection(self._address)
-                # check the healthy of that connection, if
-                # something went wrong just trigger the Exception
-                await conn.execute('ping')
-                self._pool.append(conn)
-            finally:
-                self._acquiring -= 1
-                # connection may be closed at yield point
-                self._drop_closed()
+            await self._create_connections(self.minsize - self.size)
         if self.freesize:
             return
         if override_min:
             while not self._pool and self.size < self.maxsize:
-                self._acquiring += 1
-                try:
-                    conn = await self._create_new_connection(self._address)
+                await self._create_connections(1)
+
+    async def _create_connections(self, count, db=None):
+        """Open count connections concurrently and put them into free pool
+        (with db index if db is not None, pool db otherwise).
+
+        At most create_connection_parallelism connections are opened
+        at a time; all of them are accounted in pool size right away.
+        Successfully opened connections are kept if some failed;
+        first error is raised.
+        If pool has no connections yet, first one is opened alone
+        (it checks address and credentials or performs discovery).
+        """
+        started_at = self._loop.time()
+        sem = asyncio.Semaphore(self._create_connection_parallelism,
+                                loop=self._loop)
+        self._acquiring += count
+        started = 0
+
+        async def create():
+            nonlocal started
+            started += 1
+            try:
+                with (await sem):
+                    conn = await self._create_new_connection_timed(db)
+                    if self._max_lifetime:
+                        self._created_at[conn] = self._loop.time()
                     self._pool.append(conn)
-                finally:
-                    self._acquiring -= 1
-                    # connection may be closed at yield point
-                    self._drop_closed()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                return exc
+            finally:
+                self._acquiring -= 1
 
-    def _create_new_connection(self, address):
+        results = []
+        try:
+            rest = count
+            if count > 1 and not self._pool and not self._used:
+                results.append(await create())
+                rest = count - 1 if results[0] is None else 0
+            results += await asyncio.gather(
+                *[create() for _ in range(rest)], loop=self._loop)
+        finally:
+            # release slots of connections which were never started
+            # (failed first one or cancellation)
+            self._acquiring -= count - started
+            # connection may be closed at yield point
+            self._drop_closed()
+        errors = [res for res in results if res is not None]
+        logger.debug("Opened %d of %d connection(s) in %.3f sec",
+                     len(results) - len(errors), len(results),
+                     self._loop.time() - started_at)
+        if errors:
+            raise errors[0]
+
+    async def _maintenance(self, interval):
+        """Periodically close idle and expired free connections
+        and refill pool up to minsize.
+        """
+        while True:
+            await asyncio.sleep(interval, loop=self._loop)
+            try:
+                self._close_idle_and_expired()
+                if self.size < self.minsize:
+                    with (await self._cond):
+                        if self.closed:
+                            return
+                        await self._fill_free(override_min=False)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("Pool maintenance failed: %r", exc)
+
+    def _close_idle_and_expired(self):
+        """Close free connections idle for longer than max_idle_time
+        (down to minsize) and at most one connection older than
+        max_lifetime, so pool is never drained at once.
+
+        Connections with pending commands are never closed.
+        """
+        now = self._loop.time()
+        if self._max_lifetime:
+            for conn in [c for c in self._created_at if c.closed]:
+                del self._created_at[conn]
+        if self._max_idle_time:
+            for conn in list(self._pool):
+                if self.size <= self.minsize:
+                    break
+                if conn._waiters:
+                    continue
+                idle = now - getattr(conn, '_progress_at', now)
+                if idle > self._max_idle_time:
+                    logger.debug("Closing idle connection %r", conn)
+                    self._close_free(conn)
+        if self._max_lifetime:
+            for conn in list(self._pool):
+                if conn._waiters:
+                    continue
+                age = now - self._created_at.get(conn, now)
+                if age > self._max_lifetime:
+                    logger.debug("Closing expired connection %r", conn)
+                    self._close_free(conn)
+                    break
+
+    def _close_free(self, conn):
+        self._pool.remove(conn)
+        self._created_at.pop(conn, None)
+        conn.close()
+        if self._metrics is not None:
+            self._metrics.closed += 1
+
+    async def _create_new_connection_timed(self, db=None):
+        if db is None:
+            coro = self._create_new_connection(self._address)
+        else:
+            coro = self._create_new_connection(self._address, db)
+        metrics = self._metrics
+        if metrics is None:
+            return (await coro)
+        started_at = self._loop.time()
+        try:
+            conn = await coro
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            metrics.create_errors += 1
+            raise
+        metrics.created += 1
+        metrics.create_latency.observe(self._loop.time() - started_at)
+        return conn
+
+    def _create_new_connection(self, address, db=None):
         return create_connection(address,
-                                 db=self._db,
+                                 db=self._db if db is None else db,
                                  password=self._password,
                                  ssl=self._ssl,
                                  encoding=self._encoding,
                                  parser=self._parser_class,
                                  timeout=self._create_connection_timeout,
                                  connection_cls=self._connection_cls,
+                                 write_buffer_limits=(
+                                     self._write_buffer_limits),
+                                 command_timeout=self._command_timeout,
+                                 name=self._name,
+                                 ping=True,
                                  loop=self._loop)
 
-    async def _wakeup(self, closing_conn=None):
-        with (await self._cond):
-            self._cond.notify()
-        if closing_conn is not None:
-            await closing_conn.wait_closed()
-
     def __enter__(self):
         raise RuntimeError(
             "'await' should be used as a context manager expression")
@@ -0,0 +1,350 @@
+import asyncio
+import itertools
+
+from .abc import AbcPool
+from .errors import PoolClosedError
+from .log import logger
+from .pool import create_pool, READONLY_COMMANDS
+
+
+__all__ = ['create_replicated_pool', 'ReplicatedPool']
+
+
+# commands always executed on primary even if server reports them
+# as read-only (they are bound to connection state or scripts)
+_PRIMARY_COMMANDS = frozenset([
+    'WATCH', 'UNWATCH', 'MULTI', 'EXEC', 'DISCARD',
+    'EVAL', 'EVALSHA', 'SCRIPT',
+    'SELECT', 'AUTH', 'QUIT', 'PING', 'ECHO',
+    ])
+
+ROUND_ROBIN = 'round_robin'
+LEAST_LOADED = 'least_loaded'
+
+
+async def create_replicated_pool(primary, replicas, *,
+                                 read_policy=ROUND_ROBIN,
+                                 max_replica_lag=None,
+                                 lag_check_interval=1.0,
+                                 server_commands=False,
+                                 loop=None, **kwargs):
+    """Creates connections pools for primary and every replica
+    and ReplicatedPool routing read-only commands to replicas.
+
+    All other keyword arguments are passed to
+    :func:`~aioredis.create_pool`.
+
+    This function is a coroutine.
+    """
+    if loop is None:
+        loop = asyncio.get_event_loop()
+    kwargs['loop'] = loop
+    pools = await asyncio.gather(
+        *[create_pool(address, **kwargs)
+          for address in [primary] + list(replicas)],
+        loop=loop, return_exceptions=True)
+    errors = [p for p in pools if isinstance(p, Exception)]
+    if errors:
+        waiters = []
+        for p in pools:
+            if not isinstance(p, Exception):
+                p.close()
+                waiters.append(p.wait_closed())
+        await asyncio.gather(*waiters, loop=loop)
+        raise errors[0]
+    pool = ReplicatedPool(pools[0], pools[1:],
+                          read_policy=read_policy,
+                          max_replica_lag=max_replica_lag,
+                          lag_check_interval=lag_check_interval,
+                          loop=loop)
+    try:
+        if server_commands:
+            await pool.load_commands()
+        if max_replica_lag is not None:
+            await pool.check_replicas()
+    except Exception:
+        pool.close()
+        await pool.wait_closed()
+        raise
+    return pool
+
+
+class ReplicatedPool(AbcPool):
+    """Pool over primary and read replicas.
+
+    Read-only commands are executed on replicas, all other commands,
+    transactions, WATCH, scripts, Pub/Sub and pipelines are executed
+    on primary.
+    """
+
+    def __init__(self, primary, replicas, *, read_policy=ROUND_ROBIN,
+                 max_replica_lag=None, lag_check_interval=1.0,
+                 loop=None):
+        assert read_policy in (ROUND_ROBIN, LEAST_LOADED), (
+            "Unknown read_policy", read_policy)
+        assert max_replica_lag is None or max_replica_lag >= 0, (
+            "max_replica_lag must be None or >= 0", max_replica_lag)
+        assert lag_check_interval > 0, (
+            "lag_check_interval must be > 0", lag_check_interval)
+        if loop is None:
+            loop = asyncio.get_event_loop()
+        self._loop = loop
+        self._primary = primary
+        self._replicas = list(replicas)
+        self._available = list(replicas)
+        self._read_policy = read_policy
+        self._max_replica_lag = max_replica_lag
+        self._lag_check_interval = lag_check_interval
+        self._readonly = READONLY_COMMANDS
+        self._rr = itertools.count()
+        self._owners = {}
+        self._closed = False
+        self._close_waiters = []
+        self._check_task = None
+        if max_replica_lag is not None and replicas:
+            self._check_task = asyncio.ensure_future(
+                self._check_replicas_loop(), loop=loop)
+
+    def __repr__(self):
+        return '<{} [primary:{!r}, replicas:{}/{}]>'.format(
+            self.__class__.__name__, self._primary.address,
+            len(self._available), len(self._replicas))
+
+    @property
+    def primary(self):
+        """Primary ConnectionsPool."""
+        return self._primary
+
+    @property
+    def replicas(self):
+        """List of replicas ConnectionsPools."""
+        return list(self._replicas)
+
+    @property
+    def available_replicas(self):
+        """List of replicas ConnectionsPools reads are routed to
+        (within max_replica_lag).
+        """
+        return list(self._available)
+
+    @property
+    def address(self):
+        return self._primary.address
+
+    @property
+    def db(self):
+        return self._primary.db
+
+    @property
+    def encoding(self):
+        return self._primary.encoding
+
+    @property
+    def closed(self):
+        """True if pool is closed."""
+        return self._closed
+
+    @property
+    def in_transaction(self):
+        return False
+
+    async def load_commands(self):
+        """Load read-only commands table from primary COMMAND output."""
+        commands = await self._primary.execute('COMMAND')
+        readonly = set()
+        for name, _, flags, *_ in commands:
+            if isinstance(name, bytes):
+                name = name.decode('utf-8')
+            flags = {f.decode('utf-8') if isinstance(f, bytes) else f
+                     for f in flags}
+            if 'readonly' in flags and 'pubsub' not in flags:
+                readonly.add(name.upper())
+        self._readonly = frozenset(readonly - _PRIMARY_COMMANDS)
+
+    def is_readonly(self, command):
+        """True if command is routed to replicas."""
+        cmd = command.upper().strip()
+        if isinstance(cmd, bytes):
+            cmd = cmd.decode('utf-8')
+        return cmd in self._readonly
+
+    def _pick(self, command):
+        """Return pool to execute command on."""
+        if not self._available or not self.is_readonly(command):
+            return self._primary
+        replicas = self._available
+        if self._read_policy == ROUND_ROBIN:
+            return replicas[next(self._rr) % len(replicas)]
+        return min(replicas, key=_load)
+
+    def execute(self, command, *args, **kw):
+        """Executes redis command on replica if command is read-only
+        or on primary otherwise.
+        """
+        if self._closed:
+            raise PoolClosedError("Pool is closed")
+        return self._pick(command).execute(command, *args, **kw)
+
+    def execute_pubsub(self, command, *channels):
+        """Executes Redis (p)subscribe/(p)unsubscribe commands on primary.
+        """
+        return self._primary.execute_pubsub(command, *channels)
+
+    @property
+    def in_pubsub(self):
+        return self._primary.in_pubsub
+
+    @property
+    def pubsub_channels(self):
+        return self._primary.pubsub_channels
+
+    @property
+    def pubsub_patterns(self):
+        return self._primary.pubsub_patterns
+
+    def _pools(self):
+        return [self._primary] + self._replicas
+
+    async def select(self, db):
+        """Changes db index for primary and all replicas."""
+        res = await asyncio.gather(*[
+            pool.select(db) for pool in self._pools()], loop=self._loop)
+        return all(res)
+
+    async def auth(self, password):
+        await asyncio.gather(*[
+            pool.auth(password) for pool in self._pools()], loop=self._loop)
+
+    def get_connection(self, command, args=()):
+        return self._pick(command).get_connection(command, args)
+
+    async def acquire(self, command=None, args=()):
+        """Acquires connection from replica for read-only command,
+        from primary otherwise.
+        """
+        if self._closed:
+            raise PoolClosedError("Pool is closed")
+        pool = self._primary if command is None else self._pick(command)
+        conn = await pool.acquire(command, args)
+        self._owners[conn] = pool
+        return conn
+
+    def release(self, conn):
+        """Returns used connection back into its pool."""
+        self._owners.pop(conn).release(conn)
+
+    def get(self):
+        """Return async context manager with primary connection."""
+        return self._primary.get()
+
+    def __await__(self):
+        return self._primary.__await__()
+
+    def close(self):
+        """Close primary and replicas pools."""
+        if not self._closed:
+            self._closed = True
+            if self._check_task is not None:
+                self._check_task.cancel()
+                self._check_task = None
+            for pool in self._pools():
+                pool.close()
+                self._close_waiters.append(pool.wait_closed())
+
+    async def wait_closed(self):
+        """Wait until all pools are closed."""
+        waiters, self._close_waiters = self._close_waiters, []
+        await asyncio.gather(*waiters, loop=self._loop)
+
+    async def check_replicas(self):
+        """Check replicas replication state and update list
+        of available replicas.
+
+        Replica is available if its link to primary is up and its
+        lag (seconds since last acknowledge, as reported by primary)
+        is no more than max_replica_lag.
+        If replica is not found in primary replicas list
+        (eg behind NAT) its ``master_last_io_seconds_ago`` is used.
+        """
+        if self._max_replica_lag is None:
+            return
+        infos = await asyncio.gather(*[
+            pool.execute('INFO', 'replication', encoding='utf-8')
+            for pool in self._pools()],
+            loop=self._loop, return_exceptions=True)
+        primary_info, infos = infos[0], infos[1:]
+        if isinstance(primary_info, Exception):
+            logger.warning("Primary %r check failed: %r",
+                           self._primary.address, primary_info)
+            slaves = []
+        else:
+            slaves = _parse_slaves(_parse_info(primary_info))
+        available = []
+        for pool, info in zip(self._replicas, infos):
+            if isinstance(info, Exception):
+                logger.warning("Replica %r check failed: %r",
+                               pool.address, info)
+                continue
+            lag = _replica_lag(_parse_info(info), pool.address, slaves)
+            if lag is not None and lag <= self._max_replica_lag:
+                available.append(pool)
+            else:
+                logger.debug("Replica %r is lagging: %r", pool.address, lag)
+        self._available = available
+
+    async def _check_replicas_loop(self):
+        while True:
+            await asyncio.sleep(self._lag_check_interval, loop=self._loop)
+            try:
+                await self.check_replicas()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("Replicas check failed: %r", exc)
+
+
+def _load(pool):
+    return len(pool._used) + sum(len(conn._waiters) for conn in pool._pool)
+
+
+def _parse_info(info):
+    return dict(line.split(':', 1)
+                for line in info.splitlines()
+                if ':' in line and not line.startswith('#'))
+
+
+def _parse_slaves(fields):
+    """Parse primary slaveN fields into list of dicts."""
+    slaves = []
+    for i in range(int(fields.get('connected_slaves', 0))):
+        value = fields.get('slave{}'.format(i))
+        if value:
+            slaves.append(dict(item.split('=', 1)
+                               for item in value.split(',') if '=' in item))
+    return slaves
+
+
+def _replica_lag(fields, address, slaves):
+    """Return replica lag in seconds or None if replica is not in sync."""
+    if fields.get('role') not in ('slave', 'replica'):
+        return None
+    if fields.get('master_link_status') != 'up':
+        return None
+    if fields.get('master_sync_in_progress', '0') != '0':
+        return None
+    if isinstance(address, (tuple, list)):
+        host, port = address[0], str(address[1])
+        found = [s for s in slaves if s.get('port') == port]
+        if len(found) > 1:
+            found = [s for s in found if s.get('ip') == host]
+        if len(found) == 1:
+            if found[0].get('state') != 'online':
+                return None
+            try:
+                return int(found[0]['lag'])
+            except (KeyError, ValueError):
+                return None
+    try:
+        return int(fields['master_last_io_seconds_ago'])
+    except (KeyError, ValueError):
+        return None
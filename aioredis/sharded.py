@@ -0,0 +1,570 @@
+import asyncio
+import hashlib
+import types
+
+from bisect import bisect
+
+from .abc import AbcPool
+from .errors import PoolClosedError, RedisError
+from .log import logger
+from .pool import create_pool
+from .util import _converters
+
+
+__all__ = ['create_sharded_pool', 'ShardedPool', 'HashRing']
+
+
+# commands which keys are split between shards;
+# value is function combining replies of shards.
+_SPLIT_KEYS_COMMANDS = {
+    'MGET': None,
+    'DEL': sum,
+    'UNLINK': sum,
+    'EXISTS': sum,
+    'TOUCH': sum,
+    }
+_SPLIT_PAIRS_COMMANDS = {
+    'MSET': lambda results: results[0],
+    }
+# commands without key executed on any shard
+_ANY_SHARD_COMMANDS = frozenset([
+    'PING', 'ECHO', 'TIME', 'COMMAND',
+    ])
+# commands with single key as first argument
+# (PUBLISH channel is routed as key)
+_SINGLE_KEY_COMMANDS = frozenset([
+    'APPEND', 'BITCOUNT', 'BITFIELD', 'BITPOS', 'DECR', 'DECRBY', 'DUMP',
+    'EXPIRE', 'EXPIREAT', 'GEOADD', 'GEODIST', 'GEOHASH', 'GEOPOS',
+    'GEORADIUS', 'GEORADIUSBYMEMBER', 'GET', 'GETBIT', 'GETRANGE', 'GETSET',
+    'HDEL', 'HEXISTS', 'HGET', 'HGETALL', 'HINCRBY', 'HINCRBYFLOAT',
+    'HKEYS', 'HLEN', 'HMGET', 'HMSET', 'HSCAN', 'HSET', 'HSETNX',
+    'HSTRLEN', 'HVALS', 'INCR', 'INCRBY', 'INCRBYFLOAT', 'LINDEX',
+    'LINSERT', 'LLEN', 'LPOP', 'LPUSH', 'LPUSHX', 'LRANGE', 'LREM', 'LSET',
+    'LTRIM', 'PERSIST', 'PEXPIRE', 'PEXPIREAT', 'PFADD', 'PSETEX', 'PTTL',
+    'PUBLISH', 'RESTORE', 'RPOP', 'RPUSH', 'RPUSHX', 'SADD', 'SCARD',
+    'SET', 'SETBIT', 'SETEX', 'SETNX', 'SETRANGE', 'SISMEMBER', 'SMEMBERS',
+    'SORT', 'SPOP', 'SRANDMEMBER', 'SREM', 'SSCAN', 'STRLEN', 'TTL', 'TYPE',
+    'XACK', 'XADD', 'XCLAIM', 'XDEL', 'XLEN', 'XPENDING', 'XRANGE',
+    'XREVRANGE', 'XTRIM', 'ZADD', 'ZCARD', 'ZCOUNT', 'ZINCRBY', 'ZLEXCOUNT',
+    'ZPOPMAX', 'ZPOPMIN', 'ZRANGE', 'ZRANGEBYLEX', 'ZRANGEBYSCORE', 'ZRANK',
+    'ZREM', 'ZREMRANGEBYLEX', 'ZREMRANGEBYRANK', 'ZREMRANGEBYSCORE',
+    'ZREVRANGE', 'ZREVRANGEBYLEX', 'ZREVRANGEBYSCORE', 'ZREVRANK', 'ZSCAN',
+    'ZSCORE',
+    ])
+# commands storing reply into key given after STORE option
+_STORE_COMMANDS = {
+    'SORT': (b'STORE',),
+    'GEORADIUS': (b'STORE', b'STOREDIST'),
+    'GEORADIUSBYMEMBER': (b'STORE', b'STOREDIST'),
+    }
+# multi-key commands: (first key, last key, step) arguments indexes
+# (as firstkey, lastkey and step of COMMAND INFO reply, but without
+# command name); negative last key index counts from the end
+_KEY_RANGE_COMMANDS = {
+    'BITOP': (1, -1, 1),
+    'BLPOP': (0, -2, 1),
+    'BRPOP': (0, -2, 1),
+    'BZPOPMAX': (0, -2, 1),
+    'BZPOPMIN': (0, -2, 1),
+    'BRPOPLPUSH': (0, 1, 1),
+    'MSETNX': (0, -1, 2),
+    'PFCOUNT': (0, -1, 1),
+    'PFMERGE': (0, -1, 1),
+    'RENAME': (0, 1, 1),
+    'RENAMENX': (0, 1, 1),
+    'RPOPLPUSH': (0, 1, 1),
+    'SDIFF': (0, -1, 1),
+    'SDIFFSTORE': (0, -1, 1),
+    'SINTER': (0, -1, 1),
+    'SINTERSTORE': (0, -1, 1),
+    'SMOVE': (0, 1, 1),
+    'SUNION': (0, -1, 1),
+    'SUNIONSTORE': (0, -1, 1),
+    'WATCH': (0, -1, 1),
+    }
+# commands with number of keys argument: (numkeys index, destination key)
+_NUMKEYS_COMMANDS = {
+    'EVAL': (1, False),
+    'EVALSHA': (1, False),
+    'ZINTERSTORE': (1, True),
+    'ZUNIONSTORE': (1, True),
+    }
+# commands with key following subcommand
+_SUBCOMMAND_KEY_COMMANDS = {
+    'OBJECT': frozenset([b'ENCODING', b'FREQ', b'IDLETIME', b'REFCOUNT']),
+    'MEMORY': frozenset([b'USAGE']),
+    }
+# commands with keys following STREAMS option
+_STREAMS_COMMANDS = frozenset(['XREAD', 'XREADGROUP'])
+
+
+def _command_keys(cmd, args):
+    """Return list of command keys or None if keys can not be found."""
+    if cmd in _SINGLE_KEY_COMMANDS:
+        keys = list(args[:1])
+        options = _STORE_COMMANDS.get(cmd)
+        if options:
+            keys.extend(args[i + 1] for i in range(1, len(args) - 1)
+                        if _upper(args[i]) in options)
+        return keys
+    if cmd in _KEY_RANGE_COMMANDS:
+        first, last, step = _KEY_RANGE_COMMANDS[cmd]
+        if last < 0:
+            last += len(args)
+        return list(args[first:last + 1:step])
+    if cmd in _NUMKEYS_COMMANDS:
+        idx, dest = _NUMKEYS_COMMANDS[cmd]
+        try:
+            numkeys = int(args[idx])
+        except (IndexError, TypeError, ValueError):
+            return None
+        keys = list(args[idx + 1:idx + 1 + numkeys])
+        if dest and keys:
+            keys.append(args[0])
+        return keys
+    if cmd in _SUBCOMMAND_KEY_COMMANDS:
+        if args and _upper(args[0]) in _SUBCOMMAND_KEY_COMMANDS[cmd]:
+            return list(args[1:2])
+        return None
+    if cmd in _STREAMS_COMMANDS:
+        for i, arg in enumerate(args):
+            if _upper(arg) == b'STREAMS':
+                streams = args[i + 1:]
+                return list(streams[:len(streams) // 2])
+    return None
+
+
+def _upper(arg):
+    if isinstance(arg, str):
+        arg = arg.encode('utf-8')
+    if isinstance(arg, bytes):
+        return arg.upper()
+    return arg
+
+
+def _hash(data):
+    return int.from_bytes(hashlib.md5(data).digest()[:8], 'big')
+
+
+def _node_name(address):
+    if isinstance(address, (tuple, list)):
+        return '{}:{}'.format(*address)
+    return str(address)
+
+
+class HashRing:
+    """Consistent hash ring with virtual nodes.
+
+    Every node is placed on the ring vnodes times; key belongs to the
+    first node point following key hash. Adding or removing node
+    moves only keys of that node (about 1/N of all keys).
+
+    Key hash tags are supported: if key contains ``{...}`` only
+    substring inside braces is hashed (same as Redis Cluster does).
+    """
+
+    def __init__(self, nodes=(), *, vnodes=160):
+        assert isinstance(vnodes, int) and vnodes > 0, (
+            "vnodes must be int > 0", vnodes)
+        self._vnodes = vnodes
+        self._nodes = {}
+        self._points = []
+        self._owners = []
+        for node in nodes:
+            self.add(node)
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def __contains__(self, node):
+        return node in self._nodes
+
+    @property
+    def nodes(self):
+        """List of ring nodes."""
+        return list(self._nodes)
+
+    def add(self, node, name=None):
+        """Add node to ring; name (str) is hashed to place node points,
+        by default it is str(node).
+        """
+        assert node not in self._nodes, ("Duplicate node", node)
+        name = str(node) if name is None else name
+        self._nodes[node] = name
+        self._rebuild()
+
+    def remove(self, node):
+        """Remove node from ring."""
+        del self._nodes[node]
+        self._rebuild()
+
+    def _rebuild(self):
+        points = sorted(
+            (_hash('{}-{}'.format(name, i).encode('utf-8')), name, node)
+            for node, name in self._nodes.items()
+            for i in range(self._vnodes))
+        self._points = [p[0] for p in points]
+        self._owners = [p[2] for p in points]
+
+    def get(self, key):
+        """Return node owning key."""
+        if not self._points:
+            raise RedisError("Hash ring is empty")
+        idx = bisect(self._points, self.key_hash(key))
+        if idx == len(self._points):
+            idx = 0
+        return self._owners[idx]
+
+    @staticmethod
+    def key_hash(key):
+        if not isinstance(key, bytes):
+            key = _converters[type(key)](key)
+        start = key.find(b'{')
+        if start > -1:
+            end = key.find(b'}', start + 1)
+            if end > -1 and end != start + 1:
+                key = key[start + 1:end]
+        return _hash(key)
+
+
+async def create_sharded_pool(addresses, *, vnodes=160, loop=None, **kwargs):
+    """Creates Redis connections pools for every address and
+    ShardedPool distributing keys between them.
+
+    All keyword arguments except vnodes are passed to
+    :func:`~aioredis.create_pool`.
+
+    This function is a coroutine.
+    """
+    assert addresses, "At least one address is required"
+    pool = ShardedPool(vnodes=vnodes, pool_kwargs=kwargs, loop=loop)
+    try:
+        await asyncio.gather(*[pool.add_shard(address)
+                               for address in addresses], loop=loop)
+    except Exception:
+        pool.close()
+        await pool.wait_closed()
+        raise
+    return pool
+
+
+class ShardedPool(AbcPool):
+    """Pool distributing keys between independent Redis instances
+    by consistent hashing.
+
+    Commands are routed by their keys (found by static table of key
+    positions); MGET, MSET, DEL, UNLINK, EXISTS and TOUCH keys are split
+    by shards and parts are executed concurrently.
+    Keys of other multi-key commands must belong to the same shard
+    (use hash tags to keep such keys together).
+    Commands which keys can not be found raise RedisError.
+    """
+
+    def __init__(self, *, vnodes=160, pool_kwargs=None, loop=None):
+        if loop is None:
+            loop = asyncio.get_event_loop()
+        self._loop = loop
+        self._ring = HashRing(vnodes=vnodes)
+        self._pool_kwargs = dict(pool_kwargs or {})
+        self._shards = {}
+        self._owners = {}
+        self._closed = False
+        self._close_waiters = []
+
+    def __repr__(self):
+        return '<{} [shards:{}]>'.format(
+            self.__class__.__name__, len(self._shards))
+
+    @property
+    def shards(self):
+        """Read-only dict of shard address to ConnectionsPool."""
+        return types.MappingProxyType(self._shards)
+
+    @property
+    def ring(self):
+        """HashRing instance (*read-only*)."""
+        return self._ring
+
+    @property
+    def address(self):
+        return None
+
+    @property
+    def db(self):
+        return self._pool_kwargs.get('db') or 0
+
+    @property
+    def encoding(self):
+        return self._pool_kwargs.get('encoding')
+
+    @property
+    def closed(self):
+        """True if pool is closed."""
+        return self._closed
+
+    @property
+    def in_transaction(self):
+        return False
+
+    async def add_shard(self, address):
+        """Create connections pool for address and add it to hash ring.
+
+        Keys of neighbour shards owned by new shard will miss.
+        """
+        if self._closed:
+            raise PoolClosedError("Pool is closed")
+        assert address not in self._shards, ("Duplicate shard", address)
+        kwargs = dict(self._pool_kwargs)
+        kwargs.setdefault('loop', self._loop)
+        pool = await create_pool(address, **kwargs)
+        if self._closed:
+            pool.close()
+            await pool.wait_closed()
+            raise PoolClosedError("Pool is closed")
+        self._shards[address] = pool
+        self._ring.add(pool, _node_name(address))
+        logger.debug("Added shard %r", address)
+        return pool
+
+    async def remove_shard(self, address):
+        """Remove shard from hash ring and close its pool."""
+        pool = self._shards.pop(address)
+        self._ring.remove(pool)
+        pool.close()
+        await pool.wait_closed()
+        logger.debug("Removed shard %r", address)
+
+    def get_shard(self, key):
+        """Return ConnectionsPool owning key."""
+        return self._ring.get(key)
+
+    def close(self):
+        """Close all shards pools."""
+        if not self._closed:
+            self._closed = True
+            for pool in self._shards.values():
+                pool.close()
+                self._close_waiters.append(pool.wait_closed())
+
+    async def wait_closed(self):
+        """Wait until all shards pools are closed."""
+        waiters, self._close_waiters = self._close_waiters, []
+        await asyncio.gather(*waiters, loop=self._loop)
+
+    def _route(self, command, args, kw):
+        """Return shard pool for command or None if command
+        is executed on every shard separately.
+        """
+        if not self._shards:
+            raise PoolClosedError("Pool has no shards")
+        cmd = command.upper().strip()
+        if isinstance(cmd, bytes):
+            cmd = cmd.decode('utf-8')
+        if cmd in _ANY_SHARD_COMMANDS:
+            return cmd, next(iter(self._shards.values()))
+        if cmd in _SPLIT_KEYS_COMMANDS or cmd in _SPLIT_PAIRS_COMMANDS:
+            if not args:
+                raise RedisError("Command {!r} requires keys".format(command))
+            return cmd, None
+        keys = _command_keys(cmd, args)
+        if not keys:
+            raise RedisError("Command {!r} keys can not be found;"
+                             " use execute_all()".format(command))
+        pool = self._ring.get(keys[0])
+        if any(self._ring.get(key) is not pool for key in keys[1:]):
+            raise RedisError("Command {!r} keys belong to different shards"
+                             .format(command))
+        return cmd, pool
+
+    def execute(self, command, *args, **kw):
+        """Executes redis command on shard(s) owning its keys.
+
+        Returns future or coroutine waiting for result.
+        """
+        if self._closed:
+            raise PoolClosedError("Pool is closed")
+        cmd, pool = self._route(command, args, kw)
+        if pool is not None:
+            return pool.execute(command, *args, **kw)
+        step = 2 if cmd in _SPLIT_PAIRS_COMMANDS else 1
+        parts = {}
+        for i in range(0, len(args), step):
+            pool = self._ring.get(args[i])
+            parts.setdefault(pool, []).append(i)
+        if len(parts) == 1:
+            return pool.execute(command, *args, **kw)
+        order = list(parts.items())
+        gather = asyncio.gather(*[
+            pool.execute(command,
+                         *[arg for i in idx for arg in args[i:i + step]],
+                         **kw)
+            for pool, idx in order], loop=self._loop)
+        if cmd in _SPLIT_PAIRS_COMMANDS:
+            combine = _SPLIT_PAIRS_COMMANDS[cmd]
+        elif cmd == 'MGET':
+            def combine(results):
+                res = [None] * len(args)
+                for (_, idx), values in zip(order, results):
+                    for i, val in zip(idx, values):
+                        res[i] = val
+                return res
+        else:
+            combine = _SPLIT_KEYS_COMMANDS[cmd]
+        fut = self._loop.create_future()
+        gather.add_done_callback(
+            lambda gather: _set_combined(gather, fut, combine))
+        return fut
+
+    async def execute_all(self, command, *args, **kw):
+        """Execute command on every shard.
+
+        Returns list of replies in shards order.
+        """
+        if self._closed:
+            raise PoolClosedError("Pool is closed")
+        return (await asyncio.gather(*[
+            pool.execute(command, *args, **kw)
+            for pool in self._shards.values()], loop=self._loop))
+
+    def execute_pubsub(self, command, *channels):
+        """Executes Redis (p)subscribe/(p)unsubscribe commands.
+
+        Channels are routed to shards by name (PUBLISH command
+        is routed the same way), patterns are (un)subscribed
+        on every shard.
+        """
+        if self._closed:
+            raise PoolClosedError("Pool is closed")
+        cmd = command.upper().strip()
+        if isinstance(cmd, bytes):
+            cmd = cmd.decode('utf-8')
+        if cmd.startswith('P') or not channels:
+            coros = [pool.execute_pubsub(command, *channels)
+                     for pool in self._shards.values()]
+            return _first(asyncio.gather(*coros, loop=self._loop))
+        parts = {}
+        for ch in channels:
+            name = getattr(ch, 'name', ch)
+            parts.setdefault(self._ring.get(name), []).append(ch)
+        return _concat(asyncio.gather(*[
+            pool.execute_pubsub(command, *chs)
+            for pool, chs in parts.items()], loop=self._loop))
+
+    @property
+    def in_pubsub(self):
+        return sum(pool.in_pubsub for pool in self._shards.values())
+
+    @property
+    def pubsub_channels(self):
+        channels = {}
+        for pool in self._shards.values():
+            channels.update(pool.pubsub_channels)
+        return types.MappingProxyType(channels)
+
+    @property
+    def pubsub_patterns(self):
+        patterns = {}
+        for pool in self._shards.values():
+            patterns.update(pool.pubsub_patterns)
+        return types.MappingProxyType(patterns)
+
+    async def select(self, db):
+        """Changes db index for all shards."""
+        res = await asyncio.gather(*[
+            pool.select(db) for pool in self._shards.values()],
+            loop=self._loop)
+        self._pool_kwargs['db'] = db
+        return all(res)
+
+    async def auth(self, password):
+        self._pool_kwargs['password'] = password
+        await asyncio.gather(*[
+            pool.auth(password) for pool in self._shards.values()],
+            loop=self._loop)
+
+    def get_connection(self, command, args=()):
+        """Get free connection from shard owning command key."""
+        cmd, pool = self._route(command, args, {})
+        if pool is None:
+            raise RedisError("Command {!r} keys may belong to different"
+                             " shards".format(command))
+        return pool.get_connection(command, args)
+
+    async def acquire(self, command=None, args=()):
+        """Acquires connection from shard owning command key."""
+        if command is None:
+            raise RedisError("Connection can not be acquired without"
+                             " command key")
+        cmd, pool = self._route(command, args, {})
+        if pool is None:
+            raise RedisError("Command {!r} keys may belong to different"
+                             " shards".format(command))
+        conn = await pool.acquire(command, args)
+        self._owners[conn] = pool
+        return conn
+
+    def release(self, conn):
+        """Returns used connection back into its shard pool."""
+        pool = self._owners.pop(conn)
+        pool.release(conn)
+
+    def get(self):
+        """Return async context manager for pipelines.
+
+        Commands executed on context object are routed to shards,
+        it is not a single connection so MULTI/EXEC is not supported.
+        """
+        return _ShardedContextManager(self)
+
+
+class _ShardedConnection:
+    """Connection-like object routing commands through ShardedPool."""
+
+    __slots__ = ('_pool',)
+
+    def __init__(self, pool):
+        self._pool = pool
+
+    @property
+    def closed(self):
+        return self._pool.closed
+
+    def execute(self, command, *args, **kw):
+        return asyncio.ensure_future(
+            self._pool.execute(command, *args, **kw), loop=self._pool._loop)
+
+
+class _ShardedContextManager:
+
+    __slots__ = ('_conn',)
+
+    def __init__(self, pool):
+        self._conn = _ShardedConnection(pool)
+
+    async def __aenter__(self):
+        return self._conn
+
+    async def __aexit__(self, exc_type, exc_value, tb):
+        self._conn = None
+
+
+def _set_combined(gather, fut, combine):
+    if fut.done():
+        return
+    if gather.cancelled():
+        fut.cancel()
+    elif gather.exception() is not None:
+        fut.set_exception(gather.exception())
+    else:
+        try:
+            fut.set_result(combine(gather.result()))
+        except Exception as exc:
+            fut.set_exception(exc)
+
+
+async def _first(gather):
+    return (await gather)[0]
+
+
+async def _concat(gather):
+    return [res for results in (await gather) for res in results]
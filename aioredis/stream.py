@@ -3,7 +3,11 @@ import asyncio
 __all__ = [
     'open_connection',
     'open_unix_connection',
+    'open_protocol_connection',
+    'open_protocol_unix_connection',
     'StreamReader',
+    'StreamReaderProtocol',
+    'RedisProtocol',
 ]
 
 
@@ -14,7 +18,7 @@ async def open_connection(host=None, port=None, *,
     if loop is None:
         loop = asyncio.get_event_loop()
     reader = StreamReader(limit=limit, loop=loop)
-    protocol = asyncio.StreamReaderProtocol(reader, loop=loop)
+    protocol = StreamReaderProtocol(reader, loop=loop)
     transport, _ = await loop.create_connection(
         lambda: protocol, host, port, **kwds)
     writer = asyncio.StreamWriter(transport, protocol, reader, loop)
@@ -28,13 +32,50 @@ async def open_unix_connection(address, *,
     if loop is None:
         loop = asyncio.get_event_loop()
     reader = StreamReader(limit=limit, loop=loop)
-    protocol = asyncio.StreamReaderProtocol(reader, loop=loop)
+    protocol = StreamReaderProtocol(reader, loop=loop)
     transport, _ = await loop.create_unix_connection(
         lambda: protocol, address, **kwds)
     writer = asyncio.StreamWriter(transport, protocol, reader, loop)
     return reader, writer
 
 
+async def open_protocol_connection(host=None, port=None, *,
+                                   loop=None, **kwds):
+    if loop is None:
+        loop = asyncio.get_event_loop()
+    _, protocol = await loop.create_connection(
+        lambda: RedisProtocol(loop=loop), host, port, **kwds)
+    return protocol, protocol
+
+
+async def open_protocol_unix_connection(address, *, loop=None, **kwds):
+    if loop is None:
+        loop = asyncio.get_event_loop()
+    _, protocol = await loop.create_unix_connection(
+        lambda: RedisProtocol(loop=loop), address, **kwds)
+    return protocol, protocol
+
+
+class StreamReaderProtocol(asyncio.StreamReaderProtocol):
+    """
+    StreamReaderProtocol exposing transport's write flow control state.
+    """
+
+    paused = False
+
+    def pause_writing(self):
+        super().pause_writing()
+        self.paused = True
+
+    def resume_writing(self):
+        super().resume_writing()
+        self.paused = False
+
+    def connection_lost(self, exc):
+        super().connection_lost(exc)
+        self.paused = False
+
+
 class StreamReader(asyncio.StreamReader):
     """
     Override the official StreamReader to address the
@@ -101,3 +142,128 @@ class StreamReader(asyncio.StreamReader):
     readline = _read_not_allowed
     readuntil = _read_not_allowed
     readexactly = _read_not_allowed
+
+
+class RedisProtocol(asyncio.Protocol):
+    """
+    Protocol feeding the Redis parser right from `data_received`
+    and passing every parsed object to the reply callback.
+
+    Serves as both reader and writer for RedisProtocolConnection,
+    replacing StreamReader, StreamReaderProtocol and StreamWriter.
+    """
+
+    def __init__(self, *, loop=None):
+        if loop is None:
+            loop = asyncio.get_event_loop()
+        self._loop = loop
+        self._transport = None
+        self._parser = None
+        self._buffer = bytearray()
+        self._reply_cb = None
+        self._error_cb = None
+        self._eof = False
+        self._paused = False
+        self._drain_waiter = None
+        self._lost = loop.create_future()
+
+    @property
+    def transport(self):
+        return self._transport
+
+    @property
+    def lost(self):
+        """Future done when connection is lost."""
+        return self._lost
+
+    def set_parser(self, parser):
+        self._parser = parser
+        if self._buffer:
+            self._parser.feed(self._buffer)
+            del self._buffer[:]
+
+    def set_callbacks(self, reply_cb, error_cb):
+        """Set callbacks receiving parsed objects and fatal errors.
+
+        Error callback is called with None if server closed connection.
+        """
+        assert self._parser is not None, "set_parser must be called"
+        self._reply_cb = reply_cb
+        self._error_cb = error_cb
+        self._process_replies()
+
+    def unset_callbacks(self):
+        self._reply_cb = self._error_cb = None
+
+    def _process_replies(self):
+        while self._reply_cb is not None:
+            try:
+                obj = self._parser.gets()
+            except Exception as exc:
+                self._error_cb(exc)
+                return
+            if obj is False:
+                return
+            self._reply_cb(obj)
+
+    def _fatal_error(self, exc):
+        if self._error_cb is not None:
+            self._error_cb(exc)
+
+    # asyncio.Protocol interface
+
+    def connection_made(self, transport):
+        self._transport = transport
+
+    def data_received(self, data):
+        if self._parser is None:
+            # XXX: hopefully it's only a small error message
+            self._buffer.extend(data)
+            return
+        self._parser.feed(data)
+        self._process_replies()
+
+    def eof_received(self):
+        self._eof = True
+        self._fatal_error(None)
+
+    def connection_lost(self, exc):
+        self._eof = True
+        self._fatal_error(exc)
+        self._paused = False
+        waiter, self._drain_waiter = self._drain_waiter, None
+        if waiter is not None and not waiter.done():
+            waiter.set_exception(ConnectionResetError('Connection lost'))
+        if not self._lost.done():
+            self._lost.set_result(None)
+
+    def pause_writing(self):
+        self._paused = True
+
+    def resume_writing(self):
+        self._paused = False
+        waiter, self._drain_waiter = self._drain_waiter, None
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
+    # reader/writer interface used by connection
+
+    @property
+    def paused(self):
+        return self._paused
+
+    def at_eof(self):
+        return self._eof
+
+    def write(self, data):
+        self._transport.write(data)
+
+    async def drain(self):
+        if self._eof:
+            raise ConnectionResetError('Connection lost')
+        if not self._paused:
+            return
+        waiter = self._drain_waiter
+        if waiter is None or waiter.done():
+            waiter = self._drain_waiter = self._loop.create_future()
+        await waiter
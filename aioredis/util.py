@@ -1,3 +1,6 @@
+import asyncio
+import functools
+
 from urllib.parse import urlparse, parse_qsl
 
 from .log import logger
@@ -42,26 +45,52 @@ def decode(obj, encoding):
     return obj
 
 
-async def wait_ok(fut):
-    res = await fut
-    if res in (b'QUEUED', 'QUEUED'):
-        return res
+def wait_ok(fut):
+    return _wait_converted(fut, _ok)
+
+
+def wait_convert(fut, type_, **kwargs):
+    if kwargs:
+        type_ = functools.partial(type_, **kwargs)
+    return _wait_converted(fut, type_)
+
+
+def wait_make_dict(fut):
+    return _wait_converted(fut, _make_dict)
+
+
+def _ok(res):
     return res in (b'OK', 'OK')
 
 
-async def wait_convert(fut, type_, **kwargs):
-    result = await fut
-    if result in (b'QUEUED', 'QUEUED'):
-        return result
-    return type_(result, **kwargs)
+def _make_dict(res):
+    it = iter(res)
+    return dict(zip(it, it))
 
 
-async def wait_make_dict(fut):
+def _wait_converted(fut, converter):
+    if isinstance(fut, _ConvertibleFuture):
+        return fut.add_converter(converter)
+    return _convert(fut, converter)
+
+
+async def _convert(fut, converter):
     res = await fut
     if res in (b'QUEUED', 'QUEUED'):
         return res
-    it = iter(res)
-    return dict(zip(it, it))
+    return converter(res)
+
+
+class _ConvertibleFuture(asyncio.Future):
+    """Future of buffered command reply.
+
+    Result conversion of ``wait_*`` helpers is registered with
+    :meth:`add_converter` instead of awaiting future in coroutine.
+    """
+
+    def add_converter(self, converter):
+        """Return awaitable of converted result."""
+        raise NotImplementedError
 
 
 class coerced_keys_dict(dict):
@@ -117,6 +146,17 @@ def _set_exception(fut, exception):
         fut.set_exception(exception)
 
 
+def _chain_result(waiter, fut):
+    """Copy result (or exception) of done fut to waiter."""
+    if fut.cancelled():
+        if not waiter.done():
+            waiter.cancel()
+    elif fut.exception() is not None:
+        _set_exception(waiter, fut.exception())
+    else:
+        _set_result(waiter, fut.result())
+
+
 def parse_url(url):
     """Parse Redis connection URI.
 
@@ -0,0 +1,55 @@
+import asyncio
+import time
+import aioredis
+
+
+async def counted(redis, i):
+    # MultiExec: QUEUED replies are only counted
+    tr = redis.multi_exec()
+    tr.incr('bench:counter')
+    tr.set('bench:key:{}'.format(i % 100), i)
+    tr.get('bench:key:{}'.format(i % 100))
+    return await tr.execute()
+
+
+async def gathered(redis, i):
+    # same transaction as separate commands: future per reply + gather
+    conn = redis.connection
+    res = await asyncio.gather(
+        conn.execute('MULTI'),
+        conn.execute('INCR', 'bench:counter'),
+        conn.execute('SET', 'bench:key:{}'.format(i % 100), i),
+        conn.execute('GET', 'bench:key:{}'.format(i % 100)),
+        conn.execute('EXEC'))
+    return res[-1]
+
+
+async def worker(func, redis, count, offset):
+    for i in range(offset, offset + count):
+        await func(redis, i)
+
+
+async def run(func, redis, concurrency, count):
+    per_worker = count // concurrency
+    start = time.perf_counter()
+    await asyncio.gather(*[worker(func, redis, per_worker, n * per_worker)
+                           for n in range(concurrency)])
+    return per_worker * concurrency / (time.perf_counter() - start)
+
+
+async def main():
+    redis = await aioredis.create_redis('redis://localhost')
+    count = 10000
+    for concurrency in (1, 10, 100):
+        print('concurrency {:>3}: counted {:7.0f} tx/s  gathered {:7.0f} tx/s'
+              .format(concurrency,
+                      await run(counted, redis, concurrency, count),
+                      await run(gathered, redis, concurrency, count)))
+    await redis.delete('bench:counter',
+                       *['bench:key:{}'.format(i) for i in range(100)])
+    redis.close()
+    await redis.wait_closed()
+
+
+if __name__ == '__main__':
+    asyncio.get_event_loop().run_until_complete(main())
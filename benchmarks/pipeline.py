@@ -0,0 +1,39 @@
+import asyncio
+import time
+import aioredis
+
+
+async def pipeline(redis, count):
+    pipe = redis.pipeline()
+    for i in range(count):
+        pipe.set('bench:key', i)    # result converted by callback
+        pipe.incr('bench:counter')  # plain future
+    await pipe.execute()
+
+
+async def tasks(redis, count):
+    # what pipeline used to do: Task per buffered command
+    futs = []
+    for i in range(count):
+        futs.append(asyncio.ensure_future(redis.set('bench:key', i)))
+        futs.append(asyncio.ensure_future(redis.incr('bench:counter')))
+    await asyncio.gather(*futs)
+
+
+async def main():
+    redis = await aioredis.create_redis('redis://localhost')
+    for count in (100, 10000, 100000):
+        for func in (pipeline, tasks):
+            start = time.perf_counter()
+            await func(redis, count // 2)
+            elapsed = time.perf_counter() - start
+            print('{:<9} {:>8} commands: {:8.1f} ms {:9.0f} cmd/s'
+                  .format(func.__name__, count, elapsed * 1e3,
+                          count / elapsed))
+    await redis.delete('bench:key', 'bench:counter')
+    redis.close()
+    await redis.wait_closed()
+
+
+if __name__ == '__main__':
+    asyncio.get_event_loop().run_until_complete(main())
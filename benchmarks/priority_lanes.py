@@ -0,0 +1,55 @@
+import asyncio
+import time
+import aioredis
+
+
+async def bulk_job(redis, stop):
+    # 50k commands sent at once, batch after batch
+    done = 0
+    start = time.perf_counter()
+    while not stop.is_set():
+        await asyncio.gather(*[
+            redis.set('bench:bulk:{}'.format(i % 1000), i)
+            for i in range(50000)])
+        done += 50000
+    return done / (time.perf_counter() - start)
+
+
+async def interactive(redis, duration):
+    # sequential GETs for duration seconds
+    latencies = []
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end:
+        start = time.perf_counter()
+        await redis.get('bench:key')
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(0.001)
+    latencies.sort()
+    return (len(latencies),
+            latencies[len(latencies) // 2] * 1e3,
+            latencies[int(len(latencies) * .99)] * 1e3)
+
+
+async def main():
+    redis = await aioredis.create_redis_pool(
+        'redis://localhost', minsize=2, maxsize=2, bulk_maxsize=1)
+    await redis.set('bench:key', 'value')
+    print('{:<10} {:>5} GETs  p50 {:7.2f} ms  p99 {:7.2f} ms'.format(
+        'idle:', *(await interactive(redis, 5))))
+    # bulk job on the same connections, then on bulk lane connections
+    for name, bulk in (('shared', redis), ('bulk lane', redis.bulk)):
+        stop = asyncio.Event()
+        job = asyncio.ensure_future(bulk_job(bulk, stop))
+        res = await interactive(redis, 5)
+        stop.set()
+        rate = await job
+        print('{:<10} {:>5} GETs  p50 {:7.2f} ms  p99 {:7.2f} ms'
+              '  bulk {:6.0f} cmd/s'.format(name + ':', *res, rate))
+    await redis.delete('bench:key',
+                       *['bench:bulk:{}'.format(i) for i in range(1000)])
+    redis.close()
+    await redis.wait_closed()
+
+
+if __name__ == '__main__':
+    asyncio.get_event_loop().run_until_complete(main())
@@ -0,0 +1,37 @@
+import asyncio
+import os
+import tempfile
+import aioredis
+from aioredis.util import encode_command
+
+
+def report(name, res):
+    print('{:<10} replies: {}  errors: {}  {:.2f}s  {:9.0f} cmd/s'
+          .format(name, res.replies, res.errors, res.elapsed, res.rate))
+
+
+async def main():
+    count = 500
+    redis = await aioredis.create_redis_pool('redis://localhost')
+
+    # commands generated on the fly
+    res = await redis.bulk_load(
+        ('SET', 'bulk:{}'.format(i), i) for i in range(count))
+    report('iterable', res)
+
+    # pre-encoded RESP file (same format as for `redis-cli --pipe`)
+    with tempfile.NamedTemporaryFile(delete=False) as f:
+        for i in range(count):
+            f.write(encode_command(b'SET', 'bulk:{}'.format(i), i))
+    try:
+        res = await redis.bulk_load(f.name)
+        report('RESP file', res)
+    finally:
+        os.unlink(f.name)
+
+    redis.close()
+    await redis.wait_closed()
+
+
+if __name__ == '__main__':
+    asyncio.get_event_loop().run_until_complete(main())
@@ -0,0 +1,48 @@
+import asyncio
+import time
+import aioredis
+from aioredis import Param
+
+
+async def pipeline(redis, profile, user, session, token):
+    pipe = redis.pipeline()
+    for i in range(5):
+        pipe.hgetall(profile, encoding='utf-8')
+        pipe.get(user)
+        pipe.set(session, token)
+        pipe.incr('hits:{}'.format(i))
+    return await pipe.execute()
+
+
+def build(pipe):
+    # same 20 commands, variable arguments are parameters
+    for i in range(5):
+        pipe.hgetall(Param('profile'), encoding='utf-8')
+        pipe.get(Param('user'))
+        pipe.set(Param('session'), Param('token'))
+        pipe.incr('hits:{}'.format(i))
+
+
+async def main():
+    redis = await aioredis.create_redis('redis://localhost')
+    template = redis.pipeline_template(build)
+    runs = 100
+    for name in ('pipeline', 'template'):
+        start = time.perf_counter()
+        for i in range(runs):
+            params = dict(profile='profile:{}'.format(i),
+                          user='user:{}'.format(i),
+                          session='session:{}'.format(i), token=i)
+            if name == 'pipeline':
+                await pipeline(redis, **params)
+            else:
+                await template.execute(**params)
+        elapsed = time.perf_counter() - start
+        print('{:<9} {} runs: {:7.1f} ms  {:6.1f} us/run'
+              .format(name, runs, elapsed * 1e3, elapsed / runs * 1e6))
+    redis.close()
+    await redis.wait_closed()
+
+
+if __name__ == '__main__':
+    asyncio.get_event_loop().run_until_complete(main())
@@ -0,0 +1,36 @@
+import asyncio
+import time
+import aioredis
+
+
+async def timed_get(pool, key):
+    start = time.perf_counter()
+    await pool.execute('get', key)
+    return time.perf_counter() - start
+
+
+async def main():
+    pool = await aioredis.create_pool(
+        'redis://localhost', minsize=4, maxsize=4)
+
+    # slow command occupying one of pooled connections for a second
+    slow = pool.execute('blpop', 'slow-command:list', 1)
+    await asyncio.sleep(0.01)
+
+    latencies = []
+    for _ in range(100):
+        latencies += await asyncio.gather(
+            *[timed_get(pool, 'my-key') for _ in range(20)])
+    await slow
+
+    latencies.sort()
+    for pct in (50, 90, 99, 100):
+        idx = min(len(latencies) - 1, len(latencies) * pct // 100)
+        print('p{:<3} {:8.2f} ms'.format(pct, latencies[idx] * 1e3))
+
+    pool.close()
+    await pool.wait_closed()
+
+
+if __name__ == '__main__':
+    asyncio.get_event_loop().run_until_complete(main())
@@ -0,0 +1,28 @@
+import asyncio
+import time
+import aioredis
+
+
+async def warmup(size, **kwargs):
+    start = time.perf_counter()
+    pool = await aioredis.create_pool(
+        'redis://localhost', minsize=size, maxsize=size, **kwargs)
+    elapsed = time.perf_counter() - start
+    pool.close()
+    await pool.wait_closed()
+    return elapsed
+
+
+async def main():
+    size = 50
+    # every connection sends PING; handshake adds SELECT and CLIENT SETNAME
+    for kwargs in ({}, {'db': 1, 'name': 'warmup'}):
+        for parallelism in (1, 5, 20):
+            elapsed = await warmup(
+                size, create_connection_parallelism=parallelism, **kwargs)
+            print('{!r:<30} parallelism={:<3} {} connections in {:.1f} ms'
+                  .format(kwargs, parallelism, size, elapsed * 1e3))
+
+
+if __name__ == '__main__':
+    asyncio.get_event_loop().run_until_complete(main())
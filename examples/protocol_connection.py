@@ -0,0 +1,36 @@
+import asyncio
+import time
+import aioredis
+
+
+async def latency(conn, count):
+    # sequential round-trips
+    start = time.perf_counter()
+    for _ in range(count):
+        await conn.execute('ping')
+    return (time.perf_counter() - start) / count * 1e6
+
+
+async def throughput(conn, count):
+    # pipelined commands
+    start = time.perf_counter()
+    await asyncio.gather(*[conn.execute('ping') for _ in range(count)])
+    return count / (time.perf_counter() - start)
+
+
+async def main():
+    for cls in (aioredis.RedisConnection, aioredis.RedisProtocolConnection):
+        conn = await aioredis.create_connection(
+            'redis://localhost', connection_cls=cls)
+
+        usec = await latency(conn, 200)
+        ops = await throughput(conn, 500)
+        print('{:<24} latency: {:6.1f} us/cmd  throughput: {:9.0f} cmd/s'
+              .format(cls.__name__, usec, ops))
+
+        conn.close()
+        await conn.wait_closed()
+
+
+if __name__ == '__main__':
+    asyncio.get_event_loop().run_until_complete(main())
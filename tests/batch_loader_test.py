@@ -0,0 +1,102 @@
+import asyncio
+import pytest
+
+from unittest.mock import patch
+
+from aioredis import ReplyError, RedisConnection
+
+
+@pytest.mark.run_loop
+async def test_get(redis, loop):
+    await redis.mset('key:1', 'foo', 'key:2', 'bar')
+    loader = redis.batch_loader()
+    with patch.object(RedisConnection, 'execute',
+                      side_effect=RedisConnection.execute,
+                      autospec=True) as execute:
+        res = await asyncio.gather(
+            loader.get('key:1'),
+            loader.get('key:2'),
+            loader.get('key:1'),
+            loader.get('key:3'),
+            loader.get('key:2', encoding='utf-8'),
+            loop=loop)
+    assert res == [b'foo', b'bar', b'foo', None, 'bar']
+    assert sorted(call[0][1:] for call in execute.call_args_list) == [
+        (b'MGET', b'key:1', b'key:2', b'key:3'),
+        (b'MGET', b'key:2'),
+        ]
+    assert loader.pending == 0
+
+    # keys equal in Python but not in Redis
+    await redis.mset(1, 'int', '1.0', 'float')
+    res = await asyncio.gather(
+        loader.get(1), loader.get(1.0), loader.get(b'1'), loop=loop)
+    assert res == [b'int', b'float', b'int']
+
+
+@pytest.mark.run_loop
+async def test_hget_sismember(redis, loop):
+    await redis.hmset('hash', 'a', 1, 'b', 2)
+    await redis.sadd('set', 'x')
+    loader = redis.batch_loader()
+    res = await asyncio.gather(
+        loader.hget('hash', 'a'),
+        loader.hget('hash', 'b', encoding='utf-8'),
+        loader.hget('hash', 'a'),
+        loader.hget('hash', 'c'),
+        loader.sismember('set', 'x'),
+        loader.sismember('set', 'y'),
+        loader.sismember('set', 'x'),
+        loop=loop)
+    assert res == [b'1', '2', b'1', None, 1, 0, 1]
+
+
+@pytest.mark.run_loop
+async def test_errors(redis, loop):
+    await redis.set('str', 'foo')
+    loader = redis.batch_loader()
+    fut1 = loader.hget('str', 'a')
+    fut2 = loader.hget('str', 'b')
+    with pytest.raises(TypeError):
+        loader.get(None)
+    with pytest.raises(TypeError):
+        loader.sismember('set', None)
+    with pytest.raises(TypeError):
+        loader.hget('hash', True)
+    fut3 = loader.get('str')
+    with pytest.raises(ReplyError, match="WRONGTYPE"):
+        await fut1
+    with pytest.raises(ReplyError, match="WRONGTYPE"):
+        await fut2
+    assert (await fut3) == b'foo'
+
+    fut = loader.get('str')
+    redis.close()
+    await redis.wait_closed()
+    with pytest.raises(Exception):
+        await fut
+
+
+@pytest.mark.run_loop
+async def test_delay_and_max_batch(redis, loop):
+    await redis.set('key', 'foo')
+    loader = redis.batch_loader(delay=.05)
+    fut = loader.get('key')
+    await asyncio.sleep(.01, loop=loop)
+    assert not fut.done()
+    assert loader.pending == 1
+    assert (await fut) == b'foo'
+
+    loader = redis.batch_loader(delay=10, max_batch=3)
+    futs = [loader.get('key') for _ in range(3)]
+    assert loader.pending == 0
+    assert (await asyncio.gather(*futs, loop=loop)) == [b'foo'] * 3
+
+    fut = loader.get('key')
+    loader.flush()
+    assert (await fut) == b'foo'
+
+    with pytest.raises(AssertionError):
+        redis.batch_loader(delay=-1)
+    with pytest.raises(AssertionError):
+        redis.batch_loader(max_batch=0)
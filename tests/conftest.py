@@ -99,6 +99,30 @@ def create_pool(_closable, loop):
     return f
 
 
+@pytest.fixture
+def create_sharded_pool(_closable, loop):
+    """Wrapper around aioredis.create_sharded_pool."""
+
+    async def f(*args, **kw):
+        kw.setdefault('loop', loop)
+        pool = await aioredis.create_sharded_pool(*args, **kw)
+        _closable(pool)
+        return pool
+    return f
+
+
+@pytest.fixture
+def create_replicated_pool(_closable, loop):
+    """Wrapper around aioredis.create_replicated_pool."""
+
+    async def f(*args, **kw):
+        kw.setdefault('loop', loop)
+        pool = await aioredis.create_replicated_pool(*args, **kw)
+        _closable(pool)
+        return pool
+    return f
+
+
 @pytest.fixture
 def create_sentinel(_closable, loop):
     """Helper instantiating RedisSentinel client."""
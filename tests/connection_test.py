@@ -1,3 +1,4 @@
+import io
 import pytest
 import asyncio
 import sys
@@ -9,11 +10,13 @@ from aioredis import (
     ConnectionClosedError,
     ProtocolError,
     RedisConnection,
+    RedisProtocolConnection,
     RedisError,
     ReplyError,
     Channel,
     MaxClientsError,
     )
+from aioredis.util import encode_command, _NOTSET
 
 
 @pytest.mark.run_loop
@@ -598,3 +601,376 @@ async def test_create_connection__unix_url(
     assert await conn.execute('ping') == pong
     assert conn.db == db
     assert conn.encoding == enc
+
+
+@pytest.mark.run_loop
+async def test_write_buffer_limits(create_connection, loop, server):
+    conn = await create_connection(
+        server.tcp_address, write_buffer_limits=(4096, 1024), loop=loop)
+    transport = conn._writer.transport
+    assert transport.get_write_buffer_limits() == (1024, 4096)
+    assert conn.writing_paused is False
+
+    value = b'x' * 2 ** 22
+    fut = conn.execute('set', 'big-key', value)
+    await conn.drain()
+    assert conn.writing_paused is False
+    assert transport.get_write_buffer_size() <= 1024
+    assert (await fut) == b'OK'
+
+
+@pytest.mark.run_loop
+async def test_drain_closed(create_connection, loop, server):
+    conn = await create_connection(server.tcp_address, loop=loop)
+    conn.close()
+    assert conn.writing_paused is False
+    with pytest.raises(ConnectionClosedError):
+        await conn.drain()
+
+
+@pytest.mark.run_loop
+async def test_command_timeout(create_connection, loop, server):
+    conn = await create_connection(
+        server.tcp_address, command_timeout=0.1, loop=loop)
+    assert (await conn.execute('ping')) == b'PONG'
+    assert not conn._deadlines
+    assert conn._timeout_handle is None
+
+    fut1 = conn.execute('blpop', 'command-timeout:list', 0)
+    fut2 = conn.execute('ping')
+    with pytest.raises(asyncio.TimeoutError):
+        await fut1
+    with pytest.raises(ConnectionClosedError):
+        await fut2
+    assert conn.closed
+    with pytest.raises(ConnectionClosedError):
+        conn.execute('ping')
+
+
+@pytest.mark.run_loop
+async def test_command_timeout_override(create_connection, loop, server):
+    conn = await create_connection(
+        server.tcp_address, command_timeout=0.1, loop=loop)
+    res = await conn.execute('blpop', 'command-timeout:list', 1,
+                             timeout=None)
+    assert res is None
+    assert not conn.closed
+
+    fut = conn.execute('blpop', 'command-timeout:list', 0, timeout=0.05)
+    with pytest.raises(asyncio.TimeoutError):
+        await fut
+    assert conn.closed
+
+
+@pytest.mark.run_loop
+async def test_command_timeout_pipelined(create_connection, loop, server):
+    conn = await create_connection(
+        server.tcp_address, command_timeout=10, loop=loop)
+    futs = [conn.execute('ping') for _ in range(100)]
+    assert len(conn._deadlines) == 100
+    await futs[49]
+    assert len(conn._deadlines) <= 50
+    await asyncio.gather(*futs, loop=loop)
+    assert not conn._deadlines
+    assert conn._timeout_handle is None
+
+    fut1 = conn.execute('blpop', 'command-timeout:list', 1)
+    fut2 = conn.execute('ping', timeout=0.05)
+    with pytest.raises(asyncio.TimeoutError):
+        await fut2
+    with pytest.raises(ConnectionClosedError):
+        await fut1
+
+
+@pytest.mark.run_loop
+async def test_command_timeout_invalid(create_connection, loop, server):
+    with pytest.raises(ValueError):
+        await create_connection(
+            server.tcp_address, command_timeout=0, loop=loop)
+    conn = await create_connection(server.tcp_address, loop=loop)
+    for timeout in (0, -5):
+        with pytest.raises(ValueError):
+            conn.execute('ping', timeout=timeout)
+    assert not conn._waiters
+    assert (await conn.execute('ping')) == b'PONG'
+    assert not conn.closed
+
+
+@pytest.redis_version(3, 2, 0, reason="CLIENT REPLY is available since 3.2")
+@pytest.mark.run_loop
+async def test_execute_noreply(create_connection, loop, server):
+    conn = await create_connection(server.tcp_address, loop=loop)
+    await conn.execute('del', 'noreply:key', 'noreply:str')
+
+    for _ in range(10):
+        assert conn.execute_noreply('incr', 'noreply:key') is None
+    assert not conn._waiters
+    assert (await conn.execute('get', 'noreply:key')) == b'10'
+
+    await conn.execute('set', 'noreply:str', 'value')
+    conn.execute_noreply('incr', 'noreply:str')
+    assert (await conn.execute('ping')) == b'PONG'
+    assert not conn.closed
+
+
+@pytest.mark.run_loop
+async def test_execute_noreply_errors(create_connection, loop, server):
+    conn = await create_connection(server.tcp_address, loop=loop)
+
+    with pytest.raises(TypeError):
+        conn.execute_noreply(None)
+    with pytest.raises(TypeError):
+        conn.execute_noreply('set', 'key', None)
+    for cmd in ('select', 'multi', 'exec', 'discard', 'client', 'subscribe'):
+        with pytest.raises(ValueError):
+            conn.execute_noreply(cmd, 1)
+
+    await conn.execute('multi')
+    with pytest.raises(RedisError):
+        conn.execute_noreply('incr', 'noreply:key')
+    await conn.execute('discard')
+
+    await conn.execute_pubsub('subscribe', 'noreply:chan')
+    with pytest.raises(RedisError):
+        conn.execute_noreply('incr', 'noreply:key')
+
+    conn.close()
+    await conn.wait_closed()
+    with pytest.raises(ConnectionClosedError):
+        conn.execute_noreply('incr', 'noreply:key')
+
+
+@pytest.mark.run_loop
+async def test_handshake_pipelined(create_connection, loop, server):
+    pending = []
+
+    class Connection(RedisConnection):
+        def execute(self, *args, **kwargs):
+            fut = super().execute(*args, **kwargs)
+            pending.append(len(self._waiters))
+            return fut
+
+    conn = await create_connection(
+        server.tcp_address, db=1, name='handshake', ping=True,
+        connection_cls=Connection, loop=loop)
+    assert pending == [1, 2, 3]
+    assert conn.db == 1
+    assert (await conn.execute('client', 'getname')) == b'handshake'
+
+
+@pytest.mark.run_loop
+async def test_handshake_errors(create_connection, loop, server):
+    with pytest.raises(ReplyError):
+        await create_connection(
+            server.tcp_address, password='pass', db=100000, loop=loop)
+    with pytest.raises(ReplyError):
+        await create_connection(
+            server.tcp_address, db=1, name='bad name', loop=loop)
+
+
+@pytest.mark.run_loop
+async def test_protocol_connection(create_connection, loop, server):
+    conn = await create_connection(
+        server.tcp_address, db=1, connection_cls=RedisProtocolConnection,
+        loop=loop)
+    assert conn._reader_task is None
+    assert conn.db == 1
+    assert (await conn.execute('ping')) == b'PONG'
+
+    res = await asyncio.gather(*[conn.execute('echo', 'value:{}'.format(i))
+                                 for i in range(100)], loop=loop)
+    assert res == ['value:{}'.format(i).encode() for i in range(100)]
+
+    with pytest.raises(ReplyError):
+        await conn.execute('no-such-command')
+    await conn.execute('multi')
+    conn.execute('set', 'proto:key', 'value')
+    assert (await conn.execute('exec')) == [b'OK']
+    assert (await conn.execute('get', 'proto:key',
+                               encoding='utf-8')) == 'value'
+
+    conn.close()
+    await conn.wait_closed()
+    assert conn.closed
+    with pytest.raises(ConnectionClosedError):
+        conn.execute('ping')
+
+
+@pytest.mark.skipif(sys.platform == 'win32',
+                    reason="No unixsocket on Windows")
+@pytest.mark.run_loop
+async def test_protocol_connection_unix(create_connection, loop, server):
+    conn = await create_connection(
+        server.unixsocket, connection_cls=RedisProtocolConnection,
+        loop=loop)
+    assert (await conn.execute('ping')) == b'PONG'
+
+
+@pytest.mark.run_loop
+async def test_protocol_connection_pubsub(create_connection, loop, server):
+    sub = await create_connection(
+        server.tcp_address, connection_cls=RedisProtocolConnection,
+        loop=loop)
+    pub = await create_connection(server.tcp_address, loop=loop)
+
+    await sub.execute_pubsub('subscribe', 'proto:chan')
+    assert sub.in_pubsub == 1
+    ch = sub.pubsub_channels['proto:chan']
+    await pub.execute('publish', 'proto:chan', 'hello')
+    assert (await ch.get()) == b'hello'
+    await sub.execute_pubsub('unsubscribe', 'proto:chan')
+    assert not sub.in_pubsub
+    assert (await sub.execute('ping')) == b'PONG'
+
+
+@pytest.mark.run_loop
+async def test_protocol_connection_closed_by_server(
+        create_connection, loop, server):
+    conn = await create_connection(
+        server.tcp_address, connection_cls=RedisProtocolConnection,
+        loop=loop)
+    fut1 = conn.execute('quit')
+    fut2 = conn.execute('ping')
+    assert (await fut1) == b'OK'
+    with pytest.raises(ConnectionClosedError):
+        await fut2
+    await conn.wait_closed()
+    assert conn.closed
+
+
+@pytest.mark.run_loop
+async def test_protocol_connection_drain(create_connection, loop, server):
+    conn = await create_connection(
+        server.tcp_address, connection_cls=RedisProtocolConnection,
+        write_buffer_limits=(4096, 1024), loop=loop)
+    transport = conn._writer.transport
+    assert transport.get_write_buffer_limits() == (1024, 4096)
+
+    fut = conn.execute('set', 'proto:big-key', b'x' * 2 ** 22)
+    await conn.drain()
+    assert conn.writing_paused is False
+    assert transport.get_write_buffer_size() <= 1024
+    assert (await fut) == b'OK'
+    conn.close()
+    with pytest.raises(ConnectionClosedError):
+        await conn.drain()
+
+
+@pytest.mark.run_loop
+async def test_execute_pipeline(create_connection, loop, server):
+    conn = await create_connection(server.tcp_address, loop=loop)
+    futs = [loop.create_future() for _ in range(4)]
+    with patch.object(conn._writer, 'write',
+                      wraps=conn._writer.write) as write:
+        conn.execute_pipeline([
+            (futs[0], 'set', ('pipe:key', 'value'), {}),
+            (futs[1], 'get', ('pipe:key',), {'encoding': 'utf-8'}),
+            (futs[2], 'get', (None,), {}),
+            (futs[3], 'echo', ('value',), {}),
+            ])
+    assert write.call_count == 1
+    res = await asyncio.gather(*futs, loop=loop, return_exceptions=True)
+    assert res[0] == b'OK'
+    assert res[1] == 'value'
+    assert isinstance(res[2], TypeError)
+    assert res[3] == b'value'
+
+
+@pytest.mark.run_loop
+async def test_execute_encoded(create_connection, loop, server):
+    conn = await create_connection(server.tcp_address, loop=loop,
+                                   encoding='utf-8')
+    futs = [loop.create_future() for _ in range(3)]
+    data = b''.join(bytes(encode_command(*cmd)) for cmd in [
+        ('set', 'enc:key', 'value'), ('get', 'enc:key'), ('get', 'enc:key')])
+    conn.execute_encoded(data, [
+        (futs[0], None, lambda res: res == b'OK'),
+        (futs[1], _NOTSET, None),
+        (futs[2], None, None),
+        ])
+    res = await asyncio.gather(*futs, loop=loop)
+    assert res == [True, 'value', b'value']
+
+
+@pytest.mark.run_loop
+async def test_bulk_load(create_connection, loop, server, tmpdir):
+    conn = await create_connection(server.tcp_address, loop=loop)
+    await conn.execute('del', 'bulk:list', 'bulk:str')
+    cmds = [('RPUSH', 'bulk:list', i) for i in range(1000)]
+    cmds.append(('SET', 'bulk:str', 'value'))
+    cmds.append(('INCR', 'bulk:str'))
+
+    with patch.object(loop, 'create_future',
+                      wraps=loop.create_future) as create_future:
+        res = await conn.bulk_load(iter(cmds), chunk_size=1024)
+    # no future per command
+    assert create_future.call_count < 10
+    assert res.replies == 1002
+    assert res.errors == 1
+    assert isinstance(res.last_error, ReplyError)
+    assert res.elapsed > 0
+    assert res.rate > 0
+    assert not conn._waiters
+    assert (await conn.execute('llen', 'bulk:list')) == 1000
+
+    class Source:
+        def __init__(self):
+            self.cmds = iter(cmds[:10])
+
+        def __aiter__(self):
+            return self
+
+        async def __anext__(self):
+            for cmd in self.cmds:
+                return cmd
+            raise StopAsyncIteration    # noqa
+
+    res = await conn.bulk_load(Source())
+    assert (res.replies, res.errors) == (10, 0)
+    assert (await conn.execute('llen', 'bulk:list')) == 1010
+
+    data = b''.join(b'*3\r\n$5\r\nRPUSH\r\n$9\r\nbulk:list\r\n$1\r\nx\r\n'
+                    for _ in range(100))
+    path = tmpdir.join('bulk.resp')
+    path.write_binary(data)
+    res = await conn.bulk_load(str(path), chunk_size=100)
+    assert (res.replies, res.errors) == (100, 0)
+    assert (await conn.execute('llen', 'bulk:list')) == 1110
+    with open(str(path), 'rb') as f:
+        res = await conn.bulk_load(f)
+    assert res.replies == 100
+    res = await conn.bulk_load(io.BytesIO(data), chunk_size=7)
+    assert res.replies == 100
+    res = await conn.bulk_load(io.BytesIO())
+    assert (res.replies, res.errors) == (0, 0)
+    assert (await conn.execute('llen', 'bulk:list')) == 1310
+
+
+@pytest.mark.run_loop
+async def test_bulk_load_errors(create_connection, loop, server):
+    conn = await create_connection(server.tcp_address, loop=loop)
+
+    with pytest.raises(TypeError):
+        await conn.bulk_load([('SET', 'bulk:key', 1), ('SET', 'key', None)])
+    assert not conn._waiters
+    assert (await conn.execute('get', 'bulk:key')) == b'1'
+
+    cmds = (('PING',) for _ in range(10000))
+    fut = asyncio.ensure_future(conn.bulk_load(cmds, chunk_size=14),
+                                loop=loop)
+    await asyncio.sleep(0, loop=loop)
+    with pytest.raises(RedisError, match="bulk load"):
+        conn.execute('ping')
+    with pytest.raises(RedisError, match="bulk load"):
+        await conn.bulk_load([])
+    assert (await fut).replies == 10000
+    assert (await conn.execute('ping')) == b'PONG'
+
+    fut = asyncio.ensure_future(conn.bulk_load([('PING',)] * 10000),
+                                loop=loop)
+    await asyncio.sleep(0, loop=loop)
+    conn.close()
+    with pytest.raises(ConnectionClosedError):
+        await fut
+    with pytest.raises(ConnectionClosedError):
+        await conn.bulk_load([])
@@ -0,0 +1,61 @@
+from aioredis.metrics import Histogram, PoolMetrics
+
+
+def test_histogram():
+    hist = Histogram((1, 2, 5))
+    assert hist.quantile(.5) == 0
+    for val in (0.5, 1, 1.5, 3, 10):
+        hist.observe(val)
+    assert hist.count == 5
+    assert hist.sum == 16
+    assert hist.max == 10
+    assert hist.counts == [2, 1, 1, 1]
+    assert hist.quantile(0) == 1
+    assert hist.quantile(.4) == 1
+    assert hist.quantile(.5) == 2
+    assert hist.quantile(.8) == 5
+    assert hist.quantile(1) == 10
+
+    snap = hist.snapshot()
+    assert snap['mean'] == 16 / 5
+    assert snap['buckets'] == [(1, 2), (2, 1), (5, 1), (float('inf'), 1)]
+
+    hist.reset()
+    assert hist.count == 0
+    assert hist.counts == [0, 0, 0, 0]
+
+
+def test_pool_metrics_snapshot():
+    metrics = PoolMetrics()
+    metrics.created += 1
+    metrics.in_flight.observe(3)
+    snap = metrics.snapshot()
+    assert snap['created'] == 1
+    assert snap['in_flight']['count'] == 1
+    assert 'size' not in snap
+
+    metrics.bind(lambda: {'size': 5})
+    assert metrics.snapshot()['size'] == 5
+
+    metrics.reset()
+    snap = metrics.snapshot()
+    assert snap['created'] == 0
+    assert snap['in_flight']['count'] == 0
+
+
+def test_pool_metrics_watch_conflict():
+    metrics = PoolMetrics()
+    metrics.watch_conflict(('foo', 'bar'))
+    metrics.watch_conflict(('foo',))
+    assert metrics.transaction_conflicts == 2
+    assert metrics.snapshot()['conflict_keys'] == [('foo', 2), ('bar', 1)]
+
+    for i in range(2000):
+        metrics.watch_conflict(('key:{}'.format(i),))
+    metrics.watch_conflict(('foo',))
+    assert len(metrics.conflict_keys) == 1000
+    assert metrics.conflict_keys['foo'] == 3
+
+    metrics.reset()
+    assert metrics.transaction_conflicts == 0
+    assert not metrics.conflict_keys
@@ -10,6 +10,10 @@ from aioredis import (
     ConnectionClosedError,
     ConnectionsPool,
     MaxClientsError,
+    RedisError,
+    PoolMetrics,
+    RedisConnection,
+    Redis,
     )
 
 
@@ -552,3 +556,588 @@ async def test_async_with(create_pool, server, loop):
     async with pool.get() as conn:
         msg = await conn.execute('echo', 'hello')
         assert msg == b'hello'
+
+
+@pytest.mark.run_loop
+async def test_get_connection_writing_paused(create_pool, server, loop):
+    pool = await create_pool(server.tcp_address, minsize=2, maxsize=2,
+                             write_buffer_limits=(4096, 1024), loop=loop)
+    conn1, conn2 = pool._pool
+    assert not conn1.writing_paused and not conn2.writing_paused
+
+    fut1 = conn1.execute('set', 'paused:key1', b'x' * 2 ** 25)
+    assert conn1.writing_paused
+    for _ in range(3):
+        conn, _ = pool.get_connection('get')
+        assert conn is conn2
+
+    fut2 = conn2.execute('set', 'paused:key2', b'x' * 2 ** 25)
+    assert conn2.writing_paused
+    conn, _ = pool.get_connection('get')
+    assert conn in (conn1, conn2)
+
+    assert (await fut1) == b'OK'
+    assert (await fut2) == b'OK'
+    assert not conn1.writing_paused and not conn2.writing_paused
+
+
+@pytest.mark.run_loop
+async def test_get_connection_least_loaded(create_pool, server, loop):
+    pool = await create_pool(server.tcp_address, minsize=3, maxsize=3,
+                             loop=loop)
+    conn1, conn2, conn3 = pool._pool
+    fut1 = conn1.execute('blpop', 'least-loaded:list', 1)
+    for _ in range(6):
+        conn, _ = pool.get_connection('get')
+        assert conn is not conn1
+
+    fut2 = conn2.execute('blpop', 'least-loaded:list', 1)
+    futs = [conn3.execute('ping') for _ in range(3)]
+    conn1.execute('ping')
+    for _ in range(3):
+        conn, _ = pool.get_connection('get')
+        assert conn is conn2
+    await asyncio.gather(*futs, loop=loop)
+
+    # conn1 and conn2 are stalled by blpop
+    await asyncio.sleep(0.05, loop=loop)
+    futs = [conn3.execute('ping') for _ in range(5)]
+    for _ in range(3):
+        conn, _ = pool.get_connection('get')
+        assert conn is conn3
+    await asyncio.gather(fut1, fut2, *futs, loop=loop)
+
+
+@pytest.mark.run_loop
+async def test_pool_command_timeout(create_pool, server, loop):
+    pool = await create_pool(server.tcp_address, minsize=1,
+                             command_timeout=0.1, loop=loop)
+    with pytest.raises(asyncio.TimeoutError):
+        await pool.execute('blpop', 'pool-command-timeout:list', 0)
+    assert pool.freesize == 1
+    assert (await pool.execute('ping')) == b'PONG'
+    assert pool.freesize == 1
+
+
+@pytest.redis_version(3, 2, 0, reason="CLIENT REPLY is available since 3.2")
+@pytest.mark.run_loop
+async def test_pool_execute_noreply(create_pool, server, loop):
+    pool = await create_pool(server.tcp_address, minsize=0, loop=loop)
+    await pool.execute('del', 'noreply:key')
+    assert pool.freesize == 1
+
+    assert (await pool.execute_noreply('incr', 'noreply:key')) is None
+    assert (await pool.execute('get', 'noreply:key')) == b'1'
+
+    with (await pool):
+        assert pool.freesize == 0
+        fut = asyncio.ensure_future(
+            pool.execute_noreply('incr', 'noreply:key'), loop=loop)
+        await asyncio.sleep(0, loop=loop)
+        assert not fut.done()
+    assert (await fut) is None
+    assert (await pool.execute('get', 'noreply:key')) == b'2'
+
+
+@pytest.mark.run_loop
+async def test_pool_execute_noreply_errors(create_pool, server, loop):
+    pool = await create_pool(server.tcp_address, minsize=2, loop=loop)
+    assert pool.freesize == 2
+
+    for cmd in ('subscribe', 'SELECT', b'multi', 'client'):
+        with pytest.raises(ValueError):
+            await pool.execute_noreply(cmd, 'x')
+    with pytest.raises(TypeError):
+        await pool.execute_noreply(None)
+    assert pool.freesize == 2
+    assert pool._pubsub_conn is None
+
+    pool.close()
+    await pool.wait_closed()
+    with pytest.raises(PoolClosedError):
+        await pool.execute_noreply('incr', 'noreply:key')
+
+
+@pytest.mark.run_loop
+async def test_pool_connection_name(create_pool, server, loop):
+    pool = await create_pool(server.tcp_address, minsize=2,
+                             name='pool-conn', loop=loop)
+    assert pool.freesize == 2
+    for conn in list(pool._pool):
+        assert (await conn.execute('client', 'getname')) == b'pool-conn'
+
+
+@pytest.mark.run_loop
+async def test_acquire_fifo(create_pool, server, loop):
+    pool = await create_pool(server.tcp_address, minsize=1, maxsize=1,
+                             loop=loop)
+    conn = await pool.acquire()
+    order = []
+
+    async def worker(i):
+        with (await pool) as c:
+            order.append(i)
+            assert c is conn
+            await asyncio.sleep(0, loop=loop)
+
+    tasks = []
+    for i in range(5):
+        tasks.append(asyncio.ensure_future(worker(i), loop=loop))
+        await asyncio.sleep(0, loop=loop)
+    assert len(pool._acquire_waiters) == 5
+
+    with patch('asyncio.ensure_future') as ensure_future:
+        pool.release(conn)
+        assert not ensure_future.called
+    await asyncio.gather(*tasks, loop=loop)
+    assert order == [0, 1, 2, 3, 4]
+    assert pool.freesize == 1
+    assert not pool._acquire_waiters
+
+
+@pytest.mark.run_loop
+async def test_acquire_cancelled(create_pool, server, loop):
+    pool = await create_pool(server.tcp_address, minsize=1, maxsize=1,
+                             loop=loop)
+    conn = await pool.acquire()
+
+    task1 = asyncio.ensure_future(pool.acquire(), loop=loop)
+    task2 = asyncio.ensure_future(pool.acquire(), loop=loop)
+    await asyncio.sleep(0, loop=loop)
+    task1.cancel()
+    pool.release(conn)
+    assert (await task2) is conn
+    with pytest.raises(asyncio.CancelledError):
+        await task1
+
+    # connection handed over right before waiter got cancelled
+    task3 = asyncio.ensure_future(pool.acquire(), loop=loop)
+    await asyncio.sleep(0, loop=loop)
+    pool.release(conn)
+    task3.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task3
+    assert pool.freesize == 1
+    assert (await pool.acquire()) is conn
+
+
+@pytest.mark.run_loop
+async def test_acquire_after_dropped(create_pool, server, loop):
+    pool = await create_pool(server.tcp_address, minsize=1, maxsize=1,
+                             loop=loop)
+    conn = await pool.acquire()
+    task = asyncio.ensure_future(pool.acquire(), loop=loop)
+    await asyncio.sleep(0, loop=loop)
+    conn.close()
+    pool.release(conn)
+    new_conn = await task
+    assert new_conn is not conn
+    assert not new_conn.closed
+    pool.release(new_conn)
+
+
+@pytest.mark.run_loop
+async def test_pool_close__waiters(create_pool, server, loop):
+    pool = await create_pool(server.tcp_address, minsize=1, maxsize=1,
+                             loop=loop)
+    conn = await pool.acquire()
+    task = asyncio.ensure_future(pool.acquire(), loop=loop)
+    await asyncio.sleep(0, loop=loop)
+    pool.close()
+    with pytest.raises(PoolClosedError):
+        await task
+    pool.release(conn)
+    await pool.wait_closed()
+
+
+@pytest.mark.run_loop
+async def test_fill_free_parallel(create_pool, server, loop):
+    pool = await create_pool(server.tcp_address, minsize=0, maxsize=10,
+                             create_connection_parallelism=3, loop=loop)
+    assert pool.size == 0
+    create_new_connection = pool._create_new_connection
+    calls = in_flight = max_in_flight = 0
+
+    async def create(address):
+        nonlocal calls, in_flight, max_in_flight
+        calls += 1
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        try:
+            if calls == 4:
+                raise ConnectionRefusedError()
+            return (await create_new_connection(address))
+        finally:
+            in_flight -= 1
+
+    pool._create_new_connection = create
+    pool._minsize = 8
+    with pytest.raises(ConnectionRefusedError):
+        await pool._fill_free(override_min=False)
+    assert max_in_flight == 3
+    assert pool._acquiring == 0
+    assert pool.freesize == 7
+
+    await pool._fill_free(override_min=False)
+    assert pool.freesize == 8
+    assert calls == 9
+
+
+@pytest.mark.run_loop
+async def test_pool_max_idle_time(create_pool, server, loop):
+    pool = await create_pool(server.tcp_address, minsize=1, maxsize=5,
+                             max_idle_time=0.1, loop=loop)
+    conns = [await pool.acquire() for _ in range(3)]
+    for conn in conns:
+        pool.release(conn)
+    assert pool.freesize == 3
+
+    # connections in use are kept
+    await pool.execute('ping')
+    await asyncio.sleep(0.3, loop=loop)
+    assert pool.size == 1
+    assert pool.freesize == 1
+    assert sum(c.closed for c in conns) == 2
+    assert (await pool.execute('ping')) == b'PONG'
+
+
+@pytest.mark.run_loop
+async def test_pool_max_lifetime(create_pool, server, loop):
+    pool = await create_pool(server.tcp_address, minsize=2, maxsize=2,
+                             max_lifetime=0.1, loop=loop)
+    conns = set(pool._pool)
+    assert len(conns) == 2
+    for _ in range(20):
+        await asyncio.sleep(0.02, loop=loop)
+        # connections are rotated one by one
+        assert pool.freesize >= 1
+        assert (await pool.execute('ping')) == b'PONG'
+    # next replacement may be in progress
+    assert pool.size == 2
+    assert not conns & set(pool._pool)
+    assert all(conn.closed for conn in conns)
+
+    pool.close()
+    await pool.wait_closed()
+    assert pool._maintenance_task is None
+
+
+@pytest.mark.run_loop
+async def test_pool_multiplex(create_pool, server, loop):
+    pool = await create_pool(server.tcp_address, minsize=1, maxsize=2,
+                             multiplex=True, loop=loop)
+    assert pool.multiplex
+    res = await asyncio.gather(*[pool.execute('incr', 'multiplex:counter')
+                                 for _ in range(100)], loop=loop)
+    assert sorted(res) == list(range(1, 101))
+    assert pool.size == 1
+
+    # blocking command does not block shared connection
+    fut = asyncio.ensure_future(
+        pool.execute('blpop', 'multiplex:list', 1), loop=loop)
+    await asyncio.sleep(0.01, loop=loop)
+    assert pool.freesize == 0
+    res = await asyncio.wait_for(pool.execute('ping'), 0.5, loop=loop)
+    assert res == b'PONG'
+    assert pool.size == 2
+    assert (await fut) is None
+    assert pool.freesize == 2
+
+    with pytest.raises(RedisError):
+        pool.execute('multi')
+    with pytest.raises(RedisError):
+        pool.execute('watch', 'multiplex:counter')
+
+
+@pytest.mark.run_loop
+async def test_pool_multiplex_no_free(create_pool, server, loop):
+    pool = await create_pool(server.tcp_address, minsize=1, maxsize=1,
+                             multiplex=True, loop=loop)
+    with (await pool) as conn:
+        assert pool.get_connection('get') == (None, pool.address)
+        futs = [asyncio.ensure_future(pool.execute('ping'), loop=loop)
+                for _ in range(10)]
+        await asyncio.sleep(0, loop=loop)
+        assert not any(fut.done() for fut in futs)
+    # commands are pipelined and connection is released at once
+    res = await asyncio.gather(*futs, loop=loop)
+    assert res == [b'PONG'] * 10
+    assert pool.freesize == 1
+    assert not pool._pool[0].closed
+    assert pool._pool[0] is conn
+
+
+@pytest.mark.run_loop
+async def test_pool_blocking_maxsize(create_pool, server, loop):
+    pool = await create_pool(server.tcp_address, minsize=1, maxsize=1,
+                             blocking_maxsize=2, loop=loop)
+    blocking = pool.blocking_pool
+    assert blocking is not None
+    assert blocking.size == 0
+    assert blocking.maxsize == 2
+
+    futs = [asyncio.ensure_future(
+        pool.execute('blpop', 'blocking:list', 1), loop=loop)
+        for _ in range(3)]
+    await asyncio.sleep(0.01, loop=loop)
+    assert blocking.size == 2
+    assert blocking.freesize == 0
+    # non-blocking commands do not wait behind blpop
+    res = await asyncio.wait_for(pool.execute('ping'), 0.5, loop=loop)
+    assert res == b'PONG'
+    assert pool.size == 1
+
+    await pool.execute('rpush', 'blocking:list', 'a', 'b', 'c')
+    res = await asyncio.gather(*futs, loop=loop)
+    assert sorted(res) == [[b'blocking:list', b'a'],
+                           [b'blocking:list', b'b'],
+                           [b'blocking:list', b'c']]
+    assert blocking.size == 2
+    assert blocking.freesize == 2
+
+    # connections are reused for consecutive blocking commands
+    conns = set(blocking._pool)
+    await pool.execute('rpush', 'blocking:list', 'd')
+    res = await pool.execute('brpop', 'blocking:list', 1)
+    assert res == [b'blocking:list', b'd']
+    assert set(blocking._pool) == conns
+
+
+@pytest.mark.run_loop
+async def test_pool_blocking_maxsize_select(create_pool, server, loop):
+    pool = await create_pool(server.tcp_address, minsize=1, maxsize=1,
+                             blocking_maxsize=1, loop=loop)
+    await pool.execute('blpop', 'blocking:list', 0.1)
+    assert (await pool.select(1)) is True
+    assert pool.db == 1
+    assert pool.blocking_pool.db == 1
+    assert pool.blocking_pool._pool[0].db == 1
+
+    pool.close()
+    await pool.wait_closed()
+    assert pool.blocking_pool.closed
+
+
+@pytest.mark.run_loop
+async def test_pool_metrics(create_pool, server, loop):
+    metrics = PoolMetrics()
+    pool = await create_pool(server.tcp_address, minsize=1, maxsize=1,
+                             metrics=metrics, loop=loop)
+    assert pool.metrics is metrics
+    assert metrics.created == 1
+    assert metrics.create_latency.count == 1
+
+    await asyncio.gather(*[pool.execute('ping') for _ in range(10)],
+                         loop=loop)
+    assert metrics.in_flight.count == 10
+    assert metrics.in_flight.max == 9
+
+    conn = await pool.acquire()
+    fut = asyncio.ensure_future(pool.acquire(), loop=loop)
+    await asyncio.sleep(0.01, loop=loop)
+    assert metrics.waits == 1
+    pool.release(conn)
+    conn = await fut
+    assert metrics.acquired == 2
+    assert metrics.acquire_wait.max >= 0.01
+
+    conn.close()
+    pool.release(conn)
+    assert metrics.closed == 1
+
+    snap = metrics.snapshot()
+    assert snap['size'] == 0
+    assert snap['maxsize'] == 1
+    assert snap['waits'] == 1
+    assert snap['acquire_wait']['count'] == 2
+
+
+@pytest.mark.run_loop
+async def test_pool_metrics_callback(create_pool, server, loop):
+    snapshots = []
+    metrics = PoolMetrics(callback=snapshots.append, interval=0.01)
+    pool = await create_pool(server.tcp_address, minsize=2, maxsize=2,
+                             metrics=metrics, loop=loop)
+    await asyncio.sleep(0.05, loop=loop)
+    assert snapshots
+    assert snapshots[-1]['size'] == 2
+    assert snapshots[-1]['created'] == 2
+
+    pool.close()
+    await pool.wait_closed()
+    count = len(snapshots)
+    await asyncio.sleep(0.05, loop=loop)
+    assert len(snapshots) == count
+    assert metrics.closed == 2
+
+
+@pytest.mark.run_loop
+async def test_pool_multi_db(create_pool, server, loop):
+    pool = await create_pool(server.tcp_address, minsize=1, maxsize=2,
+                             multi_db=True, loop=loop)
+    assert pool.multi_db
+    await pool.execute('set', 'multi_db:key', 'db0')
+    await pool.execute('set', 'multi_db:key', 'db3', db=3)
+    assert pool.size == 2
+    assert sorted(conn.db for conn in pool._pool) == [0, 3]
+
+    # connections are reused for their db
+    res = await asyncio.gather(*[
+        pool.execute('get', 'multi_db:key', db=db)
+        for db in (0, 3, 0, 3)], loop=loop)
+    assert res == [b'db0', b'db3', b'db0', b'db3']
+    assert pool.size == 2
+    assert sorted(conn.db for conn in pool._pool) == [0, 3]
+
+    # pool is full, free connection is switched
+    res = await pool.execute('get', 'multi_db:key', db=5)
+    assert res is None
+    assert pool.size == 2
+    assert sorted(conn.db for conn in pool._pool) in ([0, 5], [3, 5])
+
+    with (await pool) as conn:
+        assert conn.db == 0
+    conn = await pool.acquire(db=3)
+    assert conn.db == 3
+    pool.release(conn)
+    assert conn in pool._pool
+
+
+@pytest.mark.run_loop
+async def test_pool_multi_db_select(create_pool, server, loop):
+    pool = await create_pool(server.tcp_address, minsize=1, maxsize=2,
+                             multi_db=True, loop=loop)
+    conn = pool._pool[0]
+    assert (await pool.select(1)) is True
+    assert pool.db == 1
+    assert conn.db == 1
+    with (await pool) as conn:
+        assert conn.db == 1
+    with pytest.raises(ValueError):
+        await pool.select(-1)
+    assert pool.db == 1
+
+
+@pytest.mark.run_loop
+async def test_pool_bulk_load(create_pool, server, loop):
+    pool = await create_pool(server.tcp_address, minsize=1, loop=loop)
+    await pool.execute('del', 'bulk:key')
+    res = await pool.bulk_load(('INCR', 'bulk:key') for _ in range(100))
+    assert (res.replies, res.errors) == (100, 0)
+    assert pool.freesize == 1
+    assert (await pool.execute('get', 'bulk:key')) == b'100'
+
+
+@pytest.mark.run_loop
+async def test_pool_single_flight(create_pool, server, loop):
+    metrics = PoolMetrics()
+    pool = await create_pool(server.tcp_address, minsize=1, maxsize=1,
+                             single_flight=1, metrics=metrics, loop=loop)
+    assert pool.single_flight == 1
+    await pool.execute('set', 'sf:key', 'foo')
+    with patch.object(RedisConnection, 'execute',
+                      side_effect=RedisConnection.execute,
+                      autospec=True) as execute:
+        res = await asyncio.gather(*[
+            pool.execute('get', 'sf:key') for _ in range(100)], loop=loop)
+        assert res == [b'foo'] * 100
+        assert execute.call_count == 1
+        assert metrics.shared == 99
+        assert not pool._flights
+
+        # other args and encoding, write commands are not shared
+        execute.reset_mock()
+        res = await asyncio.gather(
+            pool.execute('get', 'sf:key'),
+            pool.execute('get', 'sf:key', encoding='utf-8'),
+            pool.execute('get', 'sf:other'),
+            pool.execute('incr', 'sf:counter'),
+            pool.execute('incr', 'sf:counter'),
+            pool.execute('srandmember', 'sf:set'),
+            pool.execute('srandmember', 'sf:set'),
+            loop=loop)
+        assert res == [b'foo', 'foo', None, 1, 2, None, None]
+        assert execute.call_count == 7
+
+        # args equal in Python but encoded differently are not shared
+        await pool.execute('mset', 1, 'int', '1.0', 'float')
+        execute.reset_mock()
+        res = await asyncio.gather(
+            pool.execute('get', 1),
+            pool.execute('get', 1.0),
+            pool.execute('get', b'1'),
+            loop=loop)
+        assert res == [b'int', b'float', b'int']
+        assert execute.call_count == 2
+        with pytest.raises(TypeError):
+            pool.execute('get', True)
+
+        # caller cancelling its future does not affect others
+        execute.reset_mock()
+        fut1 = pool.execute('get', 'sf:key')
+        fut2 = pool.execute('get', 'sf:key')
+        fut1.cancel()
+        assert (await fut2) == b'foo'
+        assert execute.call_count == 1
+
+
+@pytest.mark.run_loop
+async def test_pool_single_flight_max_age(create_pool, create_connection,
+                                          server, loop):
+    pool = await create_pool(server.tcp_address, minsize=1, maxsize=1,
+                             single_flight=0.01, loop=loop)
+    conn = await create_connection(server.tcp_address, loop=loop)
+    await pool.execute('set', 'sf:key', 'foo')
+    # keep commands in flight
+    await conn.execute('client', 'pause', 100)
+    with patch.object(RedisConnection, 'execute',
+                      side_effect=RedisConnection.execute,
+                      autospec=True) as execute:
+        fut1 = pool.execute('get', 'sf:key')
+        fut2 = pool.execute('get', 'sf:key')
+        await asyncio.sleep(0.02, loop=loop)
+        fut3 = pool.execute('get', 'sf:key')
+        res = await asyncio.gather(fut1, fut2, fut3, loop=loop)
+    assert res == [b'foo'] * 3
+    assert execute.call_count == 2
+
+    with pytest.raises(AssertionError):
+        await create_pool(server.tcp_address, single_flight=0, loop=loop)
+
+
+@pytest.mark.run_loop
+async def test_pool_bulk_maxsize(create_pool, server, loop):
+    pool = await create_pool(server.tcp_address, minsize=1, maxsize=1,
+                             bulk_maxsize=1, loop=loop)
+    bulk = pool.bulk_pool
+    assert bulk is not None
+    assert bulk.size == 0
+    assert bulk.maxsize == 1
+
+    # big pipeline on bulk lane does not delay interactive commands
+    redis = Redis(pool)
+    assert redis.bulk is not redis
+    assert redis.bulk.connection is bulk
+    pipe = redis.bulk.pipeline()
+    for i in range(10000):
+        pipe.set('bulk:key:{}'.format(i), i)
+    fut = asyncio.ensure_future(pipe.execute(), loop=loop)
+    await asyncio.sleep(0, loop=loop)
+    with (await pool) as conn:
+        assert not conn._waiters
+        assert (await conn.execute('ping')) == b'PONG'
+    assert (await fut) == [True] * 10000
+    assert pool.size == 1
+    assert bulk.size == 1
+
+    assert (await pool.select(1)) is True
+    assert bulk.db == 1
+
+    pool.close()
+    await pool.wait_closed()
+    assert bulk.closed
+
+    pool = await create_pool(server.tcp_address, loop=loop)
+    assert pool.bulk_pool is None
+    redis = Redis(pool)
+    assert redis.bulk is redis
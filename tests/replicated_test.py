@@ -0,0 +1,126 @@
+import asyncio
+import pytest
+
+from aioredis import ReplicatedPool, Redis, PoolClosedError
+from aioredis.replicated import _parse_info, _parse_slaves, _replica_lag
+
+
+@pytest.fixture(scope='module')
+def primary(start_server):
+    return start_server('replicated-primary')
+
+
+@pytest.fixture(scope='module')
+def replica(start_server, primary):
+    return start_server('replicated-replica', ['slave-read-only yes'],
+                        slaveof=primary)
+
+
+async def _wait_replicated(replica, loop):
+    # wait until replica receives all writes
+    for _ in range(100):
+        if (await replica.execute('get', 'replicated:sync')) == b'1':
+            return
+        await asyncio.sleep(0.01, loop=loop)
+
+
+@pytest.mark.run_loop
+async def test_replicated_pool(create_replicated_pool, primary, replica,
+                               loop):
+    pool = await create_replicated_pool(
+        primary.tcp_address, [replica.tcp_address], minsize=1, maxsize=2)
+    assert isinstance(pool, ReplicatedPool)
+    assert pool.address == primary.tcp_address
+    assert pool.replicas[0].address == replica.tcp_address
+    redis = Redis(pool)
+
+    await redis.set('replicated:sync', 1)
+    await _wait_replicated(pool.replicas[0], loop)
+    assert await redis.get('replicated:sync') == b'1'
+    assert pool.is_readonly('GET')
+    assert pool.is_readonly(b'hgetall')
+    assert not pool.is_readonly('SET')
+
+    # reads go to replica
+    conn = await pool.acquire('get', ('replicated:sync',))
+    assert conn.address[1] == replica.tcp_address.port
+    pool.release(conn)
+    # writes, transactions and scripts go to primary
+    conn = await pool.acquire('set')
+    assert conn.address[1] == primary.tcp_address.port
+    pool.release(conn)
+    tr = redis.multi_exec()
+    tr.incr('replicated:counter')
+    tr.get('replicated:counter')
+    res = await tr.execute()
+    assert res[1] == str(res[0]).encode()
+    assert (await redis.eval("return redis.call('get', KEYS[1])",
+                             keys=['replicated:sync'])) == b'1'
+    with await redis as ctx:
+        assert ctx.connection.address[1] == primary.tcp_address.port
+
+    pool.close()
+    await pool.wait_closed()
+    with pytest.raises(PoolClosedError):
+        pool.execute('get', 'key')
+
+
+@pytest.mark.run_loop
+async def test_replicated_pool_least_loaded(create_replicated_pool, primary,
+                                            replica, loop):
+    pool = await create_replicated_pool(
+        primary.tcp_address, [replica.tcp_address, replica.tcp_address],
+        read_policy='least_loaded', server_commands=True,
+        minsize=1, maxsize=1)
+    assert pool.is_readonly('GET')
+    assert not pool.is_readonly('SET')
+    assert not pool.is_readonly('EVALSHA')
+
+    conn = await pool.acquire('get')
+    used = pool._owners[conn]
+    assert used in pool.replicas
+    other = [p for p in pool.replicas if p is not used][0]
+    for _ in range(3):
+        c, _ = pool.get_connection('get')
+        assert c is other._pool[0]
+    pool.release(conn)
+
+
+@pytest.mark.run_loop
+async def test_replicated_pool_lag(create_replicated_pool, primary, replica,
+                                   server, loop):
+    pool = await create_replicated_pool(
+        primary.tcp_address, [replica.tcp_address, server.tcp_address],
+        max_replica_lag=10, lag_check_interval=0.01, minsize=1, maxsize=1)
+    # server is not a replica
+    assert pool.available_replicas == pool.replicas[:1]
+
+    await pool.replicas[0].execute('replicaof', 'no', 'one')
+    try:
+        await asyncio.sleep(0.05, loop=loop)
+        assert pool.available_replicas == []
+        conn = await pool.acquire('get')
+        assert conn.address[1] == primary.tcp_address.port
+        pool.release(conn)
+    finally:
+        await pool.replicas[0].execute(
+            'replicaof', primary.tcp_address.host, primary.tcp_address.port)
+
+
+def test_replica_lag():
+    primary = _parse_info(
+        "# Replication\r\nrole:master\r\nconnected_slaves:2\r\n"
+        "slave0:ip=10.0.0.1,port=6380,state=online,offset=10,lag=1\r\n"
+        "slave1:ip=10.0.0.2,port=6380,state=wait_bgsave,offset=0,lag=0\r\n")
+    slaves = _parse_slaves(primary)
+    assert len(slaves) == 2
+    info = _parse_info(
+        "role:slave\r\nmaster_link_status:up\r\n"
+        "master_last_io_seconds_ago:7\r\nmaster_sync_in_progress:0\r\n")
+    assert _replica_lag(info, ('10.0.0.1', 6380), slaves) == 1
+    assert _replica_lag(info, ('10.0.0.2', 6380), slaves) is None
+    assert _replica_lag(info, ('replica', 6381), slaves) == 7
+    assert _replica_lag(info, '/tmp/redis.sock', slaves) == 7
+    info['master_link_status'] = 'down'
+    assert _replica_lag(info, ('10.0.0.1', 6380), slaves) is None
+    assert _replica_lag({'role': 'master'}, ('10.0.0.1', 6380), []) is None
@@ -1,7 +1,10 @@
+import hashlib
 import pytest
 import asyncio
 
-from aioredis import ReplyError
+from unittest.mock import patch
+
+from aioredis import ReplyError, NoScriptError, PipelineError
 
 
 @pytest.mark.run_loop
@@ -124,3 +127,52 @@ async def test_script_kill(create_redis, loop, server, redis):
 
     with pytest.raises(ReplyError):
         await redis.script_kill()
+
+
+@pytest.mark.run_loop
+async def test_register_script(redis):
+    await redis.delete('script:key')
+    source = "return redis.call('INCRBY', KEYS[1], ARGV[1])"
+    incr = redis.register_script(source)
+    assert incr.sha == hashlib.sha1(source.encode()).hexdigest()
+
+    await redis.script_flush()
+    with pytest.raises(NoScriptError):
+        await redis.evalsha(incr.sha, ['script:key'], [1])
+    with patch.object(redis, 'eval', wraps=redis.eval) as eval_:
+        assert (await incr(keys=['script:key'], args=[2])) == 2
+        assert eval_.call_count == 1
+        assert (await redis.script_exists(incr.sha)) == [1]
+        assert (await incr(keys=['script:key'], args=[3])) == 5
+        assert eval_.call_count == 1
+
+    with pytest.raises(ReplyError):
+        await incr(keys=['script:key'], args=['x'])
+
+
+@pytest.mark.run_loop
+async def test_register_script_pipeline(redis):
+    await redis.delete('script:key')
+    incr = redis.register_script(
+        "return redis.call('INCRBY', KEYS[1], ARGV[1])")
+    for factory in (redis.pipeline, redis.multi_exec):
+        await redis.script_flush()
+        pipe = factory()
+        fut1 = incr(keys=['script:key'], args=[1], client=pipe)
+        fut2 = incr(keys=['script:key'], args=[2], client=pipe)
+        res = await pipe.execute()
+        assert res == [await fut1, await fut2]
+        assert (await redis.script_exists(incr.sha)) == [1]
+    assert (await redis.get('script:key')) == b'6'
+
+    # script fails to load
+    bad = redis.register_script("return (")
+    pipe = redis.pipeline()
+    fut1 = pipe.incr('script:key')
+    fut2 = bad(client=pipe)
+    with pytest.raises(PipelineError):
+        await pipe.execute()
+    for fut in (fut1, fut2):
+        with pytest.raises(ReplyError):
+            await fut
+    assert (await redis.get('script:key')) == b'6'
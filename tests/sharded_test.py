@@ -0,0 +1,178 @@
+import pytest
+
+from aioredis import (
+    ShardedPool,
+    Redis,
+    RedisError,
+    PoolClosedError,
+    )
+from aioredis.sharded import HashRing
+
+
+def test_hash_ring():
+    ring = HashRing(['a', 'b', 'c'], vnodes=100)
+    assert len(ring) == 3
+    assert ring.nodes == ['a', 'b', 'c']
+    keys = ['key:{}'.format(i) for i in range(3000)]
+    owners = {key: ring.get(key) for key in keys}
+    counts = {node: list(owners.values()).count(node) for node in 'abc'}
+    assert all(600 < cnt < 1400 for cnt in counts.values()), counts
+
+    # same key, same node
+    assert ring.get(b'key:1') == owners['key:1']
+    # hash tags
+    assert ring.get('{user:1}:a') == ring.get('{user:1}:b')
+
+    # only keys of new node are moved
+    ring.add('d')
+    moved = [key for key in keys if ring.get(key) != owners[key]]
+    assert all(ring.get(key) == 'd' for key in moved)
+    assert 400 < len(moved) < 1200, len(moved)
+
+    # removed node keys are moved back
+    ring.remove('d')
+    assert all(ring.get(key) == owners[key] for key in keys)
+
+    ring.remove('a')
+    assert all(ring.get(key) == owners[key]
+               for key in keys if owners[key] != 'a')
+
+
+def test_hash_ring_empty():
+    ring = HashRing()
+    with pytest.raises(RedisError):
+        ring.get('key')
+
+
+@pytest.mark.run_loop
+async def test_sharded_pool(create_sharded_pool, server, serverB, loop):
+    pool = await create_sharded_pool(
+        [server.tcp_address, serverB.tcp_address], minsize=1, maxsize=2)
+    assert isinstance(pool, ShardedPool)
+    assert set(pool.shards) == {server.tcp_address, serverB.tcp_address}
+    redis = Redis(pool)
+    keys = ['sharded:{}'.format(i) for i in range(20)]
+    await redis.delete(*keys)
+
+    assert await redis.set(keys[0], 'value')
+    assert await redis.get(keys[0]) == b'value'
+    shard = pool.get_shard(keys[0])
+    assert (await shard.execute('get', keys[0])) == b'value'
+    other = [p for p in pool.shards.values() if p is not shard][0]
+    assert (await other.execute('get', keys[0])) is None
+
+    # split multi-key commands
+    assert await redis.mset(*[arg for key in keys for arg in (key, key)])
+    shards = {pool.get_shard(key) for key in keys}
+    assert len(shards) == 2
+    res = await redis.mget(*keys, encoding='utf-8')
+    assert res == keys
+    assert (await redis.exists(*keys)) == 20
+    assert (await redis.delete(*keys, 'sharded:none')) == 20
+    assert (await redis.mget(*keys)) == [None] * 20
+
+    assert (await redis.ping()) == b'PONG'
+    with pytest.raises(RedisError):
+        redis.dbsize()
+    assert (await pool.execute_all('dbsize')) == [
+        await shard.execute('dbsize') for shard in pool.shards.values()]
+
+
+@pytest.mark.run_loop
+async def test_sharded_pool_key_positions(create_sharded_pool, server,
+                                          serverB, loop):
+    pool = await create_sharded_pool(
+        [server.tcp_address, serverB.tcp_address], minsize=1, maxsize=1)
+    redis = Redis(pool)
+    keys = ['sharded:keys:{}'.format(i) for i in range(20)]
+
+    def other_shard(name):
+        # key owned by other shard than command first argument
+        return [k for k in keys
+                if pool.get_shard(k) is not pool.get_shard(name)][0]
+
+    key = other_shard(b'ENCODING')
+    await redis.set(key, 'value')
+    assert (await redis.object_encoding(key)) is not None
+    key = other_shard('usage')
+    await redis.set(key, 'value')
+    assert (await pool.execute('memory', 'usage', key)) > 0
+
+    tag = other_shard(b'AND')
+    dest, src = '{%s}:dest' % tag, '{%s}:src' % tag
+    await redis.set(src, 'a')
+    assert (await redis.bitop_and(dest, src, src)) == 1
+    assert (await redis.get(dest)) == b'a'
+    shard = pool.get_shard(dest)
+    assert (await shard.execute('get', dest)) == b'a'
+
+    other = [k for k in keys if pool.get_shard(k) is not shard][0]
+    with pytest.raises(RedisError, match="different shards"):
+        redis.bitop_and(dest, src, other)
+    with pytest.raises(RedisError, match="can not be found"):
+        pool.execute('object', 'help')
+    with pytest.raises(RedisError, match="can not be found"):
+        pool.execute('xread', 'count', 1)
+    with pytest.raises(RedisError, match="can not be found"):
+        pool.execute('no-such-command', key)
+    await redis.delete(*keys)
+    await redis.delete(dest, src)
+
+
+def test_sharded_pool_no_shards(loop):
+    pool = ShardedPool(loop=loop)
+    with pytest.raises(PoolClosedError):
+        pool.execute('ping')
+    with pytest.raises(PoolClosedError):
+        pool.execute('get', 'key')
+
+
+@pytest.mark.run_loop
+async def test_sharded_pool_pipeline(create_sharded_pool, server, serverB,
+                                     loop):
+    pool = await create_sharded_pool(
+        [server.tcp_address, serverB.tcp_address], minsize=1, maxsize=2)
+    redis = Redis(pool)
+    keys = ['sharded:pipe:{}'.format(i) for i in range(10)]
+    await redis.delete(*keys)
+
+    pipe = redis.pipeline()
+    for key in keys:
+        pipe.incr(key)
+    pipe.mget(*keys)
+    res = await pipe.execute()
+    assert res == [1] * 10 + [[b'1'] * 10]
+
+    conn = await pool.acquire('get', ('sharded:pipe:0',))
+    assert conn in pool.get_shard('sharded:pipe:0')._used
+    pool.release(conn)
+    assert conn in pool.get_shard('sharded:pipe:0')._pool
+    with pytest.raises(RedisError):
+        await pool.acquire()
+
+
+@pytest.mark.run_loop
+async def test_sharded_pool_add_remove(create_sharded_pool, server, serverB,
+                                       loop):
+    pool = await create_sharded_pool([server.tcp_address], minsize=1,
+                                     maxsize=1)
+    keys = ['sharded:move:{}'.format(i) for i in range(100)]
+    await pool.execute('mset', *[arg for key in keys for arg in (key, 1)])
+    await pool.add_shard(serverB.tcp_address)
+    await pool.execute('del', *['sharded:move:{}'.format(i)
+                                for i in range(100, 110)])
+    res = await pool.execute('mget', *keys)
+    missed = [key for key, val in zip(keys, res) if val is None]
+    assert missed
+    assert all(pool.get_shard(key).address == serverB.tcp_address
+               for key in missed)
+    assert len(missed) < 100
+
+    await pool.execute('del', *keys)
+    await pool.remove_shard(serverB.tcp_address)
+    assert list(pool.shards) == [server.tcp_address]
+    pool.close()
+    await pool.wait_closed()
+    assert pool.closed
+    with pytest.raises(RedisError):
+        pool.execute('get', 'key')
@@ -1,8 +1,14 @@
 import asyncio
 import pytest
 
+from unittest.mock import patch
+
 from aioredis import ReplyError, MultiExecError, WatchVariableError
+from aioredis import PipelineError
 from aioredis import ConnectionClosedError
+from aioredis import Redis, Param, RedisConnection
+from aioredis.commands import PipelineTemplate
+from aioredis import PoolMetrics
 
 
 @pytest.mark.run_loop
@@ -269,3 +275,338 @@ async def test_multi_exec_and_pool_release(redis):
     ret, = await tr.execute()
     assert ret is None
     assert (await fut1) is None
+
+
+@pytest.mark.run_loop
+async def test_multi_exec_no_gather(redis):
+    await redis.delete('foo', 'bar')
+    tr = redis.multi_exec()
+    with patch('asyncio.ensure_future') as ensure_future, \
+            patch('asyncio.gather') as gather:
+        f1 = tr.set('foo', 'bar')
+        f2 = tr.incr('bar')
+        f3 = tr.get('foo', encoding='utf-8')
+        res = await tr.execute()
+    assert not ensure_future.called
+    assert not gather.called
+    assert res == [True, 1, 'bar']
+    assert (await f1) is True
+    assert (await f2) == 1
+    assert (await f3) == 'bar'
+
+
+@pytest.mark.run_loop
+async def test_multi_exec_queue_errors(redis):
+    tr = redis.multi_exec()
+    fut1 = tr.connection.execute('SET', 'foo')
+    fut2 = tr.incr('bar')
+    with pytest.raises(MultiExecError):
+        await tr.execute()
+    with pytest.raises(ReplyError, match="wrong number of arguments"):
+        await fut1
+    with pytest.raises(ReplyError, match="EXECABORT"):
+        await fut2
+
+    tr = redis.multi_exec()
+    fut1 = tr.connection.execute('SELECT', 1)
+    fut2 = tr.set('foo', 'bar')
+    res = await tr.execute(return_exceptions=True)
+    assert res == [True]
+    with pytest.raises(ValueError):
+        await fut1
+    assert redis.db == 0
+
+
+@pytest.mark.run_loop
+async def test_multi_exec_fallback(redis):
+    await redis.delete('foo')
+    with patch.object(RedisConnection, 'execute_multi', None):
+        tr = redis.multi_exec()
+        fut1 = tr.incr('foo')
+        tr.hgetall('foo')
+        res = await tr.execute(return_exceptions=True)
+    assert res[0] == 1
+    assert isinstance(res[1], ReplyError)
+    assert (await fut1) == 1
+
+
+@pytest.mark.run_loop
+async def test_pipeline(redis, loop):
+    await redis.delete('foo', 'bar')
+    pipe = redis.pipeline()
+    fut1 = pipe.set('foo', 'bar')
+    fut2 = pipe.incr('bar')
+    fut3 = pipe.get('foo', encoding='utf-8')
+    fut4 = pipe.hgetall('foo')
+    fut5 = pipe.set('foo', None)
+    fut6 = pipe.exists('foo')
+    # commands are not sent before execute()
+    assert not fut2.done()
+    with pytest.raises(PipelineError):
+        await pipe.execute()
+    assert (await fut1) is True
+    assert (await fut2) == 1
+    assert (await fut3) == 'bar'
+    with pytest.raises(ReplyError):
+        await fut4
+    with pytest.raises(TypeError):
+        await fut5
+    assert (await fut6) == 1
+
+    pipe = redis.pipeline()
+    pipe.set('foo', 'baz')
+    pipe.hgetall('foo')
+    pipe.get('foo')
+    res = await pipe.execute(return_exceptions=True)
+    assert res[0] is True
+    assert isinstance(res[1], ReplyError)
+    assert res[2] == b'baz'
+
+
+@pytest.mark.run_loop
+async def test_pipeline_no_tasks(redis, loop):
+    pipe = redis.pipeline()
+    with patch('asyncio.ensure_future') as ensure_future:
+        futs = [pipe.set('key:{}'.format(i), i) for i in range(10)]
+        futs += [pipe.get('key:{}'.format(i)) for i in range(10)]
+        res = await pipe.execute()
+    assert not ensure_future.called
+    assert res == [True] * 10 + [str(i).encode() for i in range(10)]
+    assert all(fut.done() for fut in futs)
+
+    pipe = redis.pipeline()
+    assert pipe.get.__name__ == 'get'
+    assert pipe.get.__doc__ == redis.get.__doc__
+
+
+@pytest.mark.run_loop
+async def test_windowed_pipeline(redis, loop):
+    cmds = [('SET', 'key:{}'.format(i), i) for i in range(1000)]
+    pipe = redis.windowed_pipeline(iter(cmds), window=100, min_window=10)
+    res = []
+    async for val in pipe:
+        assert pipe.in_flight <= 100
+        res.append(val)
+    assert res == [b'OK'] * 1000
+    assert pipe.closed
+    assert 10 <= pipe.window <= 100
+    assert pipe.rtt is not None
+
+    class Source:
+        def __init__(self):
+            self.cmds = iter(('GET', 'key:{}'.format(i))
+                             for i in range(1000))
+
+        def __aiter__(self):
+            return self
+
+        async def __anext__(self):
+            for cmd in self.cmds:
+                return cmd
+            raise StopAsyncIteration    # noqa
+
+    pipe = redis.windowed_pipeline(Source(), window=50, adaptive=False,
+                                   encoding='utf-8')
+    assert pipe.window == 50
+    res = []
+    async for val in pipe:
+        res.append(val)
+    assert res == [str(i) for i in range(1000)]
+
+    async for val in redis.windowed_pipeline([]):
+        assert False, val
+
+
+@pytest.mark.run_loop
+async def test_windowed_pipeline_errors(redis):
+    await redis.set('foo', 'bar')
+    cmds = [('GET', 'foo'), ('HGETALL', 'foo'), ('GET', None), ('GET', 'foo')]
+    res = []
+    async for val in redis.windowed_pipeline(cmds, return_exceptions=True):
+        res.append(val)
+    assert res[0] == b'bar'
+    assert isinstance(res[1], ReplyError)
+    assert isinstance(res[2], TypeError)
+    assert res[3] == b'bar'
+
+    pipe = redis.windowed_pipeline(cmds)
+    assert (await pipe.__anext__()) == b'bar'
+    with pytest.raises(ReplyError):
+        await pipe.__anext__()
+    assert pipe.closed
+    assert pipe.in_flight == 0
+    with pytest.raises(StopAsyncIteration):
+        await pipe.__anext__()
+
+
+@pytest.mark.run_loop
+async def test_windowed_pipeline_max_bytes(redis):
+    await redis.set('foo', 'x' * 1024)
+    cmds = (('GET', 'foo') for _ in range(200))
+    pipe = redis.windowed_pipeline(cmds, window=100, min_window=10,
+                                   max_bytes=20 * 1024)
+    async for val in pipe:
+        assert val and pipe.window <= 20
+
+
+@pytest.mark.run_loop
+async def test_windowed_pipeline_pool(create_pool, server):
+    pool = await create_pool(server.tcp_address, minsize=2)
+    redis = Redis(pool)
+    cmds = (('PING',) for _ in range(100))
+    async with redis.windowed_pipeline(cmds, window=10) as pipe:
+        async for val in pipe:
+            assert val == b'PONG'
+            assert pool.freesize == 1
+            break
+    assert pipe.closed
+    assert pool.freesize == 2
+
+
+@pytest.mark.run_loop
+async def test_transaction(redis, create_redis, server, loop):
+    other = await create_redis(server.tcp_address, loop=loop)
+    await redis.set('foo', 1)
+    calls = 0
+
+    async def incr(conn, tr):
+        nonlocal calls
+        calls += 1
+        val = int(await conn.get('foo'))
+        if calls < 3:
+            # concurrent update
+            await other.incr('foo')
+        tr.set('foo', val + 1)
+        tr.get('foo')
+
+    res = await redis.transaction(incr, 'foo', backoff=0)
+    assert calls == 3
+    assert res == [True, b'4']
+
+    async def noop(conn, tr):
+        await conn.get('foo')
+    assert (await redis.transaction(noop, 'foo')) == []
+
+    async def fail(conn, tr):
+        raise ValueError("boom")
+    with pytest.raises(ValueError):
+        await redis.transaction(fail, 'foo')
+
+    async def conflict(conn, tr):
+        await other.incr('foo')
+        tr.incr('foo')
+    calls = 0
+    with pytest.raises(WatchVariableError, match="2 retries"):
+        await redis.transaction(conflict, 'foo', max_retries=2, backoff=0)
+    assert (await redis.get('foo')) == b'7'
+
+    async def error(conn, tr):
+        tr.hgetall('foo')
+    with pytest.raises(MultiExecError):
+        await redis.transaction(error, 'foo')
+    # connection is usable (not in MULTI, nothing watched)
+    assert (await redis.set('foo', 'bar')) is True
+
+
+@pytest.mark.run_loop
+async def test_transaction_metrics(create_pool, create_redis, server, loop):
+    metrics = PoolMetrics()
+    pool = await create_pool(server.tcp_address, metrics=metrics, loop=loop)
+    redis = Redis(pool)
+    other = await create_redis(server.tcp_address, loop=loop)
+    await redis.set('foo', 1)
+    calls = 0
+
+    async def incr(conn, tr):
+        nonlocal calls
+        calls += 1
+        if calls < 3:
+            await other.incr('foo')
+        tr.incr('foo')
+
+    with patch('aioredis.commands.transaction.asyncio.sleep',
+               wraps=asyncio.sleep) as sleep:
+        assert (await redis.transaction(incr, 'foo', 'bar',
+                                        backoff=.001)) == [4]
+    assert sleep.call_count == 2
+    assert sleep.call_args_list[0][0][0] <= .001
+    assert sleep.call_args_list[1][0][0] <= .002
+    assert pool.freesize == pool.size
+    assert metrics.transactions == 1
+    assert metrics.transaction_conflicts == 2
+    assert metrics.transaction_aborts == 0
+    assert metrics.transaction_retries.max == 2
+    assert metrics.snapshot()['conflict_keys'] == [('foo', 2), ('bar', 2)]
+
+    calls = 0
+    with pytest.raises(WatchVariableError):
+        await redis.transaction(incr, 'foo', max_retries=0)
+    assert metrics.transactions == 2
+    assert metrics.transaction_aborts == 1
+    assert pool.freesize == pool.size
+
+
+@pytest.mark.run_loop
+async def test_pipeline_template(redis):
+    await redis.delete('tpl:counter')
+    await redis.hmset('tpl:hash', 'foo', 'bar')
+
+    def build(pipe):
+        pipe.set(Param('key'), Param('value'))
+        pipe.get(Param('key'), encoding='utf-8')
+        pipe.hgetall('tpl:hash')
+        pipe.incrbyfloat('tpl:counter', 1.5)
+        pipe.exists(Param('key'), 'tpl:hash')
+        pipe.hgetall(Param('key'))
+    tpl = redis.pipeline_template(build)
+    assert len(tpl) == 6
+    assert tpl.params == {'key', 'value'}
+
+    res = await tpl.execute(key='tpl:key', value=1, return_exceptions=True)
+    assert res[:5] == [True, '1', {b'foo': b'bar'}, 1.5, 2]
+    assert isinstance(res[5], ReplyError)
+    with pytest.raises(PipelineError):
+        await tpl.execute(key='tpl:key', value=2.5)
+    assert (await redis.get('tpl:key')) == b'2.5'
+
+    with pytest.raises(TypeError, match="Missing template parameter"):
+        await tpl.execute(key='tpl:key')
+    with pytest.raises(TypeError, match="'value' expected"):
+        await tpl.execute(key='tpl:key', value=None)
+    assert (await redis.get('tpl:counter')) == b'3'
+
+
+@pytest.mark.run_loop
+async def test_pipeline_template_errors(redis, loop):
+    with pytest.raises(ValueError):
+        redis.pipeline_template(lambda pipe: pipe.execute('select', 1))
+    with pytest.raises(ValueError):
+        redis.pipeline_template(lambda pipe: pipe.execute('multi'))
+    with pytest.raises(TypeError, match="can not be used in template"):
+        redis.pipeline_template(lambda pipe: pipe.iscan())
+    with pytest.raises(TypeError):
+        redis.pipeline_template(
+            lambda pipe: pipe.get(Param('key'), timeout=1))
+
+    class MyRedis(Redis):
+        def get_int(self, key):
+            fut = self.get(key)
+
+            async def convert():
+                return int(await fut)
+            return convert()
+
+    with pytest.raises(TypeError, match="result conversion can not be used"):
+        PipelineTemplate(redis.connection, lambda pipe: pipe.get_int('key'),
+                         MyRedis, loop=loop)
+
+
+@pytest.mark.run_loop
+async def test_pipeline_template_fallback(redis, loop):
+    tpl = PipelineTemplate(redis.connection, lambda pipe: (
+        pipe.set(Param('key'), 'foo'),
+        pipe.hgetall(Param('key'))), Redis, loop=loop)
+    with patch.object(RedisConnection, 'execute_encoded', None):
+        res = await tpl.execute(key='tpl:key', return_exceptions=True)
+    assert res[0] is True
+    assert isinstance(res[1], ReplyError)